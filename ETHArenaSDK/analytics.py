@@ -0,0 +1,125 @@
+import numpy as np
+
+from sessionStore import HEADER, decode_header, encode_frame, strings
+
+BIRD, PIG, BRICK = 0, 1, 2
+
+
+def _round(value, digits: int = 2):
+    return round(float(value), digits)
+
+
+def load_frames(records: list) -> dict:
+    """
+    Views a list of packed session records as flat NumPy arrays without copying the object data:
+    one row per frame in `headers`, one row per object (bird, pig or brick) in `positions`/`states`
+    """
+    headers = np.array([decode_header(record) for record in records], dtype=np.float64)
+    counts = headers[:, 4:7].astype(np.int64)
+    totals = counts.sum(axis=1)
+    positions = [
+        np.frombuffer(record, dtype="<f4", count=2 * total, offset=HEADER.size)
+        for record, total in zip(records, totals)
+    ]
+    states = [
+        np.frombuffer(record, dtype="<u2", count=total, offset=HEADER.size + 8 * total)
+        for record, total in zip(records, totals)
+    ]
+    frames = len(records)
+    return {
+        "headers": headers,
+        "counts": counts,
+        "frame": np.repeat(np.arange(frames), totals),
+        "kind": np.repeat(np.tile([BIRD, PIG, BRICK], frames), counts.ravel()),
+        "positions": np.concatenate(positions).reshape(-1, 2) if frames else np.empty((0, 2), dtype="<f4"),
+        "states": np.concatenate(states) if frames else np.empty(0, dtype="<u2"),
+    }
+
+
+def _per_frame_count(arrays: dict, mask: np.ndarray, frames: int) -> np.ndarray:
+    return np.bincount(arrays["frame"][mask], minlength=frames)
+
+
+def _per_frame_mean(arrays: dict, mask: np.ndarray, values: np.ndarray, frames: int) -> np.ndarray:
+    sums = np.bincount(arrays["frame"][mask], weights=values[mask], minlength=frames)
+    counts = np.bincount(arrays["frame"][mask], minlength=frames)
+    return np.divide(sums, counts, out=np.zeros(frames), where=counts > 0)
+
+
+def summarize_match(records: list) -> dict:
+    """
+    Reduces a whole match to a fixed-size set of statistics, independent of how many frames were logged
+    """
+    if not records:
+        return {}
+    arrays = load_frames(records)
+    headers, counts, kind, states = arrays["headers"], arrays["counts"], arrays["kind"], arrays["states"]
+    x, y = arrays["positions"][:, 0], arrays["positions"][:, 1]
+    frames = len(records)
+    elapsed = headers[:, 0] - headers[0, 0]
+    game_states = headers[:, 1].astype(np.int64)
+    playing = game_states == strings.encode("Playing")
+
+    # pigs stay in the list once destroyed, so the destroyed count per frame is the destruction timeline
+    destroyed = _per_frame_count(arrays, (kind == PIG) & (states == strings.encode("Destroyed")), frames)
+    changes = np.flatnonzero(np.diff(destroyed, prepend=0))
+    pigs_total = int(counts[0, PIG])
+    pigs_destroyed = int(destroyed[-1])
+
+    # Unity logs one "Playing" frame after every bird comes to rest
+    shots = int(playing.sum())
+
+    # destroyed bricks drop out of the list, moving bricks and a lower mean height show the tower collapsing
+    bricks_initial = int(counts[0, BRICK])
+    bricks_destroyed = max(0, bricks_initial - int(counts[-1, BRICK]))
+    brick_height = _per_frame_mean(arrays, kind == BRICK, y, frames)
+    moving_bricks = _per_frame_count(arrays, (kind == BRICK) & (states == strings.encode("Moving")), frames)
+
+    # shot distance: how far the furthest bird got from where the birds started
+    bird_mask = kind == BIRD
+    furthest = np.full(frames, -np.inf)
+    np.maximum.at(furthest, arrays["frame"][bird_mask], x[bird_mask])
+    origin = x[bird_mask & (arrays["frame"] == 0)]
+    origin_x = float(origin.min()) if origin.size else 0.0
+    shot_distances = furthest[playing & np.isfinite(furthest)] - origin_x
+
+    final_state = strings.decode(int(game_states[-1]))
+    return {
+        "current_state": final_state,
+        "slingshot_state": strings.decode(int(headers[-1, 3])),
+        "frames": frames,
+        "duration_s": _round(elapsed[-1]),
+        "time_to_win_s": _round(elapsed[-1]) if final_state == "Won" else "not won",
+        "total_shots": shots,
+        "pigs_total": pigs_total,
+        "destroyed_pigs": pigs_destroyed,
+        "hit_percentage": _round(pigs_destroyed / pigs_total * 100 if pigs_total else 0),
+        "accuracy": _round(pigs_destroyed / shots if shots else 0),
+        "pig_destruction_timeline": [[_round(elapsed[i], 1), int(destroyed[i])] for i in changes],
+        "bricks_initial": bricks_initial,
+        "bricks_destroyed": bricks_destroyed,
+        "structural_damage_pct": _round(bricks_destroyed / bricks_initial * 100 if bricks_initial else 0),
+        "tower_height_drop": _round(brick_height[0] - brick_height[-1]) if bricks_initial else 0,
+        "max_moving_bricks": int(moving_bricks.max()),
+        "shot_distances": [_round(distance, 1) for distance in shot_distances],
+        "max_shot_distance": _round(shot_distances.max()) if shot_distances.size else 0,
+        "mean_shot_distance": _round(shot_distances.mean()) if shot_distances.size else 0,
+    }
+
+
+def summarize_documents(documents: list) -> dict:
+    return summarize_match([encode_frame(document, timestamp=0.0) for document in documents])
+
+
+def gameplay_features(summary: dict) -> list:
+    """
+    Quantized feature vector of a match, near-identical matches share the same vector
+    """
+    return [
+        summary["current_state"],
+        summary["total_shots"],
+        summary["destroyed_pigs"],
+        int(summary["hit_percentage"] // 10),
+        int(summary["structural_damage_pct"] // 20),
+        int(summary["max_shot_distance"] // 5),
+    ]
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+
+import httpx
+
+from rateLimit import get_limiter
+from telemetry import stage
+
+logger = logging.getLogger(__name__)
+
+DEEPAI_URL = "https://api.deepai.org/api/text2img"
+
+TIER_PROMPTS = {
+    "low": "Generate a sad and unexcited animated angry bird with yellow background color. Keep it plain and simple and with some good facial expressions and a Sword in hand. The background color, color of the bird and the facial expression should keep changing",
+    "high": "Generate an animated angry bird which should look very happy and enthusiastic and a sword  and plain red background. Keep it plain and simple and with some good facial expressions and a Sword in hand. The background color, color of the bird, object in hand of the angry bird and the facial expression should keep changing",
+}
+
+
+def tier_for(rewards: int) -> str:
+    return "low" if rewards <= 6 else "high"
+
+
+class DeepAIGenerator:
+    """
+    text2img on DeepAI, returns the image bytes and the URL DeepAI hosts them at
+    """
+
+    extension = ".jpg"
+
+    def __init__(self, api_key: str, url: str = DEEPAI_URL, timeout: float = 120.0):
+        self.url = url
+        self.headers = {"api-key": api_key or ""}
+        self.timeout = timeout
+        self.limiter = get_limiter("deepai")
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def generate(self, prompt: str):
+        await self.limiter.acquire()
+        response = await self.client.post(self.url, data={"text": prompt}, headers=self.headers)
+        response.raise_for_status()
+        result = response.json()
+        image = await self.client.get(result["output_url"])
+        image.raise_for_status()
+        return image.content, result.get("share_url") or result["output_url"]
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+
+class StubGenerator:
+    """
+    Local generator for tests and offline runs: a small SVG with a random background, no network
+    """
+
+    extension = ".svg"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def generate(self, prompt: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        color = "#%06x" % random.getrandbits(24)
+        mood = "sad" if "sad" in prompt else "happy"
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="256" height="256">'
+            f'<rect width="256" height="256" fill="{color}"/>'
+            f'<text x="128" y="136" font-size="32" text-anchor="middle">{mood} bird</text></svg>'
+        )
+        return svg.encode(), None
+
+    async def aclose(self):
+        pass
+
+
+class ArtworkPool:
+    """
+    Keeps a few pre-generated images per reward tier so a mint never waits on image generation.
+    Images are stored content addressed (sha256) under `directory/<tier>/`, the unused ones are listed
+    in `directory/manifest.json` so the pool survives restarts. `take` pops an URI in O(1) and tops the
+    tier up in the background once it drops below `low_watermark`.
+    """
+
+    def __init__(
+        self,
+        generator,
+        directory: str = "artwork",
+        base_url: str = None,
+        size: int = 8,
+        low_watermark: int = 3,
+        retry_delay: float = 30.0,
+    ):
+        self.generator = generator
+        self.directory = directory
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.size = size
+        self.low_watermark = low_watermark
+        self.retry_delay = retry_delay
+        self.pools = {tier: deque() for tier in TIER_PROMPTS}
+        self._refills = {}
+        self.served = 0
+        self.generated = 0
+        self.misses = 0
+        self.failures = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_manifest()
+
+    @classmethod
+    def from_env(cls):
+        if os.environ.get("ARTWORK_GENERATOR", "deepai") == "stub":
+            generator = StubGenerator()
+        else:
+            generator = DeepAIGenerator(os.environ.get("DEEPAI_API_KEY"))
+        return cls(
+            generator,
+            directory=os.environ.get("ARTWORK_DIR", "artwork"),
+            base_url=os.environ.get("ARTWORK_BASE_URL") or None,
+            size=int(os.environ.get("ARTWORK_POOL_SIZE", 8)),
+            low_watermark=int(os.environ.get("ARTWORK_LOW_WATERMARK", 3)),
+        )
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        for tier, items in manifest.items():
+            if tier in self.pools:
+                self.pools[tier].extend(
+                    item for item in items if os.path.exists(os.path.join(self.directory, item["path"]))
+                )
+
+    def _save_manifest(self):
+        manifest = {tier: list(pool) for tier, pool in self.pools.items()}
+        temporary = self.manifest_path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temporary, self.manifest_path)
+
+    async def _generate(self, tier: str) -> dict:
+        with stage("image_generation"):
+            content, source_url = await self.generator.generate(TIER_PROMPTS[tier])
+        digest = hashlib.sha256(content).hexdigest()
+        path = os.path.join(tier, digest + self.generator.extension)
+        full_path = os.path.join(self.directory, path)
+        if not os.path.exists(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            await asyncio.to_thread(self._write, full_path, content)
+        if self.base_url:
+            uri = f"{self.base_url}/{path.replace(os.sep, '/')}"
+        else:
+            uri = source_url or f"/artwork/{path.replace(os.sep, '/')}"
+        self.generated += 1
+        return {"uri": uri, "sha256": digest, "path": path, "created_at": time.time()}
+
+    @staticmethod
+    def _write(path: str, content: bytes):
+        with open(path, "wb") as f:
+            f.write(content)
+
+    async def _refill(self, tier: str):
+        pool = self.pools[tier]
+        while len(pool) < self.size:
+            try:
+                item = await self._generate(tier)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.warning("Artwork generation for tier %s failed: %s", tier, e)
+                await asyncio.sleep(self.retry_delay)
+                continue
+            if all(existing["sha256"] != item["sha256"] for existing in pool):
+                pool.append(item)
+                self._save_manifest()
+
+    def _schedule_refill(self, tier: str):
+        task = self._refills.get(tier)
+        if task is None or task.done():
+            self._refills[tier] = asyncio.create_task(self._refill(tier))
+
+    def start(self):
+        for tier in self.pools:
+            self._schedule_refill(tier)
+
+    async def stop(self):
+        for task in self._refills.values():
+            task.cancel()
+        await asyncio.gather(*self._refills.values(), return_exceptions=True)
+        self._refills = {}
+        await self.generator.aclose()
+
+    async def take(self, rewards: int) -> str:
+        """
+        Artwork URI for a mint with `rewards`, generated on the spot only when the tier ran dry
+        """
+        tier = tier_for(rewards)
+        pool = self.pools[tier]
+        if pool:
+            item = pool.popleft()
+            self._save_manifest()
+        else:
+            self.misses += 1
+            item = await self._generate(tier)
+        if len(pool) < self.low_watermark:
+            self._schedule_refill(tier)
+        self.served += 1
+        return item["uri"]
+
+    def stats(self) -> dict:
+        return {
+            "available": {tier: len(pool) for tier, pool in self.pools.items()},
+            "served": self.served,
+            "generated": self.generated,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
@@ -0,0 +1,75 @@
+"""
+Upstream completion calls as the number of concurrent clients grows, when every client asks the same
+question (the /getAIResponse no-games prompt, a repeated /chat) and when every client asks a different one.
+
+identical: without coalescing every client costs one upstream call, with single-flight it stays at one.
+distinct:  nothing can be shared, the token bucket spreads the calls out and turns away what would
+           have to queue for longer than RATE_LIMIT_GAIA_MAX_WAIT.
+
+    python benchmarks/coalescing.py --clients 1 10 100 1000 --delay 0.5 --rps 5 --burst 10 --max-wait 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llmClient import LLMClient
+from rateLimit import RateLimited, TokenBucket
+from responseCache import ResponseCache, make_key
+from stub_server import StubServer, create_stub_app
+
+
+async def round_trip(server, clients: int, limiter: TokenBucket, coalesce: bool, distinct: bool):
+    client = LLMClient(url=server.url, max_connections=100, max_concurrency=100)
+    client.limiter = limiter
+    cache = ResponseCache()
+    server.app.state.calls = 0
+    rejected = 0
+
+    async def ask(i: int):
+        nonlocal rejected
+        messages = [{"role": "user", "content": f"question {i if distinct else 0}"}]
+        try:
+            if coalesce:
+                await cache.get_or_compute(make_key("chat", messages), lambda: client.chat_completion(messages))
+            else:
+                await client.chat_completion(messages)
+        except RateLimited:
+            rejected += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ask(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return server.app.state.calls, rejected, elapsed
+
+
+async def main(args):
+    with StubServer(create_stub_app(delay=args.delay), port=args.port) as server:
+        print(f"{'clients':>8} {'mode':<22} {'upstream calls':>15} {'rejected':>9} {'elapsed':>8}")
+        for clients in args.clients:
+            for label, coalesce, distinct, limited in (
+                ("identical, naive", False, False, False),
+                ("identical, coalesced", True, False, True),
+                ("distinct, rate limited", True, True, True),
+            ):
+                if limited:
+                    limiter = TokenBucket("gaia", args.rps, args.burst, args.max_wait)
+                else:
+                    limiter = TokenBucket("gaia", 1e9, 10 ** 9, 0)
+                calls, rejected, elapsed = await round_trip(server, clients, limiter, coalesce, distinct)
+                print(f"{clients:>8} {label:<22} {calls:>15} {rejected:>9} {elapsed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--rps", type=float, default=5)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--max-wait", type=float, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+"""
+Cost of turning a /getUserData request body into a session store record, per frame:
+the stdlib `json.loads` into dicts that /getUserData used before, `GameData.model_validate_json` with a
+pydantic model per object, and the packed `GameData` it uses now.
+
+    python benchmarks/frame_parse.py --recording synthetic.ndjson.gz
+    python benchmarks/frame_parse.py --matches 200 --bricks 60
+
+"allocated" is the peak of Python allocations while one frame is parsed and packed, "parsed" what the parsed
+frame holds on to until it is packed. Allocations made inside pydantic-core's own parser (not Python objects)
+are not seen by tracemalloc.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import BaseModel
+
+from gameData import GameData
+from matches import load_matches, synthetic_matches
+from sessionStore import encode_frame
+
+
+class Position(BaseModel):
+    x: float
+    y: float
+
+
+class GameObjectState(BaseModel):
+    position: Position
+    state: str
+
+
+class SlingshotState(BaseModel):
+    birdToThrow: str
+    slingshotState: str
+
+
+class ObjectGameData(BaseModel):
+    currentGameState: str
+    birds: List[GameObjectState]
+    pigs: List[GameObjectState]
+    bricks: List[GameObjectState]
+    slingshot: SlingshotState
+
+
+PATHS = {
+    "json.loads": (json.loads, lambda frame: encode_frame(frame, timestamp=0.0)),
+    "model per object": (ObjectGameData.model_validate_json, lambda frame: encode_frame(frame.model_dump(), timestamp=0.0)),
+    "packed GameData": (GameData.model_validate_json, lambda frame: encode_frame(frame, timestamp=0.0)),
+}
+
+
+def throughput(bodies: list, parse, pack, repeats: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for body in bodies:
+            parse(body)
+    parsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for body in bodies:
+            pack(parse(body))
+    packed = time.perf_counter() - start
+    frames = len(bodies) * repeats
+    return frames / parsed, frames / packed
+
+
+def allocations(bodies: list, parse, pack) -> tuple:
+    peak_total = held_total = 0
+    tracemalloc.start()
+    for body in bodies:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        frame = parse(body)
+        held_total += tracemalloc.get_traced_memory()[0] - base
+        pack(frame)
+        del frame
+        peak_total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return peak_total / len(bodies), held_total / len(bodies)
+
+
+def main(args):
+    if args.recording:
+        matches = load_matches(args.recording)
+    else:
+        matches = synthetic_matches(args.matches, args.seed, bricks=args.bricks)
+    bodies = [json.dumps(frame).encode() for match in matches for frame in match]
+    sample = random.Random(args.seed).sample(bodies, min(len(bodies), 2000))
+    for parse, pack in PATHS.values():
+        # same records from every path
+        assert pack(parse(bodies[-1])) == encode_frame(json.loads(bodies[-1]), timestamp=0.0)
+    print(f"frames={len(bodies)} mean body={sum(map(len, bodies)) / len(bodies):.0f}B")
+    print(f"{'path':<18} {'parse/s':>9} {'+pack/s':>9} {'allocated B':>12} {'parsed B':>9}")
+    for name, (parse, pack) in PATHS.items():
+        parsed, packed = throughput(bodies, parse, pack, args.repeats)
+        peak, held = allocations(sample, parse, pack)
+        print(f"{name:<18} {parsed:>9.0f} {packed:>9.0f} {peak:>12.0f} {held:>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recording", default=None)
+    parser.add_argument("--matches", type=int, default=200)
+    parser.add_argument("--bricks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,80 @@
+"""
+Completion latency percentiles through one endpoint versus an EndpointPool with failover and hedging.
+Two local stubs answer in `--delay` seconds except for a `--tail-fraction` of requests that stall for
+`--tail-delay`; a third endpoint is a port nobody listens on, so its circuit breaker has to open.
+
+    python benchmarks/hedging.py --requests 400 --concurrency 8 --delay 0.05 --tail-fraction 0.05 --tail-delay 1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# these benchmarks measure the client against a local stub, not the production Gaia budget
+os.environ.setdefault("RATE_LIMIT_GAIA_RPS", "100000")
+os.environ.setdefault("RATE_LIMIT_GAIA_BURST", "100000")
+
+from llmClient import LLMClient
+from stub_server import StubServer, create_stub_app
+
+MESSAGES = [{"role": "user", "content": "benchmark"}]
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def run(client: LLMClient, requests: int, concurrency: int) -> tuple:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.chat_completion(MESSAGES)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await client.aclose()
+    return sorted(latencies), errors
+
+
+async def main(args):
+    def stub():
+        return create_stub_app(delay=args.delay, tail_fraction=args.tail_fraction, tail_delay=args.tail_delay)
+
+    with StubServer(stub(), port=args.port) as first, StubServer(stub(), port=args.port + 1) as second:
+        down = f"http://127.0.0.1:{args.port + 2}/v1/chat/completions"
+        setups = (
+            ("single endpoint", dict(urls=[first.url])),
+            ("pool, failover only", dict(urls=[first.url, second.url], hedge=False)),
+            ("pool, hedged", dict(urls=[first.url, second.url], hedge_delay=args.hedge_delay)),
+            ("pool + dead endpoint", dict(urls=[down, first.url, second.url], hedge_delay=args.hedge_delay)),
+        )
+        print(f"{'setup':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'hedged':>7} {'failovers':>10}")
+        for label, options in setups:
+            client = LLMClient(max_concurrency=args.concurrency * 2, timeout=10, **options)
+            latencies, errors = await run(client, args.requests, args.concurrency)
+            stats = client.pool.stats()
+            print(f"{label:<22} {percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.95):>8.1f} "
+                  f"{percentile(latencies, 0.99):>8.1f} {errors:>7} {stats['hedged']:>7} {stats['failovers']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--tail-fraction", type=float, default=0.05)
+    parser.add_argument("--tail-delay", type=float, default=1.0)
+    parser.add_argument("--hedge-delay", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8780)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""
+Read latency of getAllUsers/getNFTs over RPC versus the local ChainIndexer.
+Run against a local node with BaseArena deployed and some mints on it (tx_throughput.py makes plenty), e.g.
+`npx hardhat node` + `npx hardhat ignition deploy` in Exportedcontracts:
+
+    python benchmarks/indexer_reads.py --rpc http://127.0.0.1:8545 --contract 0x... --reads 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chain import Chain
+from indexer import ChainIndexer
+
+
+def timed(label: str, reads: int, read):
+    start = time.perf_counter()
+    for _ in range(reads):
+        read()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed / reads * 1e6:10.1f} us/read")
+
+
+def main(args):
+    chain = Chain(rpc_url=args.rpc, contract_address=args.contract)
+    contract = chain.contract
+
+    with tempfile.TemporaryDirectory() as directory:
+        indexer = ChainIndexer(chain, path=os.path.join(directory, "index.db"), confirmations=0)
+        start = time.perf_counter()
+        last_block = indexer.run_once()
+        print(f"catch-up to block {last_block} in {time.perf_counter() - start:.2f}s  {indexer.stats()}")
+
+        wallets = [user["address"] for user in indexer.users(limit=500)]
+        if not wallets:
+            print("no mints indexed, mint some first")
+            return
+        wallet = max(wallets, key=indexer.nft_count)
+
+        timed("rpc getAllUsers", args.reads, contract.functions.getAllUsers().call)
+        timed("index /users", args.reads, lambda: indexer.users(0, 50))
+        timed("rpc getNFTs", args.reads, contract.functions.getNFTs(wallet).call)
+        timed("index /nfts/{wallet}", args.reads, lambda: indexer.nfts(wallet, 0, 50))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545")
+    parser.add_argument("--contract", required=True)
+    parser.add_argument("--reads", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,128 @@
+"""
+Fuzz corpus of the defects seen in model output, parsed with the previous regex + json.loads
+extraction and with jsonExtract.parse_feedback. Every failed parse is an LLM call that has to be retried.
+
+    python benchmarks/json_repair.py --samples 2000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonExtract import JSONExtractionError, extraction_stats, parse_feedback
+
+BASE = {
+    "fun pun": "Your birds flew like Nader's deploy scripts: fast, loud and mostly on target",
+    "gamer match/ doppleganger": "Nader Dabit",
+    "overall performance": "Strong finish",
+    "Personalized Feeds": [{
+        "rewards earned": 7,
+        "user reputation": "Rising star",
+        "percentile": "82",
+        "onchain footprints": "3",
+        "game genres": ["Arcade", "Puzzle"],
+    }],
+    "game download links": "https://example.com/angry-birds",
+    "estimated rewards": "4200",
+    "accuracy": "0.66",
+    "overall_benefit": "Keep targeting the tower base",
+    "recommended games for esports players": [{
+        "game scope": "8",
+        "game popularity": "7",
+        "game benefits in terms of money and tournaments": "Weekly tournaments",
+    }],
+}
+
+
+def fenced(text):
+    return f"Here is your analysis:\n```json\n{text}\n```"
+
+
+def trailing_text(text):
+    return text + "\n\nNote: the rewards above are estimates and {may} change."
+
+
+def single_quotes(text):
+    return json.dumps(BASE).replace('"', "'").replace("Nader's", "Nader\\'s")
+
+
+def list_of_pairs(text):
+    # the shape the prompt's own "Required JSON Structure" asks for
+    games = BASE["recommended games for esports players"] * 2
+    pairs = ", ".join(f'{json.dumps(k)}: {json.dumps(v)}' for game in games for k, v in game.items())
+    return text.replace(json.dumps(games[:1]), f"[{pairs}]")
+
+
+def comments(text):
+    return text.replace('"rewards earned": 7,', '"rewards earned": 7, # value between 0 and 10\n')
+
+
+def python_literals(text):
+    return text[:-1] + ', "verified": True, "team": None}'
+
+
+def trailing_commas(text):
+    return text.replace("]}", "],}").replace('"Puzzle"]', '"Puzzle",]')
+
+
+def truncated(text):
+    return text[:int(len(text) * random.uniform(0.75, 0.98))]
+
+
+MUTATIONS = [fenced, trailing_text, single_quotes, list_of_pairs, comments, python_literals, trailing_commas, truncated]
+
+
+def legacy_parse(data: str):
+    match = re.search(r'```(.*?)```', data, re.DOTALL)
+    if match:
+        json_data = match.group(1).strip()
+    else:
+        json_data = data.strip('```json').strip('```')
+    json_data = json_data.strip('```json').strip('```')
+    parsed = json.loads(json_data)
+    parsed["Personalized Feeds"][0]["rewards earned"]
+    return parsed
+
+
+def main(args):
+    random.seed(args.seed)
+    base = json.dumps(BASE)
+    results = {}
+    for _ in range(args.samples):
+        chosen = random.sample(MUTATIONS, k=random.randint(1, 3))
+        text = base
+        for mutation in sorted(chosen, key=MUTATIONS.index):
+            text = mutation(text)
+        for name, parser in (("legacy", legacy_parse), ("repair", parse_feedback)):
+            start = time.perf_counter()
+            try:
+                parser(text)
+                ok = True
+            except (ValueError, KeyError, IndexError, TypeError, JSONExtractionError):
+                ok = False
+            elapsed = time.perf_counter() - start
+            for mutation in chosen:
+                stats = results.setdefault((mutation.__name__, name), [0, 0, 0.0])
+                stats[0] += ok
+                stats[1] += 1
+                stats[2] += elapsed
+
+    print(f"{'defect':<16} {'legacy ok':>10} {'repair ok':>10} {'repair us':>10}")
+    for mutation in MUTATIONS:
+        legacy = results.get((mutation.__name__, "legacy"), [0, 1, 0])
+        repair = results.get((mutation.__name__, "repair"), [0, 1, 0])
+        print(f"{mutation.__name__:<16} {legacy[0] / legacy[1]:>10.1%} {repair[0] / repair[1]:>10.1%} "
+              f"{repair[2] / repair[1] * 1e6:>10.1f}")
+    print(extraction_stats.snapshot())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,68 @@
+"""
+Concurrent p50/p99 latency of the LLM client against a local stub completion server.
+
+    python benchmarks/llm_concurrency.py --requests 200 --delay 0.2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# these benchmarks measure the client against a local stub, not the production Gaia budget
+os.environ.setdefault("RATE_LIMIT_GAIA_RPS", "100000")
+os.environ.setdefault("RATE_LIMIT_GAIA_BURST", "100000")
+
+from llmClient import LLMClient
+from stub_server import StubServer, create_stub_app
+
+MESSAGES = [{"role": "user", "content": "benchmark"}]
+
+
+def percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def blocking_call(url: str):
+    # the previous implementation: requests.post inside an async def
+    response = requests.post(url, json={"messages": MESSAGES, "model": "stub"})
+    return response.json()['choices'][0]['message']['content']
+
+
+async def run(label: str, call, total: int):
+    # every client arrives at the same time, so latency includes time spent waiting behind other requests
+    latencies = []
+    start = time.perf_counter()
+
+    async def timed():
+        await call()
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(timed() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} total={elapsed:.2f}s  p50={statistics.median(latencies) * 1000:.1f}ms  "
+          f"p99={percentile(latencies, 99) * 1000:.1f}ms  rps={total / elapsed:.1f}")
+
+
+async def main(args):
+    with StubServer(create_stub_app(delay=args.delay), port=args.port) as server:
+        await run("requests", lambda: blocking_call(server.url), args.requests)
+        client = LLMClient(url=server.url, max_connections=args.connections, max_concurrency=args.concurrency)
+        await run("pooled", lambda: client.chat_completion(MESSAGES), args.requests)
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
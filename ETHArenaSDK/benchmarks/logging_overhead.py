@@ -0,0 +1,43 @@
+"""
+Per-call cost of the old `print(data)` on every frame versus a queued, sampled logging call.
+Both paths write to a real pipe, as they do under uvicorn or a process manager:
+
+    python benchmarks/logging_overhead.py --calls 20000 2>&1 | tail -2
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.session_load import make_frame
+from telemetry import setup_logging, stop_logging
+
+
+def main(args):
+    frame = make_frame(bricks=40)
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        print(frame)
+    printed = time.perf_counter() - start
+
+    setup_logging(level="INFO", sample_rate=args.sample_rate)
+    logger = logging.getLogger("bench")
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        logger.info("Frame received", extra={"wallet": "0xabc", "payload": frame})
+    logged = time.perf_counter() - start
+
+    stop_logging()
+    print(f"print(data)      {printed / args.calls * 1e6:8.1f} us/call")
+    print(f"queued logging   {logged / args.calls * 1e6:8.1f} us/call  (payload sample rate {args.sample_rate})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    main(parser.parse_args())
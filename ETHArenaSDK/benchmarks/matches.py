@@ -0,0 +1,95 @@
+"""
+Synthetic matches in the GameData format the Unity game sends (see matchRecorder.py), and recordings of them.
+They carry the frames GameManager.cs logs: Start when the level loads and again on the tap that starts the
+match, one Playing frame after each bird comes to rest (pigs it hit are Destroyed, bricks it hit may still
+be moving) and a final Won, once every pig is destroyed, or Lost when the birds run out.
+
+    python benchmarks/matches.py --matches 1000 --out synthetic.ndjson.gz
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matchRecorder import read_matches, write_matches
+
+SLINGSHOT = (-6.0, -1.0)
+
+
+def synthetic_match(rng: random.Random = random, birds: int = 3, pigs: int = 3, bricks: int = 20) -> list:
+    bird_positions = [[-8.0 - i, -3.0] for i in range(birds)]
+    pig_positions = [[6.0 + i * 1.2, -2.0] for i in range(pigs)]
+    pigs_alive = [True] * pigs
+    brick_positions = [[5.0 + (i % 5) * 1.1, -3.0 + (i // 5) * 0.8] for i in range(bricks)]
+    frames = []
+
+    def frame(state: str, slingshot_state: str, moving: set = ()):
+        frames.append({
+            "currentGameState": state,
+            "birds": [
+                {"position": {"x": round(x, 3), "y": round(y, 3)}, "state": "Idle"}
+                for x, y in bird_positions
+            ],
+            "pigs": [
+                {"position": {"x": round(x, 3), "y": round(y, 3)} if alive else {"x": 0.0, "y": 0.0},
+                 "state": "Alive" if alive else "Destroyed"}
+                for (x, y), alive in zip(pig_positions, pigs_alive)
+            ],
+            "bricks": [
+                {"position": {"x": round(x, 3), "y": round(y, 3)}, "state": "Moving" if i in moving else "Idle"}
+                for i, (x, y) in enumerate(brick_positions)
+            ],
+            "slingshot": {"birdToThrow": "Bird" if bird_positions else "None", "slingshotState": slingshot_state},
+        })
+
+    # GameManager.Start, then the tap that sends the first bird to the slingshot
+    frame("Start", "Idle")
+    frame("Start", "Idle")
+    slingshot_state = "Idle"
+    while bird_positions and any(pigs_alive):
+        # the bird lands where it was aimed, the structure around it takes the hit
+        target = rng.uniform(3.0, 11.0)
+        bird_positions[0] = [target, -3.0]
+        hit = [i for i, (x, _) in enumerate(brick_positions) if abs(x - target) < 1.5]
+        for i in hit:
+            brick_positions[i][0] += rng.uniform(-0.5, 0.5)
+            brick_positions[i][1] = max(-3.0, brick_positions[i][1] - rng.uniform(0, 0.8))
+        for i, (x, _) in enumerate(pig_positions):
+            if pigs_alive[i] and abs(x - target) < 1.5 and rng.random() < 0.8:
+                pigs_alive[i] = False
+        # logged once the bird stopped moving (or after 5s, so hit bricks may still be moving)
+        slingshot_state = "BirdFlying"
+        frame("Playing", slingshot_state, moving=set(hit))
+        bird_positions.pop(0)
+    # logged on the tap that restarts the level
+    frame("Won" if not any(pigs_alive) else "Lost", slingshot_state)
+    return frames
+
+
+def synthetic_matches(count: int, seed: int = 0, **options) -> list:
+    rng = random.Random(seed)
+    return [synthetic_match(rng, **options) for _ in range(count)]
+
+
+def load_matches(path: str = None, count: int = 1000, seed: int = 0) -> list:
+    """
+    `count` matches from the recording at `path`, reused round robin, or synthetic ones without a path
+    """
+    if path is None:
+        return synthetic_matches(count, seed)
+    recorded = read_matches(path)
+    return [recorded[i % len(recorded)] for i in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bricks", type=int, default=20)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    matches = synthetic_matches(args.matches, args.seed, bricks=args.bricks)
+    write_matches(args.out, matches)
+    print(f"{len(matches)} matches, {sum(map(len, matches))} frames written to {args.out}")
@@ -0,0 +1,79 @@
+"""
+Prompt size and end-to-end latency of sending raw frames versus the analytics summary to the LLM.
+
+    python benchmarks/prompt_size.py --frames 50 --per-token-delay 0.0005
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# these benchmarks measure the client against a local stub, not the production Gaia budget
+os.environ.setdefault("RATE_LIMIT_GAIA_RPS", "100000")
+os.environ.setdefault("RATE_LIMIT_GAIA_BURST", "100000")
+
+from analytics import summarize_match
+from llmClient import LLMClient
+from sessionStore import encode_frame
+from stub_server import StubServer, create_stub_app
+
+
+def synthetic_match(frames: int, birds: int = 3, pigs: int = 3, bricks: int = 20) -> list:
+    def objects(count, alive_state, dead_state, dead):
+        return [
+            {"position": {"x": random.uniform(-8, 12), "y": random.uniform(-3, 4)}, "state": dead_state if i < dead else alive_state}
+            for i in range(count)
+        ]
+
+    match = []
+    for i in range(frames):
+        state = "Start" if i == 0 else "Won" if i == frames - 1 else "Playing"
+        destroyed = min(pigs, i * pigs // max(1, frames - 1))
+        match.append({
+            "currentGameState": state,
+            "birds": objects(birds, "Idle", "Moving", 0),
+            "pigs": objects(pigs, "Alive", "Destroyed", destroyed),
+            "bricks": objects(max(1, bricks - i // 2), "Idle", "Moving", 0),
+            "slingshot": {"birdToThrow": "Bird", "slingshotState": "Idle"},
+        })
+    return match
+
+
+async def timed_completion(client: LLMClient, rag_doc: str, repeats: int) -> float:
+    messages = [{"role": "user", "content": f"From the given data of game movements: {rag_doc}. Answer this : feedback"}]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        await client.chat_completion(messages)
+    return (time.perf_counter() - start) / repeats
+
+
+async def main(args):
+    match = synthetic_match(args.frames)
+    records = [encode_frame(frame, timestamp=i * 2.0) for i, frame in enumerate(match)]
+    start = time.perf_counter()
+    summary = summarize_match(records)
+    summarize_ms = (time.perf_counter() - start) * 1000
+    raw_doc, summary_doc = str(match), str([summary])
+    print(f"raw frames : {len(raw_doc):>8} chars  ~{len(raw_doc) // 4} tokens")
+    print(f"summary    : {len(summary_doc):>8} chars  ~{len(summary_doc) // 4} tokens  (summarized in {summarize_ms:.2f}ms)")
+
+    app = create_stub_app(delay=args.delay, per_token_delay=args.per_token_delay)
+    with StubServer(app, port=args.port) as server:
+        client = LLMClient(url=server.url)
+        raw = await timed_completion(client, raw_doc, args.repeats)
+        compact = await timed_completion(client, summary_doc, args.repeats)
+        await client.aclose()
+    print(f"latency    : raw {raw * 1000:.1f}ms  summary {compact * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.1)
+    parser.add_argument("--per-token-delay", type=float, default=0.0005)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Prompt tokens per request and completion latency for the registry prompts, with documents left as they are
+versus fit into PROMPT_TOKEN_BUDGET, against a stub that does or does not cache the shared system prompt.
+Set PROMPT_TOKENIZER to a tokenizer.json (or hub id) to count with the model's tokenizer instead of estimating.
+
+    python benchmarks/prompt_tokens.py --frames 10 50 200 --budget 4096 --per-token-delay 0.0005
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# these benchmarks measure the client against a local stub, not the production Gaia budget
+os.environ.setdefault("RATE_LIMIT_GAIA_RPS", "100000")
+os.environ.setdefault("RATE_LIMIT_GAIA_BURST", "100000")
+
+from llmClient import LLMClient
+from prompts import PromptRegistry, TokenCounter
+from prompt_size import synthetic_match
+from stub_server import StubServer, create_stub_app
+
+PROMPT = "Give me a detailed and personalized feeedback on my Gameplay"
+
+
+async def run(args, prompts: PromptRegistry, match: list, fit: bool, prefix_cache: bool, port: int) -> tuple:
+    app = create_stub_app(delay=args.delay, per_token_delay=args.per_token_delay, prefix_cache=prefix_cache)
+    with StubServer(app, port=port) as server:
+        client = LLMClient(url=server.url)
+        tokens = 0
+        start = time.perf_counter()
+        for i in range(args.repeats):
+            # alternate the two templates the server sends most, each with its own system prompt
+            if i % 2:
+                messages = prompts.messages("query", system="query_system", prompt=PROMPT)
+            else:
+                rag_doc = prompts.fit("gameplay_feedback", "rag_doc", match, system="gameplay_feedback_system",
+                                      prompt=PROMPT) if fit else str(match)
+                messages = prompts.messages("gameplay_feedback", system="gameplay_feedback_system", rag_doc=rag_doc,
+                                            prompt=PROMPT)
+            tokens += sum(prompts.counter.count(message["content"]) for message in messages)
+            await client.chat_completion(messages)
+        elapsed = time.perf_counter() - start
+        await client.aclose()
+        return tokens / args.repeats, app.state.prompt_tokens / args.repeats, elapsed / args.repeats
+
+
+async def main(args):
+    prompts = PromptRegistry(counter=TokenCounter(os.environ.get("PROMPT_TOKENIZER")), budget=args.budget)
+    print(f"tokenizer={prompts.stats()['tokenizer']} budget={args.budget} "
+          f"system prompt={prompts.system('gameplay_feedback_system')[1]} tokens")
+    print(f"{'frames':>7} {'documents':<10} {'prefix cache':<13} {'prompt tokens':>14} {'processed':>10} {'latency':>9}")
+    port = args.port
+    for frames in args.frames:
+        match = synthetic_match(frames)
+        for fit in (False, True):
+            for prefix_cache in (False, True):
+                sent, processed, latency = await run(args, prompts, match, fit, prefix_cache, port)
+                port += 1
+                print(f"{frames:>7} {'fit' if fit else 'as is':<10} {'on' if prefix_cache else 'off':<13} "
+                      f"{sent:>14.0f} {processed:>10.0f} {latency * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--budget", type=int, default=4096)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--per-token-delay", type=float, default=0.0005)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8770)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,205 @@
+"""
+Replays recorded or synthetic matches against /getUserData of a server whose LLM, image and chain
+backends are all stubbed, and reports frame throughput, latency percentiles, game-over completion time
+and server memory. Each match posts its frames back to back; `--concurrency` matches run at once.
+
+    python benchmarks/matches.py --matches 2000 --out synthetic.ndjson.gz
+    python benchmarks/replay.py --recording synthetic.ndjson.gz --matches 2000 --save baseline.json
+    python benchmarks/replay.py --recording synthetic.ndjson.gz --matches 2000 --baseline baseline.json
+
+With `--baseline` the run fails (exit code 1) when throughput drops, or p99 latency or peak memory grow,
+by more than `--tolerance` compared to the saved run: a regression gate for changes to the SDK.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from matches import load_matches
+from stub_server import StubServer, create_stub_app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEEDBACK = json.dumps({
+    "fun pun": "You aimed like Kartik schedules hackathons: everywhere at once",
+    "gamer match/ doppleganger": "Kartik Talwar",
+    "overall performance": "Solid",
+    "Personalized Feeds": [{"rewards earned": 7, "user reputation": "Rising", "percentile": "80",
+                            "onchain footprints": "3", "game genres": ["Arcade"]}],
+    "game download links": "https://example.com",
+    "estimated rewards": "5000",
+    "accuracy": "0.66",
+    "overall_benefit": "Keep aiming for the towers",
+    "recommended games for esports players": [],
+})
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+
+def peak_rss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def start_server(args, directory: str, llm_url: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GAIA_URL": llm_url,
+        "GAIA_URLS": "",
+        "RATE_LIMIT_GAIA_RPS": "100000",
+        "RATE_LIMIT_GAIA_BURST": "100000",
+        "ARTWORK_GENERATOR": "stub",
+        "ARTWORK_DIR": os.path.join(directory, "artwork"),
+        "INDEXER_ENABLED": "false",
+        "INDEXER_DB_PATH": os.path.join(directory, "index.db"),
+        "JOB_DB_PATH": os.path.join(directory, "jobs.db"),
+        "SESSION_DB_PATH": os.path.join(directory, "sessions.db"),
+        "RESPONSE_STORE_PATH": os.path.join(directory, "responses.db"),
+        "SIGNER_LOCK_PATH": os.path.join(directory, "signer.lock"),
+        "MATCH_RECORD_PATH": "",
+        "LOG_LEVEL": "WARNING",
+    }
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "replay_server.py"), "--port", str(args.port),
+         "--block-time", str(args.block_time)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/", timeout=1).status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError("server did not start")
+
+
+async def replay(args, matches: list) -> dict:
+    url = f"http://127.0.0.1:{args.port}"
+    latencies = []
+    jobs = []
+    errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def play(http: httpx.AsyncClient, wallet: str, frames: list):
+        nonlocal errors
+        async with semaphore:
+            for frame in frames:
+                start = time.perf_counter()
+                response = await http.post(f"{url}/getUserData", params={"walletAddress": wallet}, json=frame)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                body = response.json()
+                if "job_id" in body:
+                    jobs.append((body["job_id"], time.perf_counter()))
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(play(http, f"0x{i:040x}", frames) for i, frames in enumerate(matches)))
+        elapsed = time.perf_counter() - start
+
+        completions = []
+        failed = 0
+        if args.wait_jobs:
+            pending = dict(jobs)
+            deadline = time.time() + args.job_timeout
+            while pending and time.time() < deadline:
+                for job_id, enqueued_at in list(pending.items()):
+                    job = (await http.get(f"{url}/jobs/{job_id}")).json()
+                    if job["status"] in ("succeeded", "failed"):
+                        failed += job["status"] == "failed"
+                        completions.append(time.perf_counter() - enqueued_at)
+                        del pending[job_id]
+                await asyncio.sleep(0.2)
+            failed += len(pending)
+        stats = (await http.get(f"{url}/stats")).json()
+
+    latencies.sort()
+    completions.sort()
+    return {
+        "matches": len(matches),
+        "frames": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "frames_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "game_overs": len(jobs),
+        "jobs_failed": failed,
+        "game_over_p50_s": round(percentile(completions, 0.5), 2) if completions else None,
+        "game_over_p99_s": round(percentile(completions, 0.99), 2) if completions else None,
+        "rss_bytes": stats["sessions"]["rss_bytes"],
+    }
+
+
+def regressions(result: dict, baseline: dict, tolerance: float) -> list:
+    checks = [
+        ("frames_per_s", result["frames_per_s"] < baseline["frames_per_s"] * (1 - tolerance)),
+        ("p99_ms", result["p99_ms"] > baseline["p99_ms"] * (1 + tolerance)),
+        ("peak_rss_bytes", result["peak_rss_bytes"] > baseline["peak_rss_bytes"] * (1 + tolerance)),
+    ]
+    return [f"{name}: {baseline[name]} -> {result[name]}" for name, regressed in checks if regressed]
+
+
+def main(args):
+    matches = load_matches(args.recording, args.matches, args.seed)
+    app = create_stub_app(delay=args.llm_delay, content=FEEDBACK)
+    with StubServer(app, port=args.llm_port) as llm, tempfile.TemporaryDirectory() as directory:
+        server = start_server(args, directory, llm.url)
+        try:
+            result = asyncio.run(replay(args, matches))
+            result["peak_rss_bytes"] = peak_rss(server.pid)
+            result["llm_calls"] = app.state.calls
+        finally:
+            server.terminate()
+            server.wait()
+
+    for key, value in result.items():
+        print(f"{key:<18} {value}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = regressions(result, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recording", default=None, help="recording from MATCH_RECORD_PATH, synthetic matches if unset")
+    parser.add_argument("--matches", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-delay", type=float, default=0.2)
+    parser.add_argument("--block-time", type=float, default=1.0)
+    parser.add_argument("--wait-jobs", action="store_true", help="also wait for every game-over job to finish")
+    parser.add_argument("--job-timeout", type=float, default=600)
+    parser.add_argument("--save", default=None, help="write the result here, to be used as a baseline")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--llm-port", type=int, default=8791)
+    parser.add_argument("--verbose", action="store_true")
+    main(parser.parse_args())
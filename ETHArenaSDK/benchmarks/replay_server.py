@@ -0,0 +1,24 @@
+"""
+The SDK server with the chain replaced by StubTransactionManager, started by replay.py.
+The LLM and image backends are stubbed through the environment (GAIA_URL, ARTWORK_GENERATOR=stub).
+
+    python benchmarks/replay_server.py --port 8790 --block-time 1
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+
+import main
+from stub_server import StubTransactionManager
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--block-time", type=float, default=1.0)
+    args = parser.parse_args()
+    main._tx_manager = StubTransactionManager(args.block_time)
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,65 @@
+"""
+Simulates many concurrent Unity clients posting frames to /getUserData and reports
+latency, session count and RSS from /stats. Frames never reach Won/Lost, so no LLM or chain calls are made.
+
+    python benchmarks/session_load.py --url http://localhost:8000 --clients 2000 --frames 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+
+def make_frame(birds: int = 3, pigs: int = 3, bricks: int = 12) -> dict:
+    def objects(count, states):
+        return [
+            {"position": {"x": random.uniform(-10, 10), "y": random.uniform(-4, 4)}, "state": random.choice(states)}
+            for _ in range(count)
+        ]
+
+    return {
+        "currentGameState": "Playing",
+        "birds": objects(birds, ["Moving", "Idle"]),
+        "pigs": objects(pigs, ["Alive", "Destroyed"]),
+        "bricks": objects(bricks, ["Moving", "Idle"]),
+        "slingshot": {"birdToThrow": "Bird", "slingshotState": "Idle"},
+    }
+
+
+async def client(http: httpx.AsyncClient, url: str, wallet: str, frames: int, latencies: list):
+    for _ in range(frames):
+        start = time.perf_counter()
+        response = await http.post(f"{url}/getUserData", params={"walletAddress": wallet}, json=make_frame())
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def main(args):
+    latencies = []
+    limits = httpx.Limits(max_connections=args.connections)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        before = (await http.get(f"{args.url}/stats")).json()["sessions"]
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client(http, args.url, f"0x{i:040x}", args.frames, latencies) for i in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - start
+        after = (await http.get(f"{args.url}/stats")).json()["sessions"]
+
+    latencies.sort()
+    print(f"frames={len(latencies)} elapsed={elapsed:.2f}s fps={len(latencies) / elapsed:.1f}")
+    print(f"p50={statistics.median(latencies) * 1000:.1f}ms p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+    print(f"sessions {before['sessions']} -> {after['sessions']}, buffered {after['buffered_bytes']} bytes")
+    print(f"rss {before['rss_bytes'] / 2**20:.1f}MiB -> {after['rss_bytes'] / 2**20:.1f}MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--connections", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,64 @@
+"""
+Cold start of the SDK server: `import main` time and time-to-first-request of a fresh uvicorn process.
+Each run is a new interpreter, so the numbers include every import and module level side effect.
+Prints one JSON line per release to track, e.g.
+
+    python benchmarks/startup.py --runs 5 >> startup_history.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+
+
+def import_time() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_to_first_request(port: int, timeout: float = 60.0) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                time.sleep(0.01)
+        raise TimeoutError(f"server did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args):
+    imports = [import_time() for _ in range(args.runs)]
+    first_requests = [time_to_first_request(args.port) for _ in range(args.runs)]
+    print(json.dumps({
+        "ts": time.time(),
+        "runs": args.runs,
+        "import_s": round(statistics.median(imports), 3),
+        "time_to_first_request_s": round(statistics.median(first_requests), 3),
+    }))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    main(parser.parse_args())
@@ -0,0 +1,92 @@
+"""
+Replays matches against a running server through one POST per frame and through the
+WebSocket delta stream, and reports frames/sec and bytes sent for each path.
+
+    python benchmarks/stream_ingest.py --url http://localhost:8000 --matches 50 --frames 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frameStream import encode_delta
+
+
+def replay_match(frames: int, birds: int = 3, pigs: int = 3, bricks: int = 20, moving: int = 3) -> list:
+    """
+    Synthetic match in which only a handful of objects move between consecutive snapshots
+    """
+    def obj(x, y, state):
+        return {"position": {"x": x, "y": y}, "state": state}
+
+    frame = {
+        "currentGameState": "Playing",
+        "birds": [obj(-8.0 + i, -3.0, "Idle") for i in range(birds)],
+        "pigs": [obj(6.0 + i, -2.0, "Alive") for i in range(pigs)],
+        "bricks": [obj(5.0 + i % 5, -3.0 + i // 5, "Idle") for i in range(bricks)],
+        "slingshot": {"birdToThrow": "Bird", "slingshotState": "Idle"},
+    }
+    match = []
+    for _ in range(frames):
+        frame = json.loads(json.dumps(frame))
+        for kind in random.sample(["birds", "bricks", "bricks"], k=min(3, moving)):
+            target = random.choice(frame[kind])
+            target["position"]["x"] += random.uniform(-0.5, 0.5)
+            target["position"]["y"] += random.uniform(-0.5, 0.5)
+            target["state"] = "Moving"
+        match.append(frame)
+    return match
+
+
+async def post_frames(http: httpx.AsyncClient, url: str, wallet: str, match: list) -> int:
+    sent = 0
+    for frame in match:
+        body = json.dumps(frame).encode()
+        sent += len(body)
+        response = await http.post(f"{url}/getUserData", params={"walletAddress": wallet}, content=body,
+                                   headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+    return sent
+
+
+async def stream_frames(url: str, wallet: str, match: list) -> int:
+    sent, previous = 0, None
+    ws_url = url.replace("http", "ws", 1) + f"/ws/getUserData?walletAddress={wallet}"
+    async with websockets.connect(ws_url) as ws:
+        for frame in match:
+            message = json.dumps(encode_delta(previous, frame), separators=(",", ":"))
+            sent += len(message)
+            await ws.send(message)
+            previous = frame
+    return sent
+
+
+async def run(label: str, calls: list, total_frames: int):
+    start = time.perf_counter()
+    sent = sum(await asyncio.gather(*calls))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {total_frames / elapsed:>9.1f} frames/s  {sent / total_frames:>8.1f} bytes/frame  {elapsed:.2f}s")
+
+
+async def main(args):
+    matches = [replay_match(args.frames) for _ in range(args.matches)]
+    total = args.matches * args.frames
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=args.matches), timeout=60) as http:
+        await run("POST", [post_frames(http, args.url, f"0x{i:040x}", m) for i, m in enumerate(matches)], total)
+    await run("websocket", [stream_frames(args.url, f"0x{i + args.matches:040x}", m) for i, m in enumerate(matches)], total)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--matches", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,61 @@
+"""
+Time to first token of a streamed completion versus waiting for the full completion.
+
+    python benchmarks/stream_ttfb.py --generation-delay 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# these benchmarks measure the client against a local stub, not the production Gaia budget
+os.environ.setdefault("RATE_LIMIT_GAIA_RPS", "100000")
+os.environ.setdefault("RATE_LIMIT_GAIA_BURST", "100000")
+
+from jsonExtract import IncrementalJSONExtractor
+from llmClient import LLMClient
+from stub_server import StubServer, create_stub_app
+
+MESSAGES = [{"role": "user", "content": "benchmark"}]
+CONTENT = json.dumps({
+    "fun pun": "You flung birds like Kartik hosts hackathons: everywhere at once",
+    "gamer match/ doppleganger": "Kartik Talwar",
+    "overall performance": "Solid",
+    "Personalized Feeds": [{"rewards earned": 7, "user reputation": "Rising", "percentile": "80",
+                            "onchain footprints": "3", "game genres": ["Arcade"]}],
+    "accuracy": "0.66",
+    "overall_benefit": "Keep aiming for the towers",
+})
+
+
+async def main(args):
+    app = create_stub_app(delay=args.delay, content=CONTENT, generation_delay=args.generation_delay)
+    with StubServer(app, port=args.port) as server:
+        client = LLMClient(url=server.url)
+        start = time.perf_counter()
+        await client.chat_completion(MESSAGES)
+        full = time.perf_counter() - start
+
+        extractor = IncrementalJSONExtractor()
+        first_token = first_field = None
+        start = time.perf_counter()
+        async for token in client.stream_chat_completion(MESSAGES):
+            first_token = first_token or time.perf_counter() - start
+            if extractor.feed(token) and first_field is None:
+                first_field = time.perf_counter() - start
+        streamed = time.perf_counter() - start
+        await client.aclose()
+    print(f"full completion : {full * 1000:.1f}ms")
+    print(f"streamed        : first token {first_token * 1000:.1f}ms, first field {first_field * 1000:.1f}ms, "
+          f"complete {streamed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--generation-delay", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=8767)
+    asyncio.run(main(parser.parse_args()))
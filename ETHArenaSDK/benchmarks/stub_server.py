@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import uvicorn
+from fastapi import FastAPI, Request
+from starlette.requests import ClientDisconnect
+from fastapi.responses import StreamingResponse
+
+
+def create_stub_app(delay: float = 0.2, content: str = '{"fun pun": "stub"}', per_token_delay: float = 0.0,
+                    generation_delay: float = 0.0, prefix_cache: bool = False, tail_fraction: float = 0.0,
+                    tail_delay: float = 0.0):
+    """
+    Minimal OpenAI compatible completion server used by the benchmarks.
+    With `prefix_cache` a system message it has already seen costs no prompt processing time,
+    like upstreams that reuse the KV cache of a shared prompt prefix.
+    A `tail_fraction` of the requests take `tail_delay` seconds longer, like a node stalling now and then.
+    """
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.prompt_tokens = 0
+    prefixes = set()
+
+    async def stream():
+        for start in range(0, len(content), 4):
+            chunk = {"choices": [{"delta": {"content": content[start:start + 4]}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(generation_delay)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        try:
+            body = await request.json()
+        except ClientDisconnect:
+            # a hedged request that lost the race
+            return None
+        app.state.calls += 1
+        # prompt processing time grows with prompt length, roughly 4 characters per token
+        messages = body["messages"]
+        if prefix_cache and messages[0]["role"] == "system":
+            if messages[0]["content"] in prefixes:
+                messages = messages[1:]
+            else:
+                prefixes.add(messages[0]["content"])
+        prompt_tokens = sum(len(message["content"]) for message in messages) / 4
+        app.state.prompt_tokens += prompt_tokens
+        stall = tail_delay if random.random() < tail_fraction else 0.0
+        await asyncio.sleep(delay + stall + prompt_tokens * per_token_delay)
+        if body.get("stream"):
+            return StreamingResponse(stream(), media_type="text/event-stream")
+        await asyncio.sleep(generation_delay * len(content) / 4)
+        return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+    return app
+
+
+class StubServer:
+    def __init__(self, app, port: int = 8765):
+        self.app = app
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}/v1/chat/completions"
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+class TxHash(bytes):
+    # the HexBytes of web3 receipts
+    def hex(self) -> str:
+        return "0x" + super().hex()
+
+
+class StubTransactionManager:
+    """
+    Stands in for TransactionManager without a chain: every submitted transaction is mined `block_time` seconds later
+    """
+
+    def __init__(self, block_time: float = 1.0):
+        self.block_time = block_time
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.sent = 0
+        self.confirmed = 0
+
+    def submit(self, fn_name: str, *args, on_signed=None) -> str:
+        with self.lock:
+            self.sent += 1
+            nonce = self.sent - 1
+            tx_hash = "0x" + hashlib.sha256(f"{fn_name}:{self.sent}".encode()).hexdigest()
+            future = self.futures[tx_hash] = Future()
+        if on_signed is not None:
+            on_signed(tx_hash, nonce)
+        timer = threading.Timer(self.block_time, self._mine, (tx_hash, future))
+        timer.daemon = True
+        timer.start()
+        return tx_hash
+
+    def resume(self, fn_name: str, *args, hashes: list, nonce: int, on_signed=None) -> str:
+        with self.lock:
+            if hashes[-1] in self.futures:
+                return hashes[-1]
+        return self.submit(fn_name, *args, on_signed=on_signed)
+
+    def _mine(self, tx_hash: str, future: Future):
+        with self.lock:
+            self.confirmed += 1
+            block = self.confirmed
+        future.set_result(SimpleNamespace(blockNumber=block, status=1, transactionHash=TxHash.fromhex(tx_hash[2:])))
+
+    def future(self, tx_hash: str) -> Future:
+        with self.lock:
+            return self.futures[tx_hash]
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "confirmed": self.confirmed, "failed": 0, "pending": self.sent - self.confirmed}
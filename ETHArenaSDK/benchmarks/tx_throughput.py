@@ -0,0 +1,106 @@
+"""
+Mint throughput (tx/s), RPC round-trips and fees per mint of the naive per-call path versus TransactionManager.
+Round-trips are split into those made by the sending thread and by the background receipt/fee pollers.
+Run against a local node with BaseArena deployed, e.g. `npx hardhat node` + `npx hardhat ignition deploy`
+in Exportedcontracts, using one of the funded dev accounts:
+
+    python benchmarks/tx_throughput.py --rpc http://127.0.0.1:8545 --contract 0x... --key 0x... --count 100
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from eth_account import Account
+from web3 import Web3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from txManager import TransactionManager
+
+
+def count_rpc(counts: dict):
+    def middleware(make_request, w3):
+        def request(method, params):
+            counts["send" if threading.current_thread() is threading.main_thread() else "background"][method] += 1
+            return make_request(method, params)
+        return request
+    return middleware
+
+
+def fees_paid(w3, tx_hashes: list) -> int:
+    return sum(
+        receipt.gasUsed * receipt.effectiveGasPrice
+        for receipt in (w3.eth.get_transaction_receipt(tx_hash) for tx_hash in tx_hashes)
+    )
+
+
+def report(name: str, count: int, elapsed: float, counts: dict, fees: int):
+    print(f"{name:<8} {count} mints in {elapsed:.2f}s  {count / elapsed:.1f} tx/s  fees {fees / count / 1e9:.1f} gwei*gas/mint")
+    for kind in ("send", "background"):
+        calls = counts[kind]
+        per_mint = ", ".join(f"{method} {n / count:.2f}" for method, n in calls.most_common())
+        print(f"{'':<8} {kind} RPCs/mint {sum(calls.values()) / count:.2f}: {per_mint}")
+
+
+def naive_mint(w3, contract, account, i):
+    # the previous mint_onchain: nonce, estimate and gas price lookups plus a receipt wait per mint
+    fn = contract.functions.safeMint(i % 10, "ipfs://bench", "ipfs://bench", account.address)
+    gas_limit = int(fn.estimate_gas({"from": account.address}) * 1.3)
+    tx = fn.build_transaction({
+        "from": account.address,
+        "gas": gas_limit,
+        "gasPrice": w3.eth.gas_price,
+        "nonce": w3.eth.get_transaction_count(account.address),
+    })
+    tx_hash = w3.eth.send_raw_transaction(account.sign_transaction(tx).rawTransaction)
+    w3.eth.wait_for_transaction_receipt(tx_hash)
+    return tx_hash
+
+
+def run(w3, contract, account, count: int):
+    counts = {"send": Counter(), "background": Counter()}
+    w3.middleware_onion.add(count_rpc(counts), "count_rpc")
+
+    start = time.perf_counter()
+    hashes = [naive_mint(w3, contract, account, i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    calls = {kind: Counter(methods) for kind, methods in counts.items()}
+    report("naive", count, elapsed, calls, fees_paid(w3, hashes))
+
+    for methods in counts.values():
+        methods.clear()
+    manager = TransactionManager(w3, contract, account, poll_interval=0.1)
+    manager.start()
+    start = time.perf_counter()
+    hashes = manager.submit_many([
+        ("safeMint", i % 10, "ipfs://bench", "ipfs://bench", account.address) for i in range(count)
+    ])
+    for tx_hash in hashes:
+        manager.wait(tx_hash, timeout=120)
+    elapsed = time.perf_counter() - start
+    manager.stop()
+    calls = {kind: Counter(methods) for kind, methods in counts.items()}
+    report("managed", count, elapsed, calls, fees_paid(w3, hashes))
+    print(f"{'':<8} {manager.stats()}")
+
+
+def main(args):
+    w3 = Web3(Web3.HTTPProvider(args.rpc))
+    with open(os.path.join(ROOT, "contracts", "BaseArena.json")) as f:
+        abi = json.load(f)["abi"]
+    contract = w3.eth.contract(address=args.contract, abi=abi)
+    run(w3, contract, Account.from_key(args.key), args.count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545")
+    parser.add_argument("--contract", required=True)
+    parser.add_argument("--key", required=True)
+    parser.add_argument("--count", type=int, default=100)
+    main(parser.parse_args())
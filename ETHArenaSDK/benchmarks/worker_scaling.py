@@ -0,0 +1,116 @@
+"""
+Frame ingest throughput of `uvicorn main:app --workers N` for several N, with in-progress matches kept in the
+shared SQLite session store. Load comes from several client processes, each replaying matches against the server;
+only the Playing frames are sent, so no LLM or chain calls are made.
+Matches are synthetic unless `--recording` points at a recording (MATCH_RECORD_PATH, see matchRecorder.py).
+
+    python benchmarks/worker_scaling.py --workers 1 2 4 8 --client-processes 4 --matches 400
+
+Throughput can only grow with the worker count up to the number of cores, which is printed alongside.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from matches import load_matches
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int, directory: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SESSION_STORE": "sqlite",
+        "SESSION_DB_PATH": os.path.join(directory, "sessions.db"),
+        "JOB_DB_PATH": os.path.join(directory, "jobs.db"),
+        "INDEXER_DB_PATH": os.path.join(directory, "index.db"),
+        "RESPONSE_STORE_PATH": os.path.join(directory, "responses.db"),
+        "SIGNER_LOCK_PATH": os.path.join(directory, "signer.lock"),
+        "ARTWORK_GENERATOR": "stub",
+        "ARTWORK_DIR": os.path.join(directory, "artwork"),
+        "LOG_LEVEL": "WARNING",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                # the first worker answers while the others may still be importing
+                time.sleep(2 + workers)
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise TimeoutError("server did not start")
+
+
+async def replay(url: str, matches: list, offset: int, connections: int) -> list:
+    latencies = []
+
+    async def play(http: httpx.AsyncClient, wallet: str, frames: list):
+        for frame in frames:
+            start = time.perf_counter()
+            response = await http.post(f"{url}/getUserData", params={"walletAddress": wallet}, json=frame)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=connections), timeout=60) as http:
+        await asyncio.gather(*(play(http, f"0x{offset + i:040x}", frames) for i, frames in enumerate(matches)))
+    return latencies
+
+
+def client_process(job: tuple) -> list:
+    url, matches, offset, connections = job
+    return asyncio.run(replay(url, matches, offset, connections))
+
+
+def main(args):
+    matches = [
+        [frame for frame in match if frame["currentGameState"] == "Playing"]
+        for match in load_matches(args.recording, args.matches)
+    ]
+    share = -(-len(matches) // args.client_processes)
+    print(f"cores={os.cpu_count()} client_processes={args.client_processes} matches={len(matches)} "
+          f"frames={sum(map(len, matches))}")
+    print(f"{'workers':>8} {'frames/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as directory:
+            server = start_server(workers, args.port, directory)
+            url = f"http://127.0.0.1:{args.port}"
+            jobs = [
+                (url, matches[i:i + share], i, args.connections)
+                for i in range(0, len(matches), share)
+            ]
+            try:
+                with multiprocessing.Pool(len(jobs)) as pool:
+                    start = time.perf_counter()
+                    latencies = sorted(sum(pool.map(client_process, jobs), []))
+                    elapsed = time.perf_counter() - start
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{workers:>8} {len(latencies) / elapsed:>10.1f} {statistics.median(latencies) * 1000:>8.1f} "
+              f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--client-processes", type=int, default=4)
+    parser.add_argument("--matches", type=int, default=400)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--recording", default=None)
+    parser.add_argument("--port", type=int, default=8767)
+    main(parser.parse_args())
@@ -0,0 +1,91 @@
+import json
+import marshal
+import os
+import re
+import threading
+from functools import cached_property
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ABI_PATH = os.path.join(ROOT, "contracts", "BaseArena.json")
+ADDRESS = re.compile(r"0x[0-9a-fA-F]{40}")
+
+
+def is_address(value: str) -> bool:
+    return bool(ADDRESS.fullmatch(value or ""))
+
+
+def load_abi(path: str = ABI_PATH) -> list:
+    """
+    The "abi" of a hardhat artifact. The artifact also carries the bytecode, so the ABI alone is kept
+    in a marshal cache next to it and reused while the artifact's size and mtime are unchanged.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    cache_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.abi")
+    try:
+        with open(cache_path, "rb") as f:
+            cached_stamp, abi = marshal.load(f)
+        if tuple(cached_stamp) == stamp:
+            return abi
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    with open(path) as f:
+        abi = json.load(f)["abi"]
+    try:
+        with open(cache_path, "wb") as f:
+            marshal.dump((stamp, abi), f)
+    except OSError:
+        pass
+    return abi
+
+
+class Chain:
+    """
+    web3, the BaseArena contract and the signing account, each built on first use.
+    Importing the server therefore costs neither the web3/eth_account imports nor an RPC or key check,
+    and a bad BASE_RPC_URL, CONTRACT_ADDRESS or PRIVATE_KEY only fails the calls that need it.
+    """
+
+    def __init__(self, rpc_url: str = None, contract_address: str = None, private_key: str = None,
+                 abi_path: str = ABI_PATH):
+        self.rpc_url = rpc_url
+        self.contract_address = contract_address
+        self.private_key = private_key
+        self.abi_path = abi_path
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            rpc_url=os.environ.get("BASE_RPC_URL"),
+            contract_address=os.environ.get("CONTRACT_ADDRESS"),
+            private_key=os.environ.get("PRIVATE_KEY"),
+        )
+
+    @classmethod
+    def from_objects(cls, w3, contract, account=None):
+        chain = cls()
+        chain.__dict__.update(w3=w3, contract=contract, account=account)
+        return chain
+
+    @cached_property
+    def w3(self):
+        with self.lock:
+            from web3 import Web3
+            from rateLimit import rpc_rate_limit_middleware
+
+            w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+            w3.middleware_onion.add(rpc_rate_limit_middleware, "rpc_rate_limit")
+            return w3
+
+    @cached_property
+    def contract(self):
+        with self.lock:
+            return self.w3.eth.contract(address=self.contract_address, abi=load_abi(self.abi_path))
+
+    @cached_property
+    def account(self):
+        with self.lock:
+            from eth_account import Account
+
+            return Account.from_key(self.private_key)
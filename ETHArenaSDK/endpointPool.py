@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class EndpointUnavailable(Exception):
+    pass
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """
+    Errors that say something about the endpoint (down, slow, overloaded), as opposed to the request itself
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, (httpx.TransportError, EndpointUnavailable))
+
+
+class Endpoint:
+    """
+    One upstream with its latency record and circuit breaker.
+    The breaker opens after `failure_threshold` consecutive failures; after `reset_timeout` seconds a single
+    trial request is let through, which closes it again on success and reopens it on failure.
+    """
+
+    def __init__(self, url: str, api_key: str = None, alpha: float = 0.2, window: int = 200,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.alpha = alpha
+        self.latencies = deque(maxlen=window)
+        self.ewma = None
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.requests = 0
+        self.errors = 0
+
+    def available(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+        return self.state == HALF_OPEN and not self.trial_in_flight
+
+    def begin(self):
+        self.requests += 1
+        if self.state == HALF_OPEN:
+            self.trial_in_flight = True
+
+    def succeeded(self, latency: float = None):
+        if latency is not None:
+            self.latencies.append(latency)
+            self.ewma = latency if self.ewma is None else self.alpha * latency + (1 - self.alpha) * self.ewma
+        self.failures = 0
+        self.trial_in_flight = False
+        if self.state != CLOSED:
+            logger.info("LLM endpoint %s recovered", self.url)
+        self.state = CLOSED
+
+    def failed(self):
+        self.errors += 1
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning("LLM endpoint %s is down, circuit opened for %ss", self.url, self.reset_timeout)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def abandoned(self):
+        # a hedge that lost the race says nothing about the endpoint
+        self.trial_in_flight = False
+
+    def quantile(self, q: float):
+        if len(self.latencies) < 20:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        p95 = self.quantile(0.95)
+        return {
+            "url": self.url,
+            "state": self.state,
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class EndpointPool:
+    """
+    Picks the healthy endpoint with the lowest EWMA latency for each request, fails over to the next one
+    when it errors, and once the request has been outstanding for longer than that endpoint's p95
+    (`hedge_delay` until there are enough samples) sends a hedged copy to the runner-up.
+    The first response wins and the other request is cancelled.
+    `can_hedge` is asked before every hedge, e.g. to keep hedges inside the upstream rate limit.
+    """
+
+    def __init__(self, endpoints: list, hedge: bool = True, hedge_delay: float = 2.0, hedge_quantile: float = 0.95,
+                 min_hedge_delay: float = 0.05, can_hedge=None):
+        self.endpoints = endpoints
+        self.hedge = hedge and len(endpoints) > 1
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+        self.can_hedge = can_hedge or (lambda: True)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def candidates(self) -> list:
+        """
+        Available endpoints, fastest first. Endpoints without samples yet go first so they get measured.
+        When every breaker is open the least recently opened endpoint is tried anyway.
+        """
+        available = [endpoint for endpoint in self.endpoints if endpoint.available()]
+        if not available:
+            return [min(self.endpoints, key=lambda endpoint: endpoint.opened_at)]
+        return sorted(available, key=lambda endpoint: endpoint.ewma or 0.0)
+
+    def delay_for(self, endpoint: Endpoint) -> float:
+        p = endpoint.quantile(self.hedge_quantile)
+        return max(self.min_hedge_delay, p if p is not None else self.hedge_delay)
+
+    async def _attempt(self, endpoint: Endpoint, send):
+        endpoint.begin()
+        start = time.perf_counter()
+        try:
+            result = await send(endpoint)
+        except asyncio.CancelledError:
+            endpoint.abandoned()
+            raise
+        except Exception as e:
+            if is_endpoint_failure(e):
+                endpoint.failed()
+            else:
+                endpoint.abandoned()
+            raise
+        endpoint.succeeded(time.perf_counter() - start)
+        return result
+
+    async def request(self, send):
+        """
+        Result of `await send(endpoint)` from whichever endpoint answers first
+        """
+        self.requests += 1
+        queue = self.candidates()
+        tasks = {}
+        may_hedge = self.hedge
+        error = None
+
+        def launch(hedge: bool):
+            endpoint = queue.pop(0)
+            tasks[asyncio.create_task(self._attempt(endpoint, send))] = (endpoint, hedge)
+
+        try:
+            while True:
+                if not tasks:
+                    if not queue:
+                        raise error or EndpointUnavailable("no LLM endpoint configured")
+                    if error is not None:
+                        self.failovers += 1
+                    launch(hedge=False)
+                timeout = None
+                if may_hedge and queue and len(tasks) == 1:
+                    timeout = self.delay_for(next(iter(tasks.values()))[0])
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if self.can_hedge():
+                        self.hedged += 1
+                        launch(hedge=True)
+                    else:
+                        may_hedge = False
+                    continue
+                for task in done:
+                    endpoint, hedge = tasks.pop(task)
+                    if task.exception() is None:
+                        if hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+                    if not is_endpoint_failure(error):
+                        raise error
+                    logger.warning("LLM endpoint %s failed: %r", endpoint.url, error)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints],
+        }
@@ -0,0 +1,101 @@
+import json
+
+OBJECT_KINDS = ("birds", "pigs", "bricks")
+INVALID_FRAME = (ValueError, KeyError, IndexError, TypeError)
+# object counts are uint16 in the session store records, the same bound as StringTable codes
+MAX_OBJECTS = 65535
+# a keyframe of MAX_OBJECTS objects fits easily, a real one is a few kilobytes
+MAX_LINE = 8 * 1024 * 1024
+
+
+class MatchAssembler:
+    """
+    Rebuilds full GameData frames from a stream of keyframes and delta frames.
+
+    keyframe: {"type": "key", "currentGameState": ..., "birds": [...], "pigs": [...], "bricks": [...], "slingshot": {...}}
+    delta:    {"type": "delta", "currentGameState"?: str, "slingshot"?: {...},
+               "birds"?: [[index, x, y, state], ...], ..., "n"?: {"bricks": 17}}
+    A delta only carries the fields and objects that changed since the previous frame,
+    "n" resizes an object list when objects were added or removed.
+    Anything else, sizes or indices outside 0..MAX_OBJECTS included, raises one of INVALID_FRAME.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.frames = 0
+
+    def apply(self, message: dict) -> dict:
+        if not isinstance(message, dict):
+            raise ValueError(f"Frame is a {type(message).__name__}, not an object")
+        if message.get("type", "key") == "key":
+            frame = {
+                "currentGameState": message["currentGameState"],
+                "slingshot": dict(message["slingshot"]),
+                **{kind: [dict(obj) for obj in message.get(kind, [])] for kind in OBJECT_KINDS},
+            }
+            for kind in OBJECT_KINDS:
+                check_bound(kind, "size", len(frame[kind]))
+            self.frame = frame
+        elif self.frame is None:
+            raise ValueError("Delta frame received before any keyframe")
+        else:
+            frame = self.frame
+            if "currentGameState" in message:
+                frame["currentGameState"] = message["currentGameState"]
+            if "slingshot" in message:
+                frame["slingshot"] = {**frame["slingshot"], **message["slingshot"]}
+            for kind, size in message.get("n", {}).items():
+                objects = frame[kind]
+                check_bound(kind, "size", size)
+                del objects[size:]
+                objects.extend({"position": {"x": 0.0, "y": 0.0}, "state": "Idle"} for _ in range(size - len(objects)))
+            for kind in OBJECT_KINDS:
+                objects = frame[kind]
+                for index, x, y, state in message.get(kind, ()):
+                    # a negative index would silently overwrite objects counted from the end
+                    check_bound(kind, "index", index, len(objects) - 1)
+                    objects[index] = {"position": {"x": x, "y": y}, "state": state}
+        self.frames += 1
+        return self.frame
+
+
+def check_bound(kind: str, what: str, value, limit: int = MAX_OBJECTS):
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= limit:
+        raise ValueError(f"{kind} {what} {value!r} out of range 0..{limit}")
+
+
+def encode_delta(previous: dict, frame: dict) -> dict:
+    """
+    Inverse of MatchAssembler.apply, used by Python clients and the replay benchmarks
+    """
+    if previous is None:
+        return {"type": "key", **frame}
+    delta = {"type": "delta"}
+    if frame["currentGameState"] != previous["currentGameState"]:
+        delta["currentGameState"] = frame["currentGameState"]
+    if frame["slingshot"] != previous["slingshot"]:
+        delta["slingshot"] = frame["slingshot"]
+    for kind in OBJECT_KINDS:
+        before, after = previous[kind], frame[kind]
+        if len(before) != len(after):
+            delta.setdefault("n", {})[kind] = len(after)
+        changed = [
+            [index, obj["position"]["x"], obj["position"]["y"], obj["state"]]
+            for index, obj in enumerate(after)
+            if index >= len(before) or obj != before[index]
+        ]
+        if changed:
+            delta[kind] = changed
+    return delta
+
+
+def iter_ndjson(buffer: bytes, max_line: int = MAX_LINE):
+    """
+    Splits complete NDJSON lines off `buffer`, returns the parsed messages and the unfinished remainder.
+    Raises ValueError for a line, finished or not, longer than `max_line` bytes, so a stream without
+    newlines can't buffer a whole request body.
+    """
+    *lines, rest = buffer.split(b"\n")
+    if any(len(line) > max_line for line in lines) or len(rest) > max_line:
+        raise ValueError(f"NDJSON line longer than {max_line} bytes")
+    return [json.loads(line) for line in lines if line.strip()], rest
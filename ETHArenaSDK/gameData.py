@@ -0,0 +1,74 @@
+"""
+The frame the Unity game posts to /getUserData (GameManager.CollectGameData), see matchRecorder.py for the JSON.
+
+Frames are validated straight from the request body with `GameData.model_validate_json`, which parses and
+validates in pydantic-core without building the generic dict tree first. Object lists are validated as
+TypedDicts and then packed: positions into one float32 array of (x, y) pairs per kind, in the same layout as
+the session store records, so no model or dict per bird, pig or brick outlives validation.
+"""
+from array import array
+from typing import Annotated, List
+
+from pydantic import AfterValidator, BaseModel, PlainSerializer
+from typing_extensions import TypedDict
+
+
+class Position(TypedDict):
+    x: float
+    y: float
+
+
+class GameObjectState(TypedDict):
+    position: Position
+    state: str
+
+
+class PackedObjects:
+    """
+    The objects of one kind: `positions` holds x0, y0, x1, y1, ... as float32, `states` one string per object
+    """
+
+    __slots__ = ("positions", "states")
+
+    def __init__(self, positions: array, states: list):
+        self.positions = positions
+        self.states = states
+
+    @classmethod
+    def pack(cls, objects: list):
+        positions = array("f", [value for obj in objects for value in (obj["position"]["x"], obj["position"]["y"])])
+        return cls(positions, [obj["state"] for obj in objects])
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def unpack(self) -> list:
+        positions = self.positions
+        return [
+            {"position": {"x": positions[2 * i], "y": positions[2 * i + 1]}, "state": state}
+            for i, state in enumerate(self.states)
+        ]
+
+
+GameObjects = Annotated[
+    List[GameObjectState],
+    AfterValidator(PackedObjects.pack),
+    PlainSerializer(PackedObjects.unpack, return_type=List[GameObjectState]),
+]
+
+
+class SlingshotState(BaseModel):
+    birdToThrow: str
+    slingshotState: str
+
+
+class GameData(BaseModel):
+    currentGameState: str
+    birds: GameObjects
+    pigs: GameObjects
+    bricks: GameObjects
+    slingshot: SlingshotState
+
+    @property
+    def is_over(self) -> bool:
+        return self.currentGameState in ("Won", "Lost")
@@ -0,0 +1,172 @@
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
+from telemetry import stage
+
+logger = logging.getLogger(__name__)
+
+
+class GasOracle:
+    """
+    Transaction fees and gas limits without an RPC on the send path.
+
+    A background thread polls `eth_feeHistory` every `poll_interval` seconds and caches EIP-1559 fees:
+    the tip is the median of the `reward_percentile` rewards paid over the last `blocks` blocks and the fee cap
+    is `base_fee_multiplier` times the next block's base fee plus that tip, so a fee stays valid through
+    several full blocks of base fee growth. Nodes without fee history fall back to the latest block's base fee,
+    chains without base fee to a legacy gas price.
+
+    Gas limits are kept per call shape (see TransactionManager.call_shape). Each shape is estimated once and
+    from then on follows the gas used by its last `window` receipts, times `gas_buffer`.
+    """
+
+    def __init__(self, w3, poll_interval: float = 5.0, blocks: int = 20, reward_percentile: float = 50,
+                 base_fee_multiplier: float = 2.0, min_priority_fee: int = 1_000_000, gas_buffer: float = 1.3,
+                 window: int = 20):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.blocks = blocks
+        self.reward_percentile = reward_percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee = min_priority_fee
+        # above the 1/5 refund cap, so a limit derived from gas used (after refunds) still covers execution
+        self.gas_buffer = gas_buffer
+        self.window = window
+        self.lock = threading.Lock()
+        self._fees = None
+        self._updated_at = 0.0
+        self._base_fee = None
+        self._gas_used = {}
+        self._gas_limits = {}
+        self._stop = threading.Event()
+        self._poller = None
+        self.refreshes = 0
+        self.errors = 0
+        self.estimates = 0
+        self.out_of_gas = 0
+
+    @classmethod
+    def from_env(cls, w3):
+        return cls(
+            w3,
+            poll_interval=float(os.environ.get("GAS_ORACLE_INTERVAL", 5)),
+            blocks=int(os.environ.get("GAS_FEE_HISTORY_BLOCKS", 20)),
+            reward_percentile=float(os.environ.get("GAS_PRIORITY_PERCENTILE", 50)),
+            base_fee_multiplier=float(os.environ.get("GAS_BASE_FEE_MULTIPLIER", 2)),
+            min_priority_fee=int(os.environ.get("GAS_MIN_PRIORITY_FEE", 1_000_000)),
+        )
+
+    def _fetch(self) -> tuple:
+        """
+        (base fee of the next block, tip), base fee None on a chain without EIP-1559
+        """
+        history = self.w3.eth.fee_history(self.blocks, "latest", [self.reward_percentile])
+        if history.get("baseFeePerGas"):
+            rewards = [reward[0] for reward in history.get("reward") or [] if reward and reward[0] > 0]
+            tip = int(statistics.median(rewards)) if rewards else 0
+            # the last entry is the base fee of the block after the newest one
+            return history["baseFeePerGas"][-1], max(self.min_priority_fee, tip)
+        base_fee = self.w3.eth.get_block("latest").get("baseFeePerGas")
+        if base_fee is None:
+            return None, None
+        return base_fee, max(self.min_priority_fee, self.w3.eth.max_priority_fee)
+
+    def refresh(self):
+        with stage("gas_oracle"):
+            base_fee, tip = self._fetch()
+            if base_fee is None:
+                fees = {"gasPrice": self.w3.eth.gas_price}
+            else:
+                fees = {
+                    "maxFeePerGas": int(base_fee * self.base_fee_multiplier) + tip,
+                    "maxPriorityFeePerGas": tip,
+                }
+        with self.lock:
+            self._fees = fees
+            self._base_fee = base_fee
+            self._updated_at = time.time()
+            self.refreshes += 1
+
+    def fees(self) -> dict:
+        """
+        The fee fields of the next transaction, fetched here only if the oracle has never been refreshed
+        """
+        if self._fees is None:
+            self.refresh()
+        return self._fees
+
+    def gas_limit(self, shape: tuple, estimate) -> int:
+        """
+        Gas limit for a call of `shape`, `estimate()` (an eth_estimateGas) only for a shape never seen before
+        """
+        with self.lock:
+            limit = self._gas_limits.get(shape)
+        if limit is not None:
+            return limit
+        with stage("gas_estimation"):
+            limit = int(estimate() * self.gas_buffer)
+        with self.lock:
+            self.estimates += 1
+            return self._gas_limits.setdefault(shape, limit)
+
+    def observe(self, shape: tuple, gas_used: int, gas_limit: int, succeeded: bool):
+        """
+        Updates the limit of `shape` from a receipt
+        """
+        with self.lock:
+            if not succeeded and gas_used >= gas_limit:
+                # ran out of gas: what it would have needed is unknown, only that it is more
+                self.out_of_gas += 1
+                self._gas_limits[shape] = max(self._gas_limits.get(shape, 0), int(gas_limit * self.gas_buffer))
+                logger.warning("Transaction of shape %s ran out of gas at %s, limit raised", shape, gas_limit)
+                return
+            if not succeeded:
+                return
+            used = self._gas_used.get(shape)
+            if used is None:
+                used = self._gas_used[shape] = deque(maxlen=self.window)
+            used.append(gas_used)
+            self._gas_limits[shape] = int(max(used) * self.gas_buffer)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # keep sending with the last fees, they were sized for a few blocks of base fee growth
+                self.errors += 1
+                logger.warning("Gas oracle refresh failed, fees are %.0fs old: %s", time.time() - self._updated_at, e)
+
+    def start(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Gas oracle refresh failed: %s", e)
+        self._stop.clear()
+        self._poller = threading.Thread(target=self._run, name="gas-oracle", daemon=True)
+        self._poller.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join()
+            self._poller = None
+
+    def stats(self) -> dict:
+        with self.lock:
+            fees = dict(self._fees or {})
+            return {
+                "base_fee": self._base_fee,
+                **fees,
+                "age_s": round(time.time() - self._updated_at, 1) if self._fees is not None else None,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "gas_limits": len(self._gas_limits),
+                "estimates": self.estimates,
+                "out_of_gas": self.out_of_gas,
+            }
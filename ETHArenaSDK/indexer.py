@@ -0,0 +1,324 @@
+import logging
+import os
+import sqlite3
+import threading
+from functools import cached_property
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nfts (
+    token_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    owner_key TEXT NOT NULL,
+    reputation_score INTEGER NOT NULL,
+    ai_rewards INTEGER NOT NULL,
+    image_asset TEXT NOT NULL,
+    doppleganger_asset TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nfts_owner ON nfts (owner_key, token_id);
+CREATE INDEX IF NOT EXISTS nfts_block ON nfts (block_number);
+CREATE TABLE IF NOT EXISTS users (
+    owner_key TEXT PRIMARY KEY,
+    address TEXT NOT NULL,
+    nfts INTEGER NOT NULL,
+    rewards INTEGER NOT NULL,
+    first_token INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_order ON users (first_token);
+CREATE TABLE IF NOT EXISTS blocks (
+    number INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+logger = logging.getLogger(__name__)
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+class ChainIndexer:
+    """
+    Follows BaseArena mint events into SQLite so reads never have to pull whole arrays over RPC.
+    Every safeMint emits Transfer(0x0 -> to, tokenId), reward_add(to, score) and mint(to, uri) in one
+    transaction; the logs are fetched in block ranges, grouped per transaction and stored indexed by wallet.
+    Only blocks `confirmations` deep are indexed, and the hashes of indexed blocks are checked on every pass
+    so a reorg rolls the index back to the last common block before catching up again.
+    """
+
+    def __init__(
+        self,
+        chain,
+        path: str = "index.db",
+        start_block: int = 0,
+        confirmations: int = 3,
+        batch_size: int = 2000,
+        poll_interval: float = 5.0,
+        keep_blocks: int = 256,
+    ):
+        self.chain = chain
+        self.path = path
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.keep_blocks = keep_blocks
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.executescript(SCHEMA)
+        # the API reads on its own connection so it never waits on (or sees) a half written batch
+        self.reader = sqlite3.connect(path, check_same_thread=False)
+        self.reader.row_factory = sqlite3.Row
+        self._stop = threading.Event()
+        self._thread = None
+        self.reorgs = 0
+        self.indexed_logs = 0
+        self.last_error = None
+
+    @classmethod
+    def from_env(cls, chain):
+        return cls(
+            chain,
+            path=os.environ.get("INDEXER_DB_PATH", "index.db"),
+            start_block=int(os.environ.get("INDEXER_START_BLOCK", 0)),
+            confirmations=int(os.environ.get("INDEXER_CONFIRMATIONS", 3)),
+            batch_size=int(os.environ.get("INDEXER_BATCH_SIZE", 2000)),
+            poll_interval=float(os.environ.get("INDEXER_POLL_INTERVAL", 5)),
+        )
+
+    @property
+    def w3(self):
+        return self.chain.w3
+
+    @property
+    def contract(self):
+        return self.chain.contract
+
+    @cached_property
+    def events(self) -> dict:
+        events = self.contract.events
+        return {self._topic(event): event for event in (events.Transfer, events.reward_add, events.mint)}
+
+    def _topic(self, event) -> str:
+        abi = event._get_event_abi()
+        signature = f"{abi['name']}({','.join(item['type'] for item in abi['inputs'])})"
+        return self._hex(self.w3.keccak(text=signature))
+
+    @staticmethod
+    def _hex(value) -> str:
+        value = value.hex() if hasattr(value, "hex") else str(value)
+        return value if value.startswith("0x") else "0x" + value
+
+    # ---- index state ----
+
+    @property
+    def last_block(self) -> int:
+        row = self.db.execute("SELECT value FROM state WHERE key = 'last_block'").fetchone()
+        return int(row[0]) if row else self.start_block - 1
+
+    def _set_last_block(self, number: int):
+        self.db.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('last_block', ?)", (str(number),))
+
+    def _remember_block(self, number: int, block_hash: str):
+        self.db.execute("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)", (number, block_hash))
+        self.db.execute("DELETE FROM blocks WHERE number < ?", (number - self.keep_blocks,))
+
+    # ---- catch-up ----
+
+    def _common_ancestor(self):
+        """
+        Highest remembered block whose hash still matches the chain, None when the index is consistent
+        """
+        rows = self.db.execute("SELECT number, hash FROM blocks ORDER BY number DESC").fetchall()
+        for position, row in enumerate(rows):
+            if self._hex(self.w3.eth.get_block(row["number"])["hash"]) == row["hash"]:
+                return None if position == 0 else row["number"]
+        return self.start_block - 1 if rows else None
+
+    def _rollback(self, ancestor: int):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.db.execute("DELETE FROM nfts WHERE block_number > ?", (ancestor,))
+            self.db.execute("DELETE FROM blocks WHERE number > ?", (ancestor,))
+            self.db.execute("DELETE FROM users")
+            self.db.execute(
+                """
+                INSERT INTO users (owner_key, address, nfts, rewards, first_token)
+                SELECT owner_key, owner, COUNT(*), MAX(ai_rewards), MIN(token_id) FROM nfts GROUP BY owner_key
+                """
+            )
+            self._set_last_block(ancestor)
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        self.reorgs += 1
+
+    def _fetch_logs(self, from_block: int, to_block: int) -> list:
+        logs = self.w3.eth.get_logs({
+            "address": self.contract.address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [list(self.events)],
+        })
+        return sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+    def _group_mints(self, logs: list) -> list:
+        mints = {}
+        for log in logs:
+            event = self.events.get(self._hex(log["topics"][0]))
+            if event is None:
+                continue
+            decoded = event().process_log(log)
+            tx_hash = self._hex(log["transactionHash"])
+            mint = mints.setdefault(tx_hash, {"tx_hash": tx_hash, "block_number": log["blockNumber"], "score": 0})
+            args = decoded["args"]
+            if decoded["event"] == "Transfer" and args["from"] == ZERO_ADDRESS:
+                mint["token_id"] = args["tokenId"]
+                mint["owner"] = args["to"]
+            elif decoded["event"] == "reward_add":
+                mint["score"] = args["score"]
+            elif decoded["event"] == "mint":
+                mint["uri"] = args["uri"]
+        return [mint for mint in mints.values() if "token_id" in mint]
+
+    def _doppleganger_uri(self, mint: dict) -> str:
+        # not emitted by the contract, recover it from the safeMint call data
+        try:
+            tx = self.w3.eth.get_transaction(mint["tx_hash"])
+            _, params = self.contract.decode_function_input(tx.get("input") or tx.get("data"))
+            return params.get("dopplegangeruri", mint.get("uri", ""))
+        except Exception:
+            return mint.get("uri", "")
+
+    def _store(self, mints: list, to_block: int, block_hash: str):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            for mint in mints:
+                owner_key = mint["owner"].lower()
+                user = self.db.execute(
+                    "SELECT nfts, rewards FROM users WHERE owner_key = ?", (owner_key,)
+                ).fetchone()
+                nfts, rewards = (user["nfts"], user["rewards"]) if user else (0, 0)
+                # same running totals as BaseArena.reputation_score / rewards_earned at mint time
+                reputation, ai_rewards = nfts + 1, rewards + mint["score"]
+                self.db.execute(
+                    """
+                    INSERT OR REPLACE INTO nfts (token_id, owner, owner_key, reputation_score, ai_rewards,
+                        image_asset, doppleganger_asset, block_number, tx_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (mint["token_id"], mint["owner"], owner_key, reputation, ai_rewards, mint.get("uri", ""),
+                     mint["doppleganger_uri"], mint["block_number"], mint["tx_hash"]),
+                )
+                self.db.execute(
+                    """
+                    INSERT INTO users (owner_key, address, nfts, rewards, first_token) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (owner_key) DO UPDATE SET nfts = excluded.nfts, rewards = excluded.rewards
+                    """,
+                    (owner_key, mint["owner"], reputation, ai_rewards, mint["token_id"]),
+                )
+            self._remember_block(to_block, block_hash)
+            self._set_last_block(to_block)
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        self.indexed_logs += len(mints)
+
+    def run_once(self) -> int:
+        """
+        Checks for a reorg and indexes every confirmed block since the last pass, returns the last indexed block
+        """
+        with self.lock:
+            ancestor = self._common_ancestor()
+            if ancestor is not None:
+                logger.warning("Reorg detected, rolling index back to block %s", ancestor)
+                self._rollback(ancestor)
+            target = self.w3.eth.block_number - self.confirmations
+            last = self.last_block
+            while last < target and not self._stop.is_set():
+                to_block = min(last + self.batch_size, target)
+                block_hash = self._hex(self.w3.eth.get_block(to_block)["hash"])
+                mints = self._group_mints(self._fetch_logs(last + 1, to_block))
+                for mint in mints:
+                    mint["doppleganger_uri"] = self._doppleganger_uri(mint)
+                self._store(mints, to_block, block_hash)
+                last = to_block
+            return last
+
+    def _follow(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning("Indexer pass failed: %s", e)
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._follow, name="chain-indexer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 5)
+            self._thread = None
+
+    # ---- reads ----
+
+    def users(self, offset: int = 0, limit: int = 50) -> list:
+        rows = self.reader.execute(
+            "SELECT address, nfts, rewards FROM users ORDER BY first_token LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [{"address": row["address"], "nfts": row["nfts"], "rewards_earned": row["rewards"]} for row in rows]
+
+    def user_count(self) -> int:
+        return self.reader.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def nfts(self, wallet: str, offset: int = 0, limit: int = 50) -> list:
+        rows = self.reader.execute(
+            """
+            SELECT owner, reputation_score, ai_rewards, image_asset, doppleganger_asset, token_id, block_number, tx_hash
+            FROM nfts WHERE owner_key = ? ORDER BY token_id LIMIT ? OFFSET ?
+            """,
+            (wallet.lower(), limit, offset),
+        ).fetchall()
+        # same fields as the BARNNFT struct returned by getNFTs
+        return [
+            {
+                "owner": row["owner"],
+                "reputation_score": row["reputation_score"],
+                "ai_rewards": row["ai_rewards"],
+                "image_asset": row["image_asset"],
+                "doppleganger_asset": row["doppleganger_asset"],
+                "tokenId": row["token_id"],
+                "block": row["block_number"],
+                "txn hash": row["tx_hash"],
+            }
+            for row in rows
+        ]
+
+    def nft_count(self, wallet: str) -> int:
+        return self.reader.execute("SELECT COUNT(*) FROM nfts WHERE owner_key = ?", (wallet.lower(),)).fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            "last_block": self.last_block,
+            "users": self.user_count(),
+            "nfts": self.reader.execute("SELECT COUNT(*) FROM nfts").fetchone()[0],
+            "indexed_mints": self.indexed_logs,
+            "reorgs": self.reorgs,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,231 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+from telemetry import stage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    progress TEXT,
+    run_at REAL NOT NULL,
+    locked_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_at);
+"""
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# the job a handler is running for, e.g. to `checkpoint` its progress
+current_job = contextvars.ContextVar("current_job")
+
+
+class JobQueue:
+    """
+    Persistent SQLite backed job queue with an asyncio worker pool.
+    Failed jobs are retried with exponential backoff until `max_attempts`,
+    jobs sharing an idempotency key are only ever enqueued once and
+    jobs whose worker died are picked up again once their lease expires.
+    A handler whose side effects must not be repeated records how far it got with `checkpoint`,
+    a retry finds that in the job's "progress".
+    """
+
+    def __init__(
+        self,
+        path: str = "jobs.db",
+        workers: int = 4,
+        max_attempts: int = 5,
+        backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        lease: float = 600.0,
+        poll_interval: float = 1.0,
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.handlers = {}
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.executescript(SCHEMA)
+        if "progress" not in {column[1] for column in self.db.execute("PRAGMA table_info(jobs)")}:
+            self.db.execute("ALTER TABLE jobs ADD COLUMN progress TEXT")
+        self._tasks = []
+        self._wakeup = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.environ.get("JOB_DB_PATH", "jobs.db"),
+            workers=int(os.environ.get("JOB_WORKERS", 4)),
+            max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", 5)),
+            backoff=float(os.environ.get("JOB_BACKOFF", 2)),
+        )
+
+    def register(self, kind: str, handler):
+        self.handlers[kind] = handler
+
+    def enqueue(self, kind: str, payload: dict, idempotency_key: str = None) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.db.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, idempotency_key, payload, status, run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, idempotency_key, json.dumps(payload), QUEUED, now, now, now),
+            )
+            if idempotency_key is not None:
+                row = self.db.execute("SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+            else:
+                row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return self._to_dict(row)
+
+    def get(self, job_id: str) -> dict:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def checkpoint(self, job_id: str, progress: dict):
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(progress), time.time(), job_id),
+            )
+
+    def stats(self) -> dict:
+        with self.lock:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    async def wait(self, job_id: str, timeout: float = 600.0) -> dict:
+        """
+        Polls until `job_id` succeeded (returns the job) or failed for good (raises)
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = await asyncio.to_thread(self.get, job_id)
+            if job is None:
+                raise KeyError(f"Unknown job {job_id}")
+            if job["status"] == SUCCEEDED:
+                return job
+            if job["status"] == FAILED:
+                raise Exception(f"Job {job_id} failed: {job['error']}")
+            await asyncio.sleep(self.poll_interval)
+        raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+
+    def _claim(self) -> dict:
+        # only jobs this process has a handler for, other kinds are left to the processes that do
+        kinds = tuple(self.handlers)
+        if not kinds:
+            return None
+        placeholders = ",".join("?" * len(kinds))
+        now = time.time()
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute(
+                    f"SELECT * FROM jobs WHERE kind IN ({placeholders}) "
+                    "AND ((status = ? AND run_at <= ?) OR (status = ? AND locked_until < ?)) "
+                    "ORDER BY run_at LIMIT 1",
+                    (*kinds, QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is not None:
+                    self.db.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ?, updated_at = ? WHERE id = ?",
+                        (RUNNING, now + self.lease, now, row["id"]),
+                    )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = self._to_dict(row)
+        job["attempts"] += 1
+        return job
+
+    def _finish(self, job: dict, result=None, error: str = None):
+        now = time.time()
+        if error is None:
+            status, run_at = SUCCEEDED, job["run_at"]
+        elif job["attempts"] >= self.max_attempts:
+            status, run_at = FAILED, job["run_at"]
+        else:
+            delay = min(self.max_backoff, self.backoff * 2 ** (job["attempts"] - 1))
+            status, run_at = QUEUED, now + delay * random.uniform(0.5, 1.0)
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, run_at = ?, locked_until = NULL, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, run_at, now, job["id"]),
+            )
+
+    async def _worker(self):
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            handler = self.handlers[job["kind"]]
+            current_job.set(job)
+            try:
+                with stage(f"job_{job['kind']}"):
+                    result = await handler(job["payload"])
+                await asyncio.to_thread(self._finish, job, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Job %s attempt %s failed: %s", job["id"], job["attempts"], e)
+                await asyncio.to_thread(self._finish, job, None, str(e))
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self.lock:
+            self.db.close()
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        return job
@@ -0,0 +1,403 @@
+import json
+import re
+from typing import List
+
+from telemetry import stage
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+
+class IncrementalJSONExtractor:
+    """
+    Scans streamed model output for the first top-level JSON object and emits each
+    `"key": value` member as soon as it is complete, without waiting for the closing brace.
+    Anything before the opening brace (markdown fences, chatter) is skipped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start = None
+        self.done = False
+        self.fields = {}
+
+    def feed(self, chunk: str) -> list:
+        """
+        Adds a chunk of output and returns the (key, value) members completed by it
+        """
+        self.text += chunk
+        completed = []
+        while self.position < len(self.text) and not self.done:
+            char = self.text[self.position]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = self.depth > 0
+            elif char in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    if char == "[":
+                        self.depth = 0
+                    else:
+                        self.member_start = self.position + 1
+            elif char in "}]":
+                if self.depth == 1:
+                    completed.extend(self._member(self.position))
+                    self.done = True
+                self.depth = max(0, self.depth - 1)
+            elif char == "," and self.depth == 1:
+                completed.extend(self._member(self.position))
+                self.member_start = self.position + 1
+            self.position += 1
+        return completed
+
+    def _member(self, end: int) -> list:
+        segment = self.text[self.member_start:end].strip()
+        if not segment:
+            return []
+        try:
+            member = json.loads("{" + segment + "}")
+        except ValueError:
+            return []
+        self.fields.update(member)
+        return list(member.items())
+
+    def result(self) -> dict:
+        return dict(self.fields)
+
+
+class JSONExtractionError(ValueError):
+    pass
+
+
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null", "true": "true", "false": "false", "null": "null"}
+
+
+class _Container:
+    __slots__ = ("kind", "start", "item_start", "keys")
+
+    def __init__(self, kind: str, start: int):
+        # kind is "{", "[" or "pairs" (a list the model filled with "key": value members)
+        self.kind = kind
+        self.start = start
+        self.item_start = start
+        self.keys = set()
+
+
+def _balanced_object(text: str):
+    """
+    The first top-level {...} in `text` (string aware), or None when it never closes
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth, in_string, escaped = 0, False, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    return None
+
+
+def repair_json(text: str):
+    """
+    Rewrites the first JSON-ish object in model output into valid JSON.
+    Returns the repaired text and the list of repairs that were needed.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise JSONExtractionError("No JSON object in model output")
+    repairs = set()
+    out = []
+    stack = []
+    quote = None
+    escaped = False
+    index = start
+    length = len(text)
+
+    def strip_trailing_comma():
+        while out and out[-1].isspace():
+            out.pop()
+        if out and out[-1] == ",":
+            out.pop()
+            repairs.add("trailing_comma")
+
+    while index < length:
+        char = text[index]
+        if quote is not None:
+            if escaped:
+                escaped = False
+                if char == "'":
+                    # \' is not a JSON escape
+                    out[-1] = char
+                else:
+                    out.append(char)
+            elif char == "\\":
+                escaped = True
+                out.append(char)
+            elif char == quote:
+                quote = None
+                out.append('"')
+            elif char == '"':
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+                repairs.add("control_characters")
+            else:
+                out.append(char)
+            index += 1
+            continue
+
+        if char in "\"'":
+            if char == "'":
+                repairs.add("single_quotes")
+            quote = char
+            out.append('"')
+        elif char == "#" or text.startswith("//", index):
+            newline = text.find("\n", index)
+            index = length if newline < 0 else newline
+            repairs.add("comments")
+            continue
+        elif char in "{[":
+            out.append(char)
+            stack.append(_Container(char, len(out)))
+        elif char in "}]":
+            if not stack:
+                break
+            strip_trailing_comma()
+            container = stack.pop()
+            out.append({"{": "}", "[": "]", "pairs": "}]"}[container.kind])
+            if not stack:
+                if text[index + 1:].strip().strip("`").strip():
+                    repairs.add("trailing_text")
+                break
+        elif char == ",":
+            out.append(char)
+            if stack:
+                stack[-1].item_start = len(out)
+        elif char == ":":
+            container = stack[-1] if stack else None
+            if container is not None and container.kind != "{":
+                key = "".join(out[container.item_start:]).strip()
+                if container.kind == "[":
+                    # ["game scope": "8", ...] -> [{"game scope": "8", ...}]
+                    out.insert(container.start, "{")
+                    container.kind = "pairs"
+                    container.item_start += 1
+                    repairs.add("list_of_pairs")
+                elif key in container.keys:
+                    # a repeated key starts the next object of the list
+                    comma = container.item_start - 1
+                    out[comma:comma + 1] = ["}", ",", "{"]
+                    container.item_start += 2
+                    container.keys = set()
+                container.keys.add(key)
+            out.append(char)
+        elif char.isalpha() or char == "_":
+            end = index
+            while end < length and (text[end].isalnum() or text[end] in "_-"):
+                end += 1
+            word = text[index:end]
+            if word in PYTHON_LITERALS:
+                if PYTHON_LITERALS[word] != word:
+                    repairs.add("python_literals")
+                out.append(PYTHON_LITERALS[word])
+            else:
+                out.append(json_string(word))
+                repairs.add("bare_words")
+            index = end
+            continue
+        elif char == "`":
+            pass
+        else:
+            out.append(char)
+        index += 1
+
+    if quote is not None or stack:
+        repairs.add("truncated")
+        if quote is not None:
+            if escaped:
+                out.pop()
+            out.append('"')
+        while stack:
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ":":
+                out.append("null")
+            strip_trailing_comma()
+            container = stack.pop()
+            if container.kind != "[" and out and out[-1] == '"' and "".join(out[container.item_start:]).strip().startswith('"') \
+                    and ":" not in "".join(out[container.item_start:]):
+                # a key that was cut off before its value
+                del out[container.item_start:]
+                strip_trailing_comma()
+            out.append({"{": "}", "[": "]", "pairs": "}]"}[container.kind])
+    return "".join(out), sorted(repairs)
+
+
+def json_string(value: str) -> str:
+    return json.dumps(value)
+
+
+class ExtractionStats:
+    def __init__(self):
+        self.total = 0
+        self.clean = 0
+        self.repaired = 0
+        self.failed = 0
+        self.repairs = {}
+
+    def record(self, repairs: list = None, failed: bool = False):
+        self.total += 1
+        if failed:
+            self.failed += 1
+        elif repairs:
+            self.repaired += 1
+            for repair in repairs:
+                self.repairs[repair] = self.repairs.get(repair, 0) + 1
+        else:
+            self.clean += 1
+
+    def snapshot(self) -> dict:
+        total = self.total or 1
+        return {
+            "total": self.total,
+            "clean": self.clean,
+            "repaired": self.repaired,
+            "failed": self.failed,
+            "repair_rate": self.repaired / total,
+            "failure_rate": self.failed / total,
+            "repairs": dict(self.repairs),
+        }
+
+
+extraction_stats = ExtractionStats()
+
+
+def extract_json(text: str):
+    """
+    Parses the first JSON object in model output, repairing it when needed.
+    Returns (data, repairs); raises JSONExtractionError when it cannot be recovered.
+    """
+    candidate = _balanced_object(text)
+    if candidate is not None:
+        try:
+            data = json.loads(candidate)
+            if isinstance(data, dict):
+                trailing = text[text.find(candidate) + len(candidate):].strip().strip("`").strip()
+                return data, ["trailing_text"] if trailing else []
+        except ValueError:
+            pass
+    repaired, repairs = repair_json(text)
+    try:
+        data = json.loads(repaired)
+    except ValueError as e:
+        raise JSONExtractionError(f"Could not repair model output: {e}")
+    if not isinstance(data, dict):
+        raise JSONExtractionError("Model output is not a JSON object")
+    return data, repairs
+
+
+class PersonalizedFeed(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, coerce_numbers_to_str=True, extra="allow")
+
+    rewards_earned: int = Field(alias="rewards earned")
+    user_reputation: str = Field("Newbie", alias="user reputation")
+    percentile: str = "0"
+    onchain_footprints: str = Field("0", alias="onchain footprints")
+    game_genres: List[str] = Field(default_factory=list, alias="game genres")
+
+    @field_validator("rewards_earned", mode="before")
+    @classmethod
+    def parse_rewards(cls, value):
+        # the prompt asks for 0 to 10 without units, models still answer "7/10" or "8 points"
+        if isinstance(value, str):
+            match = re.search(r"-?\d+", value)
+            if match is None:
+                raise ValueError(f"No number in rewards earned: {value!r}")
+            value = int(match.group())
+        return min(10, max(0, int(value)))
+
+    @field_validator("game_genres", mode="before")
+    @classmethod
+    def parse_genres(cls, value):
+        return [value] if isinstance(value, str) else value
+
+
+class RecommendedGame(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, coerce_numbers_to_str=True, extra="allow")
+
+    game_scope: str = Field("", alias="game scope")
+    game_popularity: str = Field("", alias="game popularity")
+    game_benefits: str = Field("", alias="game benefits in terms of money and tournaments")
+
+
+class FeedbackResponse(BaseModel):
+    """
+    The "Personalized Feeds" response the agent prompts ask for
+    """
+    model_config = ConfigDict(populate_by_name=True, coerce_numbers_to_str=True, extra="allow")
+
+    fun_pun: str = Field(alias="fun pun")
+    doppleganger: str = Field(
+        "",
+        alias="gamer match/doppleganger",
+        validation_alias=AliasChoices("gamer match/ doppleganger", "gamer match/doppleganger"),
+    )
+    overall_performance: str = Field("", alias="overall performance")
+    personalized_feeds: List[PersonalizedFeed] = Field(alias="Personalized Feeds", min_length=1)
+    game_download_links: str = Field("", alias="game download links")
+    estimated_rewards: str = Field("", alias="estimated rewards")
+    accuracy: str = ""
+    overall_benefit: str = ""
+    recommended_games: List[RecommendedGame] = Field(default_factory=list, alias="recommended games for esports players")
+
+    @field_validator("personalized_feeds", "recommended_games", mode="before")
+    @classmethod
+    def single_object_to_list(cls, value):
+        return [value] if isinstance(value, dict) else value
+
+
+def parse_feedback(text: str) -> dict:
+    """
+    Extracts, repairs and validates a "Personalized Feeds" response from model output.
+    Raises JSONExtractionError when the output cannot be turned into a valid response.
+    """
+    try:
+        with stage("json_extraction"):
+            data, repairs = extract_json(text)
+            feedback = FeedbackResponse.model_validate(data)
+    except (JSONExtractionError, ValidationError) as e:
+        extraction_stats.record(failed=True)
+        raise JSONExtractionError(str(e))
+    extraction_stats.record(repairs)
+    return feedback.model_dump(by_alias=True)
+
+
+def is_valid_feedback(text: str) -> bool:
+    try:
+        data, _ = extract_json(text)
+        FeedbackResponse.model_validate(data)
+        return True
+    except (JSONExtractionError, ValidationError):
+        return False
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from dotenv import load_dotenv
+
+from endpointPool import Endpoint, EndpointPool, is_endpoint_failure
+from rateLimit import get_limiter
+from telemetry import STAGE_SECONDS, stage
+
+load_dotenv()
+
+DEFAULT_GAIA_URL = "https://0x0c8923d457934eae1a4ce708f07a980f1ce57a32.gaia.domains/v1/chat/completions"
+DEFAULT_MODEL = "llama-3.2-3B-Instruct"
+
+
+class LLMClient:
+    """
+    Shared async client for OpenAI compatible Gaia completion endpoints.
+    Keeps a pooled keep-alive session and caps the number of in-flight completions.
+    With several `urls` completions go through an EndpointPool (health, failover, hedging),
+    `api_keys` pairs a key with each url and defaults to `api_key` for all of them.
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_GAIA_URL,
+        api_key: str = None,
+        model: str = DEFAULT_MODEL,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        max_concurrency: int = 16,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        urls: list = None,
+        api_keys: list = None,
+        hedge: bool = True,
+        hedge_delay: float = 2.0,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+    ):
+        self.url = url
+        self.model = model
+        self.headers = {
+            "accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        }
+        urls = urls or [url]
+        api_keys = api_keys or [api_key] * len(urls)
+        self.limiter = get_limiter("gaia")
+        self.pool = EndpointPool(
+            [
+                Endpoint(endpoint_url, endpoint_key, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+                for endpoint_url, endpoint_key in zip(urls, api_keys)
+            ],
+            hedge=hedge,
+            hedge_delay=hedge_delay,
+            # a hedge is an extra upstream request, it only goes out if the rate limit has room right now
+            can_hedge=lambda: self.limiter.try_acquire(),
+        )
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_concurrency = max_concurrency
+        self._client = None
+        self._semaphore = None
+
+    @classmethod
+    def from_env(cls):
+        urls = [url.strip() for url in os.environ.get("GAIA_URLS", "").split(",") if url.strip()]
+        api_keys = [key.strip() for key in os.environ.get("GAIA_API_KEYS", "").split(",") if key.strip()]
+        return cls(
+            url=os.environ.get("GAIA_URL") or DEFAULT_GAIA_URL,
+            urls=urls or None,
+            api_keys=api_keys if len(api_keys) == len(urls) else None,
+            hedge=os.environ.get("LLM_HEDGE", "true").lower() == "true",
+            hedge_delay=float(os.environ.get("LLM_HEDGE_DELAY", 2)),
+            failure_threshold=int(os.environ.get("LLM_FAILURE_THRESHOLD", 3)),
+            reset_timeout=float(os.environ.get("LLM_RESET_TIMEOUT", 30)),
+            api_key=os.environ.get("GAIA_API_KEY"),
+            model=os.environ.get("LLM_MODEL") or DEFAULT_MODEL,
+            max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", 20)),
+            max_keepalive=int(os.environ.get("LLM_MAX_KEEPALIVE", 10)),
+            max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 16)),
+            timeout=float(os.environ.get("LLM_TIMEOUT", 60)),
+            connect_timeout=float(os.environ.get("LLM_CONNECT_TIMEOUT", 5)),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(headers=self.headers, limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def build_payload(self, messages: list) -> dict:
+        return {"messages": messages, "model": self.model}
+
+    async def chat_completion(self, messages: list) -> str:
+        payload = self.build_payload(messages)
+
+        async def send(endpoint: Endpoint):
+            async with self.semaphore:
+                response = await self.client.post(endpoint.url, json=payload, headers=endpoint.headers)
+            response.raise_for_status()
+            return response.json()
+
+        await self.limiter.acquire()
+        with stage("llm_call"):
+            data = await self.pool.request(send)
+        return data['choices'][0]['message']['content']
+
+    async def stream_chat_completion(self, messages: list):
+        """
+        Yields completion tokens as the server sends them (OpenAI style server-sent events)
+        """
+        payload = {**self.build_payload(messages), "stream": True}
+        await self.limiter.acquire()
+        start = time.perf_counter()
+        first_token = True
+        with stage("llm_stream"):
+            async with self.semaphore:
+                async with self.open_stream(payload) as response:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        choices = json.loads(data).get("choices") or [{}]
+                        token = choices[0].get("delta", {}).get("content")
+                        if token:
+                            if first_token:
+                                STAGE_SECONDS.observe(time.perf_counter() - start, "llm_first_token")
+                                first_token = False
+                            yield token
+
+    @asynccontextmanager
+    async def open_stream(self, payload: dict):
+        """
+        Streamed response from the first endpoint that accepts the request.
+        Streams are not hedged, an endpoint that fails before sending anything is failed over.
+        """
+        error = None
+        for endpoint in self.pool.candidates():
+            endpoint.begin()
+            request = self.client.build_request("POST", endpoint.url, json=payload, headers=endpoint.headers)
+            response = None
+            try:
+                response = await self.client.send(request, stream=True)
+                response.raise_for_status()
+            except Exception as e:
+                if response is not None:
+                    await response.aclose()
+                if not is_endpoint_failure(e):
+                    endpoint.abandoned()
+                    raise
+                endpoint.failed()
+                error = e
+                continue
+            # time to headers is not comparable with completion latencies, only the breaker is updated
+            endpoint.succeeded()
+            try:
+                yield response
+            finally:
+                await response.aclose()
+            return
+        raise error
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_llm_client = None
+
+
+def get_llm_client() -> LLMClient:
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient.from_env()
+    return _llm_client
+
+
+async def close_llm_client():
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.aclose()
+        _llm_client = None
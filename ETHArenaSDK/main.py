@@ -1,31 +1,52 @@
-from fastapi import FastAPI, Request
-from pydantic import BaseModel
+from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
 import uvicorn
 import os 
+import threading
 from dotenv import load_dotenv
-from baseAgent import normal_chat, structured_rag_output, structured_rag_response
-from web3 import Web3
+from baseAgent import normal_chat, normal_chat_stream, structured_rag_output, structured_rag_response
+from llmClient import get_llm_client, close_llm_client
+from sessionStore import SessionStore
+from jobQueue import JobQueue, current_job, SUCCEEDED
+from txManager import TransactionManager
+from gasOracle import GasOracle
+from indexer import ChainIndexer
+from artworkPool import ArtworkPool
+from responseStore import ResponseStore
+from responseCache import get_response_cache, make_key
+from rateLimit import RateLimited, limiter_stats
+from chain import Chain, is_address
+from signer import SignerLock
+from matchRecorder import MatchRecorder
+from gameData import GameData
+from analytics import summarize_match, summarize_documents, gameplay_features
+from frameStream import MatchAssembler, iter_ndjson, INVALID_FRAME
+from prompts import get_prompts
+from jsonExtract import IncrementalJSONExtractor, JSONExtractionError, parse_feedback, extraction_stats
+from telemetry import setup_logging, stage, registry, REQUEST_SECONDS
 import json
-from eth_account import Account
-import requests
-import re
 
 
 load_dotenv()
-private_key = os.environ.get("PRIVATE_KEY")
-contract_address = os.environ.get("CONTRACT_ADDRESS")
-rpc_url = os.environ.get("BASE_RPC_URL")
-api_key = os.environ.get("GAIA_API_KEY")
-
-
-w3 = Web3(Web3.HTTPProvider(rpc_url))
-with open("./contracts/BaseArena.json", "r") as f:
-    contract_abi = json.load(f)["abi"]
-contract = w3.eth.contract(address=contract_address, abi=contract_abi)
-account = Account.from_key(private_key)
-user_responses = {}
+setup_logging()
+logger = logging.getLogger("main")
+
+
+# web3, the contract and the account are only built when something first needs them
+chain = Chain.from_env()
+indexer = ChainIndexer.from_env(chain)
+_tx_manager = None
+_tx_manager_lock = threading.Lock()
+user_responses = ResponseStore.from_env()
+NO_GAMES_PROMPT = "Generate a mock data that should give the user the insight that he has not played any games recently and encourage him to play some game"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 mock_data = {
   "fun pun": "It looks like you're having a 'pig-astrophe' in the gaming world! Time to get your game face on!",
   "gamer match/doppleganger": "Tomasz Stańczak",
@@ -56,10 +77,64 @@ mock_data = {
     }
   ]
 }
-# print(contract.functions.getAllUsers().call())
-# print(account.address, w3.eth.get_balance(account.address))
 
-app = FastAPI()
+session_store = SessionStore.from_env()
+job_queue = JobQueue.from_env()
+artwork_pool = ArtworkPool.from_env()
+# with several workers only the one holding the signer lock sends transactions (nonces stay in one process),
+# fills the artwork pool and follows the chain; it runs the "mint" jobs the others enqueue
+signer = SignerLock.from_env()
+mint_queue = JobQueue.from_env()
+# opened by each worker in lifespan, MATCH_RECORD_PATH unset means no recording
+recorder = None
+
+def get_tx_manager() -> TransactionManager:
+    global _tx_manager
+    if not signer.is_leader:
+        raise RuntimeError("Transactions are only sent by the signer process")
+    with _tx_manager_lock:
+        if _tx_manager is None:
+            _tx_manager = TransactionManager(chain.w3, chain.contract, chain.account, gas_oracle=GasOracle.from_env(chain.w3))
+            _tx_manager.start()
+    return _tx_manager
+
+async def evict_idle_sessions(interval: float = 60):
+    while True:
+        await asyncio.sleep(interval)
+        session_store.evict_expired()
+        get_response_cache().purge_expired()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global recorder
+    recorder = MatchRecorder.from_env()
+    get_llm_client()
+    sweeper = asyncio.create_task(evict_idle_sessions())
+    job_queue.register("game_over", game_over_pipeline)
+    job_queue.start()
+    signer.start(become_signer)
+    yield
+    sweeper.cancel()
+    await job_queue.stop()
+    if signer.is_leader:
+        await mint_queue.stop()
+        if _tx_manager is not None:
+            _tx_manager.stop()
+        indexer.stop()
+        await artwork_pool.stop()
+    await signer.stop()
+    await close_llm_client()
+    if recorder is not None:
+        recorder.close()
+
+async def become_signer():
+    mint_queue.register("mint", mint_job)
+    mint_queue.start()
+    if os.environ.get("INDEXER_ENABLED", "true").lower() == "true":
+        indexer.start()
+    artwork_pool.start()
+
+app = FastAPI(lifespan=lifespan)
 origins = [
     "http://localhost",
     "http://localhost:8080",
@@ -76,29 +151,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route.path if route else "unmatched", response.status_code)
+    return response
 
+app.mount("/artwork", StaticFiles(directory=artwork_pool.directory), name="artwork")
 
-class Position(BaseModel):
-    x: float
-    y: float
-
-class GameObjectState(BaseModel):
-    position: Position
-    state: str
-
-class SlingshotState(BaseModel):
-    birdToThrow: str
-    slingshotState: str
 
-class GameData(BaseModel):
-    currentGameState: str
-    birds: List[GameObjectState]
-    pigs: List[GameObjectState]
-    bricks: List[GameObjectState]
-    slingshot: SlingshotState
-
-documents =[]
-iteration = 0
 
 @app.get("/")
 async def test():
@@ -107,10 +170,14 @@ async def test():
 
 @app.post("/getUserData")
 async def receive_game_data(walletAddress: str, request: Request):
-    data = await request.json()
+    body = await request.body()
+    with stage("json_parse"):
+        try:
+            data = GameData.model_validate_json(body)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_input=False))
     #print(walletAddress, data)
     # Print for debugging
-    global iteration
     
     #print("Received Data: ", game_data)
 
@@ -119,167 +186,300 @@ async def receive_game_data(walletAddress: str, request: Request):
     # analysis = analyze_gameplay(game_data)
     # print(analysis)
     # analysis["data"] = game_data
-    global documents
-    documents.append(data)
-    print(data)
-    if data["currentGameState"] == "Lost" or data["currentGameState"] == "Won":
-        prompt = "Give me a detailed and personalized feeedback on my Gameplay"
-        data = await structured_rag_response(prompt, [documents[-1]])
-        print(data)
-        match = re.search(r'```(.*?)```', data, re.DOTALL)
-        if match:
-            json_data = match.group(1).strip()  # Extract and clean JSON
-        else:
-            json_data = data.strip('```json').strip('```')
-        print(json_data)
-        data = json.loads(json_data)
-        #print(data)
-        rewards_earned = data["Personalized Feeds"][0]["rewards earned"]
-        user_reputation = data["Personalized Feeds"][0]["user reputation"]
-        user_responses[walletAddress] = data
-        print(rewards_earned, user_reputation)
-        image_url = image_to_text(rewards_earned)
-        print(image_url)
-        # data = json.load()
-        tx_hash = mint_onchain(rewards_earned, image_url, image_url, walletAddress)
-    
-        documents = []
-        return {"message": "Data received successfully", "aiagent": data, "txn hash": tx_hash}
+    logger.debug("Frame received", extra={"wallet": walletAddress, "payload": body})
+    return await asyncio.to_thread(ingest_frame, walletAddress, data, request.headers.get("Idempotency-Key"), body)
+
+def ingest_frame(walletAddress: str, data: GameData, idempotency_key: str = None, body: bytes = None):
+    # blocking (SQLite session store, job queue and recorder writes), the handlers run it in a worker thread
+    session = session_store.append(walletAddress, data)
+    if recorder is not None:
+        recorder.record(walletAddress, session.created_at, body if body is not None else data.model_dump())
+    if data.is_over:
+        # the earlier frames of the match may have been received by another worker
+        session = session_store.pop(walletAddress) or session
+        # summarized here: the state codes in packed frames only mean something to this process's string table
+        with stage("match_summary"):
+            summary = summarize_match(list(session.frames))
+        job = job_queue.enqueue(
+            "game_over",
+            {"walletAddress": walletAddress, "summary": summary},
+            idempotency_key=idempotency_key or f"{walletAddress}:{session.created_at}",
+        )
+        return {"message": "Data received successfully", "job_id": job["id"], "status": job["status"]}
     
     return {"message": "Data received successfully"}
 
+@app.post("/getUserData/stream")
+async def receive_game_stream(walletAddress: str, request: Request):
+    """
+    Chunked NDJSON upload of a whole match, one keyframe or delta frame per line
+    """
+    assembler = MatchAssembler()
+    buffer = b""
+    response = {"message": "Data received successfully"}
+    key = request.headers.get("Idempotency-Key")
+    matches = 0
+
+    async def ingest(message: dict) -> dict:
+        nonlocal matches
+        # one upload can hold several matches, each needs its own key
+        data = GameData.model_validate(assembler.apply(message))
+        response = await asyncio.to_thread(ingest_frame, walletAddress, data, key and f"{key}:{matches}")
+        matches += "job_id" in response
+        return response
+
+    try:
+        async for chunk in request.stream():
+            messages, buffer = iter_ndjson(buffer + chunk)
+            for message in messages:
+                response = await ingest(message)
+        if buffer.strip():
+            response = await ingest(json.loads(buffer))
+    except INVALID_FRAME as e:
+        raise HTTPException(status_code=400, detail=f"Invalid frame {assembler.frames}: {e}")
+    return {**response, "frames": assembler.frames}
+
+@app.websocket("/ws/getUserData")
+async def game_stream_socket(websocket: WebSocket, walletAddress: str):
+    """
+    One connection per match: the client sends NDJSON keyframes / delta frames and
+    receives the game-over job once the match ends
+    """
+    await websocket.accept()
+    assembler = MatchAssembler()
+    try:
+        while True:
+            text = await websocket.receive_text()
+            messages, _ = iter_ndjson(text.encode() + b"\n")
+            for message in messages:
+                data = GameData.model_validate(assembler.apply(message))
+                response = await asyncio.to_thread(ingest_frame, walletAddress, data)
+                if "job_id" in response:
+                    await websocket.send_json({**response, "frames": assembler.frames})
+                    assembler = MatchAssembler()
+    except WebSocketDisconnect:
+        pass
+    except INVALID_FRAME as e:
+        await websocket.close(code=1003, reason=f"Invalid frame {assembler.frames}: {e}")
+
+async def game_over_pipeline(payload: dict):
+    walletAddress = payload["walletAddress"]
+    summary = payload["summary"]
+    prompt = "Give me a detailed and personalized feeedback on my Gameplay"
+    data = await structured_rag_response(prompt, [summary], cache_key=gameplay_features(summary))
+    logger.info("Gameplay feedback generated", extra={"wallet": walletAddress, "payload": data})
+    data = parse_feedback(data)
+    rewards_earned = data["Personalized Feeds"][0]["rewards earned"]
+    user_reputation = data["Personalized Feeds"][0]["user reputation"]
+    user_responses.set(walletAddress, data)
+    # not waited for here: a mint can outlast this job's lease, /jobs reports it
+    mint = mint_queue.enqueue(
+        "mint",
+        {"walletAddress": walletAddress, "rewards": rewards_earned, "reputation": user_reputation},
+        idempotency_key=make_key("mint", payload),
+    )
+    return {"aiagent": data, "mint_job_id": mint["id"]}
+
+async def mint_job(payload: dict):
+    """
+    Everything a retry needs to not mint twice (the artwork taken, every transaction signed) is checkpointed
+    on the job before it happens. A retry waits for those transactions instead of sending a new one.
+    """
+    walletAddress = payload["walletAddress"]
+    job = current_job.get()
+    progress = job["progress"] or {}
+    if "image" not in progress:
+        progress["image"] = await artwork_pool.take(payload["rewards"])
+        await asyncio.to_thread(mint_queue.checkpoint, job["id"], progress)
+    image_url = progress["image"]
+
+    def on_signed(tx_hash: str, nonce: int):
+        if progress.get("nonce") != nonce:
+            progress["tx_hashes"] = []
+        progress["nonce"] = nonce
+        progress["tx_hashes"].append(tx_hash)
+        mint_queue.checkpoint(job["id"], progress)
+
+    if "tx_hashes" in progress:
+        logger.info("Resuming mint", extra={"wallet": walletAddress, "nonce": progress["nonce"], "tx_hashes": progress["tx_hashes"]})
+        tx_hash = await asyncio.to_thread(
+            get_tx_manager().resume, "safeMint", payload["rewards"], image_url, image_url, walletAddress,
+            hashes=progress["tx_hashes"], nonce=progress["nonce"], on_signed=on_signed,
+        )
+    else:
+        logger.info("Minting", extra={"wallet": walletAddress, "rewards": payload["rewards"], "reputation": payload["reputation"], "image": image_url})
+        tx_hash = await asyncio.to_thread(mint_onchain, payload["rewards"], image_url, image_url, walletAddress, on_signed)
+    with stage("receipt_wait"):
+        receipt = await asyncio.wrap_future(get_tx_manager().future(tx_hash))
+    # a replacement, not the hash first sent, may be the one mined
+    return {"txn hash": receipt.transactionHash.hex(), "block": receipt.blockNumber, "image": image_url}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    status, result, error = job["status"], job["result"], job["error"]
+    mint_job_id = (result or {}).get("mint_job_id")
+    if status == SUCCEEDED and mint_job_id:
+        # a game over is done once its mint is
+        mint = job_queue.get(mint_job_id)
+        status, error = mint["status"], mint["error"]
+        if mint["result"]:
+            result = {"aiagent": result["aiagent"], "txn hash": mint["result"]["txn hash"], "block": mint["result"]["block"]}
+    return {
+        "job_id": job["id"],
+        "status": status,
+        "attempts": job["attempts"],
+        "result": result,
+        "error": error,
+        "mint_job_id": mint_job_id,
+    }
+
+@app.get("/users")
+async def users(offset: int = 0, limit: int = 50):
+    limit = max(1, min(limit, 500))
+    return {"users": indexer.users(offset, limit), "total": indexer.user_count(), "offset": offset, "limit": limit}
+
+@app.get("/nfts/{walletAddress}")
+async def nfts(walletAddress: str, offset: int = 0, limit: int = 50):
+    if not is_address(walletAddress):
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+    limit = max(1, min(limit, 500))
+    return {"nfts": indexer.nfts(walletAddress, offset, limit), "total": indexer.nft_count(walletAddress), "offset": offset, "limit": limit}
+
+@app.get("/stats")
+async def stats():
+    return {"worker": {"pid": os.getpid(), "signer": signer.is_leader}, "sessions": session_store.stats(), "jobs": job_queue.stats(), "transactions": _tx_manager.stats() if _tx_manager is not None else {}, "indexer": indexer.stats(), "artwork": artwork_pool.stats(), "responses": user_responses.stats(), "llm_cache": get_response_cache().stats(), "prompts": get_prompts().stats(), "rate_limits": limiter_stats(), "llm_endpoints": get_llm_client().pool.stats(), "json_extraction": extraction_stats.snapshot()}
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/getAIResponse")
 async def getAIResponse(walletAddress: str):
-    if not user_responses.get(walletAddress):
+    stored = user_responses.get(walletAddress)
+    if not stored:
         try:
-            json_data = await normal_chat("Generate a mock data that should give the user the insight that he has not played any games recently and encourage him to play some game")
-            print(json_data)
-            match = re.search(r'```(.*?)```', json_data, re.DOTALL)
-            if match:
-                json_data = match.group(1).strip()  # Extract and clean JSON
-            else:
-                json_data = json_data.strip('```json').strip('```')
-            print(json_data)
-            json_data = json_data.strip('```json').strip('```')
-            data = json.loads(json_data)
-            return data
-        except:
+            json_data = await normal_chat(NO_GAMES_PROMPT)
+            logger.info("AI response generated", extra={"wallet": walletAddress, "payload": json_data})
+            return parse_feedback(json_data)
+        except JSONExtractionError as e:
+            logger.warning("Could not extract a response: %s", e)
             return mock_data
         
-    return user_responses.get(walletAddress)
+    return stored
+
+@app.get("/getAIResponse/stream")
+async def getAIResponseStream(walletAddress: str):
+    """
+    Server-sent events: one `field` event per top-level key of the response as soon as the model
+    has finished generating it, then a `done` event with the whole response
+    """
+    async def events():
+        stored = user_responses.get(walletAddress)
+        if stored:
+            for key, value in stored.items():
+                yield sse_event("field", {"key": key, "value": value})
+            yield sse_event("done", stored)
+            return
+        extractor = IncrementalJSONExtractor()
+        try:
+            async for token in normal_chat_stream(NO_GAMES_PROMPT):
+                for key, value in extractor.feed(token):
+                    yield sse_event("field", {"key": key, "value": value})
+        except Exception as e:
+            logger.warning("Error generating response : %s", e)
+        try:
+            data = parse_feedback(extractor.text)
+        except JSONExtractionError:
+            data = mock_data
+        yield sse_event("done", data)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# system prompts a client may ask for with "persona", e.g. the graph dashboard's chatbot
+CHAT_PERSONAS = {None: "chat_system", "fun": "chat_fun_system"}
+
+def chat_messages(body: dict):
+    prompts = get_prompts()
+    prompt = body["prompt"]
+    persona = body.get("persona")
+    system = CHAT_PERSONAS.get(persona) if persona is None or isinstance(persona, str) else None
+    if system is None:
+        raise HTTPException(status_code=400, detail=f"Unknown persona {body.get('persona')!r}")
+    doc = prompts.fit("chat", "graph_data", body["graph_data"], system=system, prompt=prompt)
+    return prompts.messages("chat", system=system, graph_data=doc, prompt=prompt)
 
 @app.post("/chat")
 async def prompt(request: Request):
-    body = await request.json()
-    prompt = body["prompt"]
-    doc = str(body["graph_data"])
-    print(type(doc))
-    url = "https://0x0c8923d457934eae1a4ce708f07a980f1ce57a32.gaia.domains/v1/chat/completions"
-    headers = {
-    "accept": "application/json",
-    "Content-Type": "application/json",
-    "Authorization": f"Bearer {api_key}"
-    }
-    final_prompt = f"Based on this data : {doc}. Answer this question: {prompt}"
-    data = {
-    "messages": [
-        {"role": "system", "content": "You are an helpful assistant that knows about the graph and its data analysis and can quickly give correct answers"},
-        {"role": "user", "content": final_prompt}
-    ],
-    "model": "llama-3.2-3B-Instruct"
-    }
+    with stage("json_parse"):
+        body = await request.json()
+    messages = chat_messages(body)
     try:
-        response = requests.post(url, json=data, headers=headers)
+        # identical questions about the same graph share one completion
+        data = await get_response_cache().get_or_compute(
+            make_key("chat", messages), lambda: get_llm_client().chat_completion(messages), bool
+        )
+    except RateLimited as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     except Exception as e:
-        print(f"Error generating response : {e}")
-    print(response.text)
-    print(response.json())
-    data = response.json()
-    print(data)
-    return data['choices'][0]['message']['content']
+        logger.warning("Error generating response : %s", e)
+        raise HTTPException(status_code=502, detail=f"Error generating response : {e}")
+    logger.info("Chat response generated", extra={"payload": data})
+    return data
 
-def analyze_gameplay(game_data: GameData):
+@app.post("/chat/stream")
+async def prompt_stream(request: Request):
     """
-    AI-powered game data analysis
+    Server-sent events: one `token` event per completion token, then `done` (or `error`)
     """
-    total_shots = len(game_data.birds)
-    total_pigs = len(game_data.pigs)
-    destroyed_pigs = sum(1 for pig in game_data.pigs if pig.state == "Destroyed")
-    hit_percentage = (destroyed_pigs / total_pigs) * 100 if total_pigs > 0 else 0
+    messages = chat_messages(await request.json())
 
-    return {
-        "total_shots": total_shots,
-        "destroyed_pigs": destroyed_pigs,
-        "hit_percentage": hit_percentage,
-        "current_state": game_data.currentGameState,
-        "slingshot_state": game_data.slingshot.slingshotState,
-    }
+    async def events():
+        try:
+            async for token in get_llm_client().stream_chat_completion(messages):
+                yield sse_event("token", {"token": token})
+        except RateLimited as e:
+            yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+            return
+        except Exception as e:
+            logger.warning("Error generating response : %s", e)
+            yield sse_event("error", {"detail": f"Error generating response : {e}"})
+            return
+        yield sse_event("done", {})
 
-def mint_onchain(rewards_earned: int, image_uri: str, doppleganger_uri: str, walletAddress: str):
-    nonce = w3.eth.get_transaction_count(account.address)
-    # data = "metadata testing"
-    # encoded_text = abi.encode(["string"], [data])
-    # BLOB_DATA = (b"\x00" * 32 * (4096 - len(encoded_text) // 32)) + encoded_text
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
-    estimated_gas = contract.functions.safeMint(rewards_earned, image_uri, doppleganger_uri, walletAddress).estimate_gas({
-            "from": account.address
-    })
-    print("Estimated Gas:", estimated_gas)
-        
-        # Add a safety buffer to the gas estimate
-    gas_limit = int(estimated_gas * 1.3)
-    print("Using Gas Limit:", gas_limit)
-
-    tx = contract.functions.safeMint(rewards_earned, image_uri, doppleganger_uri, walletAddress).build_transaction({
-            "from": account.address,
-            "gas": gas_limit,  # Adjust gas based on network
-            "gasPrice": w3.eth.gas_price,
-            "nonce": nonce,
-    })
-
-    # Sign and Send Transaction
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        
-    print(f"Mint transaction sent! Tx Hash: {tx_hash.hex()}")
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-    print(f"Transaction confirmed in block {receipt.blockNumber}")
-    return tx_hash.hex()
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-def save_response_onchain(walletAddress : str, data: str):
-    nonce = w3.eth.get_transaction_count(account.address)
-    
-    tx = contract.functions.saveResponse(walletAddress, data).build_transaction({
-            "from": account.address,
-            "gas": 3100,  # Adjust gas based on network
-            "gasPrice": w3.eth.gas_price,
-            "nonce": nonce,
-    })
-
-    # Sign and Send Transaction
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        
-    print(f"Mint transaction sent! Tx Hash: {tx_hash.hex()}")
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-    print(f"Transaction confirmed in block {receipt.blockNumber}")
-    return tx_hash.hex()
-
-def image_to_text(rewards: int):
-    if rewards <= 6:
-        text = "Generate a sad and unexcited animated angry bird with yellow background color. Keep it plain and simple and with some good facial expressions and a Sword in hand. The background color, color of the bird and the facial expression should keep changing"
-    else:
-        text = "Generate an animated angry bird which should look very happy and enthusiastic and a sword  and plain red background. Keep it plain and simple and with some good facial expressions and a Sword in hand. The background color, color of the bird, object in hand of the angry bird and the facial expression should keep changing" 
-    r = requests.post(
-    "https://api.deepai.org/api/text2img",
-    data={
-        'text': text,
-    },
-        headers={'api-key': os.environ.get("DEEPAI_API_KEY")},
-    )
-    return r.json()["share_url"]
+def analyze_gameplay(game_data: GameData):
+    """
+    AI-powered game data analysis of a single frame
+    """
+    return summarize_documents([game_data.model_dump()])
 
+def mint_onchain(rewards_earned: int, image_uri: str, doppleganger_uri: str, walletAddress: str, on_signed=None):
+    tx_hash = get_tx_manager().submit("safeMint", rewards_earned, image_uri, doppleganger_uri, walletAddress, on_signed=on_signed)
+    logger.info("Mint transaction sent! Tx Hash: %s", tx_hash)
+    return tx_hash
 
+def save_response_onchain(walletAddress : str, data: str):
+    tx_hash = get_tx_manager().submit("saveResponse", walletAddress, data)
+    logger.info("Save response transaction sent! Tx Hash: %s", tx_hash)
+    return tx_hash
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+    workers = int(os.environ.get("SERVER_WORKERS", 1))
+    if workers > 1:
+        # in-progress matches have to be visible to every worker
+        os.environ.setdefault("SESSION_STORE", "sqlite")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("SERVER_PORT", 8000)),
+        workers=workers,
+        reload=workers == 1 and os.environ.get("SERVER_RELOAD", "true").lower() == "true",
+        log_level="info",
+    )
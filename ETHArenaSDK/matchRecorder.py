@@ -0,0 +1,111 @@
+"""
+Recordings of the frames the game sends to /getUserData, for replaying real traffic in the benchmarks.
+
+A recording is NDJSON (gzip compressed when the file name ends in .gz), one frame per line:
+
+    {"t": 1718000000.25, "match": "3f9a0c...", "frame": {...}}
+
+`t` is when the server received the frame and `match` identifies the match without the wallet address.
+`frame` is the GameData JSON built by GameManager.CollectGameData in the Unity game (models in gameData.py):
+
+    {
+        "currentGameState": "Start" | "Playing" | "Won" | "Lost",
+        "birds":  [{"position": {"x": float, "y": float}, "state": "Idle" | "Moving"}, ...],
+        "pigs":   [{"position": {"x": float, "y": float}, "state": "Alive" | "Destroyed"}, ...],
+        "bricks": [{"position": {"x": float, "y": float}, "state": "Idle" | "Moving"}, ...],
+        "slingshot": {"birdToThrow": "<bird name>" | "None", "slingshotState": "Idle" | "UserPulling" | "BirdFlying"}
+    }
+
+Destroyed pigs keep their slot at position (0, 0), so the lists have the same length throughout a match.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def open_recording(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class MatchRecorder:
+    """
+    Appends every received frame to a recording. `sample_rate` keeps that share of the matches, whole.
+    A `{pid}` in the path is replaced by the process id, so each worker process writes its own file.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0):
+        self.path = path.replace("{pid}", str(os.getpid()))
+        self.sample_rate = sample_rate
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open_recording(self.path, "a")
+        self.lock = threading.Lock()
+        self.frames = 0
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get("MATCH_RECORD_PATH")
+        if not path:
+            return None
+        return cls(path, sample_rate=float(os.environ.get("MATCH_RECORD_SAMPLE_RATE", 1)))
+
+    @staticmethod
+    def match_id(wallet: str, started_at: float) -> str:
+        return hashlib.sha256(f"{wallet.lower()}:{started_at}".encode()).hexdigest()[:16]
+
+    def record(self, wallet: str, started_at: float, frame):
+        """
+        `frame` is either the frame as a dict or the request body it was parsed from, which is kept as sent
+        """
+        match = self.match_id(wallet, started_at)
+        if self.sample_rate < 1 and int(match[:8], 16) / 0xFFFFFFFF >= self.sample_rate:
+            return
+        if isinstance(frame, bytes) and b"\n" not in frame and b"\r" not in frame:
+            line = f'{{"t":{round(time.time(), 3)},"match":"{match}","frame":{frame.decode()}}}'
+        else:
+            if isinstance(frame, bytes):
+                frame = json.loads(frame)
+            line = json.dumps({"t": round(time.time(), 3), "match": match, "frame": frame}, separators=(",", ":"))
+        with self.lock:
+            self.file.write(line + "\n")
+            self.frames += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def stats(self) -> dict:
+        return {"path": self.path, "frames": self.frames}
+
+
+def read_matches(path: str) -> list:
+    """
+    The matches of a recording, each a list of frames in the order they were received
+    """
+    matches = OrderedDict()
+    with open_recording(path, "r") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                matches.setdefault(entry["match"], []).append(entry["frame"])
+    return list(matches.values())
+
+
+def write_matches(path: str, matches: list, frame_interval: float = 0.5):
+    """
+    Writes `matches` (lists of frames) as a recording, frames `frame_interval` seconds apart
+    """
+    now = time.time()
+    with open_recording(path, "w") as f:
+        for index, frames in enumerate(matches):
+            match = hashlib.sha256(f"match:{index}".encode()).hexdigest()[:16]
+            for offset, frame in enumerate(frames):
+                entry = {"t": round(now + offset * frame_interval, 3), "match": match, "frame": frame}
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
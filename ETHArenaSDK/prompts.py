@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import re
+import threading
+from functools import cached_property
+
+from telemetry import PROMPT_TOKENS
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PROMPTS_PATH = os.path.join(ROOT, "prompts.json")
+FIELD = re.compile(r"\{(\w+)\}")
+
+
+class Template:
+    """
+    A prompt with `{field}` placeholders, split into literal and field parts once.
+    Any other braces (the JSON skeleton in the system prompt) are plain text, no escaping needed.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        parts = FIELD.split(text)
+        self.literals = parts[0::2]
+        self.fields = parts[1::2]
+
+    def render(self, **values) -> str:
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(str(values[field]))
+            parts.append(literal)
+        return "".join(parts)
+
+
+class TokenCounter:
+    """
+    Prompt tokens as counted by a `tokenizers` tokenizer, either a tokenizer.json path or a Hugging Face hub id.
+    Without one (or when it can't be loaded) a token is taken to be 4 characters.
+    """
+
+    def __init__(self, name: str = None):
+        self.name = name
+
+    @cached_property
+    def tokenizer(self):
+        if not self.name:
+            return None
+        try:
+            from tokenizers import Tokenizer
+
+            if os.path.isfile(self.name):
+                return Tokenizer.from_file(self.name)
+            return Tokenizer.from_pretrained(self.name)
+        except Exception as e:
+            logger.warning("Could not load tokenizer %s, estimating 4 characters per token: %s", self.name, e)
+            return None
+
+    def count(self, text: str) -> int:
+        if self.tokenizer is None:
+            return (len(text) + 3) // 4
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, tokens: int) -> str:
+        if self.tokenizer is None:
+            return text[:tokens * 4]
+        encoding = self.tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= tokens:
+            return text
+        return text[:encoding.offsets[tokens][0]]
+
+
+def is_frames(documents) -> bool:
+    return isinstance(documents, list) and bool(documents) and all(
+        isinstance(document, dict) and "currentGameState" in document for document in documents
+    )
+
+
+class PromptRegistry:
+    """
+    The prompts of prompts.json, loaded and compiled once.
+    Every request of a template starts with the same system message object, byte for byte identical between calls,
+    so an upstream that caches prompt prefixes only has to process the user message.
+    `fit` keeps documents within `budget` prompt tokens: raw frames are replaced by their match summary,
+    anything still too long is cut.
+    """
+
+    def __init__(self, path: str = PROMPTS_PATH, counter: TokenCounter = None, budget: int = 4096):
+        with open(path) as f:
+            raw = json.load(f)
+        self.templates = {
+            name: Template("\n".join(text) if isinstance(text, list) else text)
+            for name, text in raw.items()
+            if text
+        }
+        self.counter = counter or TokenCounter()
+        self.budget = budget
+        self.systems = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.summarized = 0
+        self.trimmed = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.environ.get("PROMPTS_PATH") or PROMPTS_PATH,
+            counter=TokenCounter(os.environ.get("PROMPT_TOKENIZER")),
+            budget=int(os.environ.get("PROMPT_TOKEN_BUDGET", 4096)),
+        )
+
+    def system(self, name: str) -> tuple:
+        """
+        (message, token count) of a system prompt, built on first use and shared by every request after that
+        """
+        entry = self.systems.get(name)
+        if entry is None:
+            text = self.templates[name].text
+            entry = self.systems[name] = ({"role": "system", "content": text}, self.counter.count(text))
+        return entry
+
+    def messages(self, name: str, system: str = "system_prompt", **fields) -> list:
+        message, system_tokens = self.system(system)
+        content = self.templates[name].render(**fields)
+        tokens = system_tokens + self.counter.count(content)
+        PROMPT_TOKENS.observe(tokens, name)
+        with self.lock:
+            self.requests += 1
+            self.prompt_tokens += tokens
+        return [message, {"role": "user", "content": content}]
+
+    def fit(self, name: str, field: str, documents, system: str = "system_prompt", **fields) -> str:
+        """
+        `documents` as the text of `field` in template `name`, shortened so the whole request stays within budget
+        """
+        available = self.budget - self.system(system)[1] - self.counter.count(
+            self.templates[name].render(**{field: ""}, **fields)
+        )
+        text = str(documents)
+        if self.counter.count(text) <= available:
+            return text
+        if is_frames(documents):
+            from analytics import summarize_documents
+
+            text = str([summarize_documents(documents)])
+            with self.lock:
+                self.summarized += 1
+            if self.counter.count(text) <= available:
+                return text
+        with self.lock:
+            self.trimmed += 1
+        return self.counter.truncate(text, max(0, available))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "tokenizer": self.counter.name if self.counter.tokenizer is not None else "estimate",
+                "budget": self.budget,
+                "requests": self.requests,
+                "mean_prompt_tokens": round(self.prompt_tokens / self.requests, 1) if self.requests else 0,
+                "summarized": self.summarized,
+                "trimmed": self.trimmed,
+            }
+
+
+_prompts = None
+
+
+def get_prompts() -> PromptRegistry:
+    global _prompts
+    if _prompts is None:
+        _prompts = PromptRegistry.from_env()
+    return _prompts
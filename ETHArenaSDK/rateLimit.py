@@ -0,0 +1,154 @@
+import asyncio
+import os
+import threading
+import time
+
+# requests per second, burst, longest a caller may queue before it is turned away
+DEFAULT_LIMITS = {
+    "gaia": (5.0, 10, 10.0),
+    "deepai": (1.0, 2, 60.0),
+    "rpc": (20.0, 40, 5.0),
+}
+
+
+class RateLimited(Exception):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} rate limit exceeded, retry in {retry_after:.1f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket shared by async and threaded callers. A caller that finds the bucket empty reserves
+    the next token and sleeps until it is due, unless that is more than `max_wait` away, then it gets
+    RateLimited instead of joining an ever growing queue.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_wait: float):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.granted = 0
+        self.delayed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, name: str):
+        """
+        The RATE_LIMIT_* limits apply to the whole server: with SERVER_WORKERS processes each one gets its share
+        """
+        rate, burst, max_wait = DEFAULT_LIMITS.get(name, (10.0, 20, 10.0))
+        prefix = f"RATE_LIMIT_{name.upper()}"
+        workers = max(1, int(os.environ.get("SERVER_WORKERS", 1)))
+        return cls(
+            name,
+            rate=float(os.environ.get(f"{prefix}_RPS", rate)) / workers,
+            burst=max(1, int(os.environ.get(f"{prefix}_BURST", burst)) // workers),
+            max_wait=float(os.environ.get(f"{prefix}_MAX_WAIT", max_wait)),
+        )
+
+    def _reserve(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait > self.max_wait:
+                self.rejected += 1
+                raise RateLimited(self.name, wait)
+            self.tokens -= 1
+            self.granted += 1
+            if wait:
+                self.delayed += 1
+            return wait
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a token only if one is available right now
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.granted += 1
+            return True
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    def stats(self) -> dict:
+        return {"granted": self.granted, "delayed": self.delayed, "rejected": self.rejected}
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution of `compute` and all get its result (or error)
+    """
+
+    def __init__(self):
+        self.flights = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, compute):
+        flight = self.flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(flight)
+        flight = asyncio.ensure_future(compute())
+        self.flights[key] = flight
+        flight.add_done_callback(lambda _: self.flights.pop(key, None))
+        self.executed += 1
+        return await asyncio.shield(flight)
+
+    def pending(self, key: str):
+        """
+        The in-flight execution for `key`, if any, for callers that can only join and not lead
+        """
+        flight = self.flights.get(key)
+        return asyncio.shield(flight) if flight is not None else None
+
+    def stats(self) -> dict:
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self.flights)}
+
+
+_limiters = {}
+
+
+def get_limiter(name: str) -> TokenBucket:
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = _limiters[name] = TokenBucket.from_env(name)
+    return limiter
+
+
+def limiter_stats() -> dict:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
+
+
+def rpc_rate_limit_middleware(make_request, w3):
+    """
+    web3 middleware that spends an "rpc" token on every JSON-RPC request, from any thread
+    """
+    limiter = get_limiter("rpc")
+
+    def middleware(method, params):
+        limiter.acquire_sync()
+        return make_request(method, params)
+
+    return middleware
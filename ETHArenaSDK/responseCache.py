@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from rateLimit import SingleFlight
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def make_key(namespace: str, material) -> str:
+    """
+    Content address for a cache entry: sha256 of the canonical JSON of `material`
+    """
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha256(encoded.encode()).hexdigest()}"
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache for LLM completions with an optional SQLite tier that survives restarts
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600, disk_path: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.flights = SingleFlight()
+        self.db = None
+        if disk_path:
+            self.db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_entries=int(os.environ.get("LLM_CACHE_SIZE", 1024)),
+            ttl=float(os.environ.get("LLM_CACHE_TTL", 3600)),
+            disk_path=os.environ.get("LLM_CACHE_PATH") or None,
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self._remember(key, value, expires_at)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute, validate=None):
+        """
+        Cached value for `key`; on a miss concurrent callers share a single `compute()`
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        async def compute_and_store():
+            value = await compute()
+            if validate is None or validate(value):
+                self.set(key, value)
+            return value
+
+        return await self.flights.do(key, compute_and_store)
+
+    def invalidate(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+            if self.db is not None:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        now = time.time()
+        with self.lock:
+            for key in [key for key, (_, expires_at) in self.entries.items() if expires_at <= now]:
+                del self.entries[key]
+            if self.db is not None:
+                self.db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "single_flight": self.flights.stats(),
+            }
+
+
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache.from_env()
+    return _response_cache
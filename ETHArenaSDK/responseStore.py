@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_responses (
+    wallet TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def encode(data: dict) -> bytes:
+    # compact JSON + zlib, a stored feedback response shrinks to roughly a third
+    return zlib.compress(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode(), 6)
+
+
+def decode(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob))
+
+
+class SQLiteBackend:
+    """
+    Persistent tier on a local SQLite file, shared by every worker process on the host
+    """
+
+    def __init__(self, path: str = "responses.db"):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.executescript(SCHEMA)
+
+    def get(self, wallet: str):
+        with self.lock:
+            row = self.db.execute("SELECT data FROM user_responses WHERE wallet = ?", (wallet,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, wallet: str, blob: bytes):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO user_responses (wallet, data, updated_at) VALUES (?, ?, ?)",
+                (wallet, blob, time.time()),
+            )
+
+    def count(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM user_responses").fetchone()[0]
+
+
+class RedisBackend:
+    """
+    Tier on Redis (or anything speaking its GET/SET), shared across hosts. `client` is any object with
+    redis-py's get/set, so a local stand-in can be passed in tests.
+    """
+
+    def __init__(self, client=None, url: str = "redis://localhost:6379/0", prefix: str = "etharena:response:",
+                 ttl: int = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("RESPONSE_STORE=redis needs the redis package: pip install redis")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, wallet: str):
+        return self.client.get(self.prefix + wallet)
+
+    def set(self, wallet: str, blob: bytes):
+        self.client.set(self.prefix + wallet, blob, ex=self.ttl)
+
+    def count(self) -> int:
+        return None
+
+
+class ResponseStore:
+    """
+    Latest AI feedback per wallet: a bounded in-process LRU in front of an optional shared backend.
+    Front entries expire after `front_ttl` so a response written by another worker shows up within that time.
+    """
+
+    def __init__(self, backend=None, max_entries: int = 10000, front_ttl: float = 60.0):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.front_ttl = front_ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        kind = os.environ.get("RESPONSE_STORE", "sqlite")
+        if kind == "memory":
+            backend = None
+        elif kind == "redis":
+            backend = RedisBackend(url=os.environ.get("RESPONSE_STORE_URL") or "redis://localhost:6379/0")
+        else:
+            backend = SQLiteBackend(os.environ.get("RESPONSE_STORE_PATH", "responses.db"))
+        return cls(
+            backend,
+            max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", 10000)),
+            front_ttl=float(os.environ.get("RESPONSE_CACHE_TTL", 60)),
+        )
+
+    def _remember(self, wallet: str, data: dict):
+        self.entries[wallet] = (data, time.monotonic())
+        self.entries.move_to_end(wallet)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, wallet: str):
+        wallet = wallet.lower()
+        with self.lock:
+            entry = self.entries.get(wallet)
+            if entry is not None and (self.backend is None or time.monotonic() - entry[1] < self.front_ttl):
+                self.entries.move_to_end(wallet)
+                self.hits += 1
+                return entry[0]
+        blob = self.backend.get(wallet) if self.backend is not None else None
+        with self.lock:
+            if blob is None:
+                self.entries.pop(wallet, None)
+                self.misses += 1
+                return None
+            data = decode(blob)
+            self._remember(wallet, data)
+            self.backend_hits += 1
+            return data
+
+    def set(self, wallet: str, data: dict):
+        wallet = wallet.lower()
+        if self.backend is not None:
+            self.backend.set(wallet, encode(data))
+        with self.lock:
+            self._remember(wallet, data)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "backend": type(self.backend).__name__ if self.backend is not None else "memory",
+                "entries": len(self.entries),
+                "stored": self.backend.count() if self.backend is not None else len(self.entries),
+                "hits": self.hits,
+                "backend_hits": self.backend_hits,
+                "misses": self.misses,
+            }
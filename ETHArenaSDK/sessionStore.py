@@ -0,0 +1,390 @@
+import os
+import sqlite3
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+
+from gameData import GameData
+
+# t, currentGameState, birdToThrow, slingshotState, #birds, #pigs, #bricks
+HEADER = struct.Struct("<dHHHHHH")
+OBJECT_KINDS = ("birds", "pigs", "bricks")
+
+
+class StringTable:
+    """
+    Interns the small set of enum-like strings sent by the game (states, bird names)
+    so that frames only carry 2 byte codes.
+    Once `attach`ed to a SQLite file the codes are assigned there, so every worker process
+    encodes and decodes records written by any other one the same way.
+    """
+
+    def __init__(self, max_size: int = 65535):
+        self.max_size = max_size
+        self.codes = {"Unknown": 0}
+        self.values = {0: "Unknown"}
+        self.lock = threading.Lock()
+        self.db = None
+
+    def attach(self, path: str):
+        with self.lock:
+            self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA busy_timeout=5000")
+            self.db.execute("CREATE TABLE IF NOT EXISTS strings (code INTEGER PRIMARY KEY, value TEXT UNIQUE NOT NULL)")
+            self.db.execute("INSERT OR IGNORE INTO strings (code, value) VALUES (0, 'Unknown')")
+            self.codes = {"Unknown": 0}
+            self.values = {0: "Unknown"}
+            self._load()
+
+    def _load(self):
+        for code, value in self.db.execute("SELECT code, value FROM strings"):
+            self.codes[value] = code
+            self.values[code] = value
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is not None:
+            return code
+        with self.lock:
+            code = self.codes.get(value)
+            if code is None:
+                if len(self.values) >= self.max_size:
+                    return 0
+                if self.db is None:
+                    code = len(self.values)
+                else:
+                    self.db.execute("INSERT OR IGNORE INTO strings (value) VALUES (?)", (value,))
+                    code = self.db.execute("SELECT code FROM strings WHERE value = ?", (value,)).fetchone()[0]
+                self.values[code] = value
+                self.codes[value] = code
+            return code
+
+    def decode(self, code: int) -> str:
+        value = self.values.get(code)
+        if value is None and self.db is not None:
+            # assigned by another process since we last looked
+            with self.lock:
+                self._load()
+            value = self.values.get(code)
+        return value if value is not None else "Unknown"
+
+
+strings = StringTable()
+
+
+def encode_frame(data, timestamp: float = None) -> bytes:
+    """
+    Packs a GameData frame (the model or its dict form) into a fixed layout record:
+    header, then float32 (x, y) pairs for birds + pigs + bricks, then one uint16 state code per object
+    """
+    if isinstance(data, GameData):
+        return encode_game_data(data, timestamp)
+    objects = [obj for kind in OBJECT_KINDS for obj in data.get(kind, [])]
+    positions = array("f")
+    states = array("H")
+    for obj in objects:
+        position = obj.get("position", {})
+        positions.append(position.get("x", 0.0))
+        positions.append(position.get("y", 0.0))
+        states.append(strings.encode(obj.get("state", "")))
+    slingshot = data.get("slingshot") or {}
+    header = HEADER.pack(
+        time.time() if timestamp is None else timestamp,
+        strings.encode(data.get("currentGameState", "")),
+        strings.encode(slingshot.get("birdToThrow", "None")),
+        strings.encode(slingshot.get("slingshotState", "")),
+        len(data.get("birds", [])),
+        len(data.get("pigs", [])),
+        len(data.get("bricks", [])),
+    )
+    return header + positions.tobytes() + states.tobytes()
+
+
+def encode_game_data(game: GameData, timestamp: float = None) -> bytes:
+    # the positions are already packed in the record layout
+    kinds = (game.birds, game.pigs, game.bricks)
+    header = HEADER.pack(
+        time.time() if timestamp is None else timestamp,
+        strings.encode(game.currentGameState),
+        strings.encode(game.slingshot.birdToThrow),
+        strings.encode(game.slingshot.slingshotState),
+        *map(len, kinds),
+    )
+    states = array("H", [strings.encode(state) for objects in kinds for state in objects.states])
+    return b"".join([header, *(objects.positions.tobytes() for objects in kinds), states.tobytes()])
+
+
+def decode_header(record: bytes) -> tuple:
+    return HEADER.unpack_from(record)
+
+
+def decode_frame(record: bytes) -> dict:
+    timestamp, game_state, bird_to_throw, slingshot_state, *counts = HEADER.unpack_from(record)
+    total = sum(counts)
+    positions = array("f")
+    positions.frombytes(record[HEADER.size:HEADER.size + total * 8])
+    states = array("H")
+    states.frombytes(record[HEADER.size + total * 8:HEADER.size + total * 10])
+    frame = {
+        "currentGameState": strings.decode(game_state),
+        "slingshot": {
+            "birdToThrow": strings.decode(bird_to_throw),
+            "slingshotState": strings.decode(slingshot_state),
+        },
+    }
+    index = 0
+    for kind, count in zip(OBJECT_KINDS, counts):
+        frame[kind] = [
+            {
+                "position": {"x": positions[2 * i], "y": positions[2 * i + 1]},
+                "state": strings.decode(states[i]),
+            }
+            for i in range(index, index + count)
+        ]
+        index += count
+    return frame
+
+
+class MatchSession:
+    def __init__(self, wallet: str, max_frames: int):
+        self.wallet = wallet
+        self.frames = deque(maxlen=max_frames)
+        self.nbytes = 0
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+
+    def append(self, record: bytes):
+        if len(self.frames) == self.frames.maxlen:
+            self.nbytes -= len(self.frames[0])
+        self.frames.append(record)
+        self.nbytes += len(record)
+        self.last_seen = time.time()
+
+    def decoded(self) -> list:
+        return [decode_frame(record) for record in self.frames]
+
+
+class SessionStore:
+    """
+    Per-wallet buffer of in-progress matches.
+    Each session keeps at most `max_frames` packed frames, at most `max_sessions` sessions are kept
+    (least recently seen is dropped first) and sessions idle for longer than `ttl` seconds are evicted.
+    """
+
+    def __init__(self, max_frames: int = 256, max_sessions: int = 10000, ttl: float = 900):
+        self.max_frames = max_frames
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.evicted = 0
+        self.frames_received = 0
+
+    @classmethod
+    def from_env(cls):
+        if os.environ.get("SESSION_STORE", "memory") == "sqlite":
+            return SharedSessionStore.from_env()
+        return cls(
+            max_frames=int(os.environ.get("SESSION_MAX_FRAMES", 256)),
+            max_sessions=int(os.environ.get("SESSION_MAX_SESSIONS", 10000)),
+            ttl=float(os.environ.get("SESSION_TTL", 900)),
+        )
+
+    def append(self, wallet: str, data) -> MatchSession:
+        record = encode_frame(data)
+        with self.lock:
+            session = self.sessions.get(wallet)
+            if session is None:
+                session = MatchSession(wallet, self.max_frames)
+                self.sessions[wallet] = session
+            else:
+                self.sessions.move_to_end(wallet)
+            session.append(record)
+            self.frames_received += 1
+            self._evict()
+        return session
+
+    def get(self, wallet: str) -> MatchSession:
+        with self.lock:
+            return self.sessions.get(wallet)
+
+    def pop(self, wallet: str) -> MatchSession:
+        with self.lock:
+            return self.sessions.pop(wallet, None)
+
+    def evict_expired(self) -> int:
+        with self.lock:
+            return self._evict()
+
+    def _evict(self) -> int:
+        evicted = 0
+        deadline = time.time() - self.ttl
+        while self.sessions:
+            wallet, session = next(iter(self.sessions.items()))
+            if len(self.sessions) <= self.max_sessions and session.last_seen >= deadline:
+                break
+            del self.sessions[wallet]
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "sessions": len(self.sessions),
+                "frames": sum(len(session.frames) for session in self.sessions.values()),
+                "buffered_bytes": sum(session.nbytes for session in self.sessions.values()),
+                "frames_received": self.frames_received,
+                "evicted_sessions": self.evicted,
+                "rss_bytes": rss_bytes(),
+            }
+
+
+SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    wallet TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+CREATE TABLE IF NOT EXISTS frames (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    wallet TEXT NOT NULL,
+    record BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frames_wallet ON frames (wallet, id);
+"""
+
+
+class SharedSessionStore:
+    """
+    SessionStore on a SQLite file shared by every worker process, so consecutive frames of one match
+    may land on any worker. Same limits as SessionStore; the session count and idle limits
+    are enforced by the periodic `evict_expired` rather than on every frame.
+    """
+
+    def __init__(self, path: str = "sessions.db", max_frames: int = 256, max_sessions: int = 10000, ttl: float = 900):
+        self.max_frames = max_frames
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.executescript(SHARED_SCHEMA)
+        self.evicted = 0
+        self.frames_received = 0
+        strings.attach(path)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.environ.get("SESSION_DB_PATH", "sessions.db"),
+            max_frames=int(os.environ.get("SESSION_MAX_FRAMES", 256)),
+            max_sessions=int(os.environ.get("SESSION_MAX_SESSIONS", 10000)),
+            ttl=float(os.environ.get("SESSION_TTL", 900)),
+        )
+
+    def append(self, wallet: str, data) -> MatchSession:
+        record = encode_frame(data)
+        now = time.time()
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                created_at = self.db.execute(
+                    "INSERT INTO sessions (wallet, created_at, last_seen) VALUES (?, ?, ?) "
+                    "ON CONFLICT (wallet) DO UPDATE SET last_seen = excluded.last_seen RETURNING created_at",
+                    (wallet, now, now),
+                ).fetchone()[0]
+                self.db.execute("INSERT INTO frames (wallet, record) VALUES (?, ?)", (wallet, record))
+                self.db.execute(
+                    "DELETE FROM frames WHERE wallet = ? AND id <= "
+                    "(SELECT id FROM frames WHERE wallet = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (wallet, wallet, self.max_frames),
+                )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.frames_received += 1
+        session = MatchSession(wallet, self.max_frames)
+        session.append(record)
+        session.created_at = created_at
+        return session
+
+    def _load(self, wallet: str) -> MatchSession:
+        row = self.db.execute("SELECT created_at, last_seen FROM sessions WHERE wallet = ?", (wallet,)).fetchone()
+        if row is None:
+            return None
+        session = MatchSession(wallet, self.max_frames)
+        for (record,) in self.db.execute("SELECT record FROM frames WHERE wallet = ? ORDER BY id", (wallet,)):
+            session.append(record)
+        session.created_at, session.last_seen = row
+        return session
+
+    def get(self, wallet: str) -> MatchSession:
+        with self.lock:
+            return self._load(wallet)
+
+    def pop(self, wallet: str) -> MatchSession:
+        # only one of several workers finishing the same match gets its frames
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                session = self._load(wallet)
+                if session is not None:
+                    self.db.execute("DELETE FROM frames WHERE wallet = ?", (wallet,))
+                    self.db.execute("DELETE FROM sessions WHERE wallet = ?", (wallet,))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return session
+
+    def evict_expired(self) -> int:
+        deadline = time.time() - self.ttl
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                wallets = [row[0] for row in self.db.execute(
+                    "SELECT wallet FROM sessions WHERE last_seen < ? OR wallet IN "
+                    "(SELECT wallet FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+                    (deadline, self.max_sessions),
+                )]
+                for wallet in wallets:
+                    self.db.execute("DELETE FROM frames WHERE wallet = ?", (wallet,))
+                    self.db.execute("DELETE FROM sessions WHERE wallet = ?", (wallet,))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.evicted += len(wallets)
+        return len(wallets)
+
+    def stats(self) -> dict:
+        with self.lock:
+            sessions = self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            frames, nbytes = self.db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(record)), 0) FROM frames").fetchone()
+            return {
+                "sessions": sessions,
+                "frames": frames,
+                "buffered_bytes": nbytes,
+                "frames_received": self.frames_received,
+                "evicted_sessions": self.evicted,
+                "rss_bytes": rss_bytes(),
+            }
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if os.uname().sysname == "Darwin" else usage * 1024
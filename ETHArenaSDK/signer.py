@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import os
+
+from filelock import FileLock, Timeout
+
+logger = logging.getLogger(__name__)
+
+
+class SignerLock:
+    """
+    Elects the one worker process on a host that holds the signing key's nonce sequence.
+    The holder of an exclusive lock on `path` is the signer, the lock is released by the OS when
+    that process exits, and every other worker keeps trying every `retry_interval` seconds to take over.
+    """
+
+    def __init__(self, path: str = "signer.lock", retry_interval: float = 5.0):
+        self.path = path
+        self.retry_interval = retry_interval
+        # held by the process, not the thread that took it: transactions are sent from worker threads
+        self.lock = FileLock(path, timeout=0, thread_local=False)
+        self._task = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.environ.get("SIGNER_LOCK_PATH", "signer.lock"),
+            retry_interval=float(os.environ.get("SIGNER_RETRY_INTERVAL", 5)),
+        )
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.is_locked
+
+    def try_acquire(self) -> bool:
+        if self.is_leader:
+            return True
+        try:
+            self.lock.acquire()
+        except Timeout:
+            return False
+        logger.info("Process %s is the transaction signer", os.getpid())
+        return True
+
+    async def _campaign(self, on_elected):
+        while not self.try_acquire():
+            await asyncio.sleep(self.retry_interval)
+        await on_elected()
+
+    def start(self, on_elected):
+        """
+        Calls `on_elected` (a coroutine function) once this process becomes the signer
+        """
+        self._task = asyncio.create_task(self._campaign(on_elected))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            self.lock.release()
@@ -0,0 +1,220 @@
+import atexit
+import bisect
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# ---- logging ----
+
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class PayloadSampler(logging.Filter):
+    """
+    Keeps the `payload` of only a sample of records and truncates the ones it keeps,
+    so logging a full frame or completion costs a size field most of the time
+    """
+
+    def __init__(self, sample_rate: float = 0.01, max_chars: int = 2000):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_chars = max_chars
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        payload = getattr(record, "payload", None)
+        if payload is None:
+            return True
+        if random.random() >= self.sample_rate:
+            # the unsampled majority never gets serialized
+            del record.payload
+            return True
+        if isinstance(payload, bytes):
+            payload = payload.decode(errors="replace")
+        text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+        record.payload_chars = len(text)
+        record.payload = text[:self.max_chars] + ("..." if len(text) > self.max_chars else "")
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in STANDARD_ATTRIBUTES)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+_listener = None
+
+
+def setup_logging(level: str = None, sample_rate: float = None, max_chars: int = None):
+    """
+    Routes every log record through a queue to a background thread that formats and writes it,
+    request handlers only pay for the enqueue
+    """
+    global _listener
+    if _listener is not None:
+        return
+    records = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(JSONFormatter())
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    handler = logging.handlers.QueueHandler(records)
+    handler.addFilter(PayloadSampler(
+        sample_rate=float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", 0.01)) if sample_rate is None else sample_rate,
+        max_chars=int(os.environ.get("LOG_PAYLOAD_MAX_CHARS", 2000)) if max_chars is None else max_chars,
+    ))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level or os.environ.get("LOG_LEVEL", "INFO"))
+
+
+def stop_logging():
+    """
+    Flushes the queued records and detaches the queue handler
+    """
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in [handler for handler in root.handlers if isinstance(handler, logging.handlers.QueueHandler)]:
+        root.removeHandler(handler)
+    _listener.stop()
+    _listener = None
+
+
+# ---- metrics ----
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    # the exposition format only allows these three escapes inside a label value
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for labels, (counts, total, count) in sorted(self.series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    bucket_labels = _labels(self.labelnames + ("le",), labels + (bound,))
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "etharena_stage_seconds",
+    "Time spent in each stage of request handling and the game-over pipeline",
+    labelnames=("stage",),
+))
+REQUEST_SECONDS = registry.register(Histogram(
+    "etharena_http_request_seconds",
+    "HTTP request latency by route",
+    labelnames=("method", "route", "status"),
+))
+PROMPT_TOKENS = registry.register(Histogram(
+    "etharena_prompt_tokens",
+    "Prompt tokens per LLM request by prompt template",
+    labelnames=("template",),
+    buckets=(128, 256, 512, 1024, 2048, 4096, 8192, 16384),
+))
+STAGE_ERRORS = registry.register(Counter(
+    "etharena_stage_errors_total",
+    "Stages that raised",
+    labelnames=("stage",),
+))
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times a block into etharena_stage_seconds{stage=name}, works around sync and async code alike
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(name)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, name)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the server modules are imported by name from the package directory, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,74 @@
+from analytics import summarize_documents, summarize_match
+from sessionStore import encode_frame
+
+
+def frame(state, bird_x, pigs, bricks, moving=0):
+    """
+    One bird at `bird_x`, pigs given as states, bricks as heights (the first `moving` of them Moving)
+    """
+    return {
+        "currentGameState": state,
+        "slingshot": {"birdToThrow": "Bird", "slingshotState": "Idle"},
+        "birds": [{"position": {"x": bird_x, "y": 0.0}, "state": "Idle"}],
+        "pigs": [{"position": {"x": 10.0, "y": 0.0}, "state": pig} for pig in pigs],
+        "bricks": [
+            {"position": {"x": 8.0, "y": height}, "state": "Moving" if i < moving else "Idle"}
+            for i, height in enumerate(bricks)
+        ],
+    }
+
+
+MATCH = [
+    frame("Start", -8.0, ["Alive", "Alive"], [1.0, 2.0, 3.0, 4.0]),
+    frame("Start", -8.0, ["Alive", "Alive"], [1.0, 2.0, 3.0, 4.0]),
+    frame("Playing", 4.0, ["Destroyed", "Alive"], [1.0, 2.0, 3.0], moving=2),
+    frame("Playing", 12.0, ["Destroyed", "Destroyed"], [1.0, 1.0]),
+    frame("Won", 12.0, ["Destroyed", "Destroyed"], [1.0, 1.0]),
+]
+
+
+def summarize(frames: list) -> dict:
+    return summarize_match([encode_frame(data, timestamp=2.0 * i) for i, data in enumerate(frames)])
+
+
+def test_match_statistics():
+    summary = summarize(MATCH)
+    assert summary["current_state"] == "Won" and summary["frames"] == 5
+    assert summary["duration_s"] == 8.0 and summary["time_to_win_s"] == 8.0
+    assert summary["total_shots"] == 2
+    assert (summary["pigs_total"], summary["destroyed_pigs"]) == (2, 2)
+    assert summary["hit_percentage"] == 100.0 and summary["accuracy"] == 1.0
+    assert summary["pig_destruction_timeline"] == [[4.0, 1], [6.0, 2]]
+    assert (summary["bricks_initial"], summary["bricks_destroyed"], summary["structural_damage_pct"]) == (4, 2, 50.0)
+    assert summary["tower_height_drop"] == 1.5
+    assert summary["max_moving_bricks"] == 2
+    assert summary["shot_distances"] == [12.0, 20.0]
+    assert (summary["max_shot_distance"], summary["mean_shot_distance"]) == (20.0, 16.0)
+
+
+def test_lost_match():
+    summary = summarize(MATCH[:3] + [frame("Lost", 4.0, ["Destroyed", "Alive"], [1.0, 2.0, 3.0])])
+    assert summary["time_to_win_s"] == "not won"
+    assert summary["hit_percentage"] == 50.0 and summary["accuracy"] == 1.0
+
+
+def test_match_without_shots():
+    summary = summarize(MATCH[:2])
+    assert summary["total_shots"] == 0 and summary["accuracy"] == 0
+    assert summary["shot_distances"] == [] and summary["max_shot_distance"] == 0
+
+
+def test_summary_size_does_not_grow_with_frames():
+    # Start frames logged while waiting for the first tap add nothing but frames
+    long_match = [MATCH[0]] * 200 + MATCH[1:]
+    assert summarize(long_match)["total_shots"] == 2
+    assert len(str(summarize(long_match))) < len(str(summarize(MATCH))) + 20
+
+
+def test_empty_match():
+    assert summarize_match([]) == {}
+
+
+def test_documents_summarize_like_records():
+    summary = summarize_documents(MATCH)
+    assert summary["total_shots"] == 2 and summary["destroyed_pigs"] == 2
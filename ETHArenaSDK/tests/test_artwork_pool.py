@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+from artworkPool import ArtworkPool, StubGenerator, tier_for
+
+
+class FlakyGenerator(StubGenerator):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def generate(self, prompt: str):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("text2img failed")
+        return await super().generate(prompt)
+
+
+async def filled(pool: ArtworkPool) -> ArtworkPool:
+    pool.start()
+    await asyncio.gather(*pool._refills.values())
+    return pool
+
+
+def test_tiers():
+    assert [tier_for(rewards) for rewards in (0, 6, 7, 10)] == ["low", "low", "high", "high"]
+
+
+def test_pool_is_filled_and_survives_a_restart(tmp_path):
+    directory = str(tmp_path / "artwork")
+
+    async def main():
+        pool = await filled(ArtworkPool(StubGenerator(), directory=directory, size=3, low_watermark=0))
+        assert pool.stats()["available"] == {"low": 3, "high": 3}
+        uri = await pool.take(2)
+        return pool, uri
+
+    pool, uri = asyncio.run(main())
+    assert uri.startswith("/artwork/low/") and uri.endswith(".svg")
+    assert os.path.exists(os.path.join(directory, uri[len("/artwork/"):]))
+    restarted = ArtworkPool(StubGenerator(), directory=directory, size=3)
+    assert restarted.stats()["available"] == {"low": 2, "high": 3}
+    assert uri not in [item["uri"] for item in restarted.pools["low"]]
+
+
+def test_manifest_entries_without_a_file_are_skipped(tmp_path):
+    directory = str(tmp_path / "artwork")
+    pool = asyncio.run(filled(ArtworkPool(StubGenerator(), directory=directory, size=2)))
+    os.remove(os.path.join(directory, pool.pools["high"][0]["path"]))
+    assert ArtworkPool(StubGenerator(), directory=directory).stats()["available"] == {"low": 2, "high": 1}
+
+
+def test_empty_tier_generates_on_the_spot_and_refills(tmp_path):
+    async def main():
+        pool = ArtworkPool(StubGenerator(), directory=str(tmp_path), size=2, low_watermark=1,
+                           base_url="https://cdn.example/art/")
+        uri = await pool.take(9)
+        await asyncio.gather(*pool._refills.values())
+        return pool, uri
+
+    pool, uri = asyncio.run(main())
+    assert uri.startswith("https://cdn.example/art/high/")
+    assert pool.stats()["misses"] == 1 and pool.stats()["available"]["high"] == 2
+
+
+def test_failed_generation_is_retried(tmp_path):
+    async def main():
+        pool = ArtworkPool(FlakyGenerator(failures=2), directory=str(tmp_path), size=1, retry_delay=0.0)
+        return await filled(pool)
+
+    pool = asyncio.run(main())
+    assert pool.stats()["failures"] == 2
+    assert pool.stats()["available"] == {"low": 1, "high": 1}
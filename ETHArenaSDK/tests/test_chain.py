@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+import chain
+from chain import Chain, is_address, load_abi
+
+ABI = [{"type": "function", "name": "submitScore", "inputs": [{"name": "score", "type": "uint256"}]}]
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / "Arena.json"
+    path.write_text(json.dumps({"abi": ABI, "bytecode": "0x" + "60" * 4096}))
+    return str(path)
+
+
+def test_abi_is_cached_next_to_the_artifact(artifact, monkeypatch):
+    assert load_abi(artifact) == ABI
+    assert os.path.exists(os.path.join(os.path.dirname(artifact), ".Arena.json.abi"))
+
+    def no_parse(f):
+        raise AssertionError("artifact parsed again")
+
+    monkeypatch.setattr(chain.json, "load", no_parse)
+    assert load_abi(artifact) == ABI
+
+
+def test_changed_artifact_invalidates_the_cache(artifact):
+    load_abi(artifact)
+    changed = ABI + [{"type": "event", "name": "ScoreSubmitted", "inputs": []}]
+    with open(artifact, "w") as f:
+        json.dump({"abi": changed}, f)
+    assert load_abi(artifact) == changed
+
+
+def test_corrupt_cache_falls_back_to_the_artifact(artifact):
+    load_abi(artifact)
+    with open(os.path.join(os.path.dirname(artifact), ".Arena.json.abi"), "wb") as f:
+        f.write(b"\x00garbage")
+    assert load_abi(artifact) == ABI
+
+
+def test_shipped_artifact_loads():
+    assert any(entry.get("type") == "function" for entry in load_abi())
+
+
+def test_chain_builds_nothing_until_used():
+    lazy = Chain(rpc_url="http://localhost:0", contract_address="0x0", private_key="not a key")
+    assert not {"w3", "contract", "account"} & set(vars(lazy))
+    with pytest.raises(Exception):
+        lazy.account
+
+
+def test_from_objects_uses_the_given_objects():
+    w3, contract = object(), object()
+    wired = Chain.from_objects(w3, contract)
+    assert wired.w3 is w3 and wired.contract is contract and wired.account is None
+
+
+def test_is_address():
+    assert is_address("0x" + "aB" * 20)
+    assert not is_address("0x" + "ab" * 19)
+    assert not is_address(None)
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+
+from endpointPool import CLOSED, HALF_OPEN, OPEN, Endpoint, EndpointPool
+
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://llm/v1/chat/completions")
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=httpx.Response(status, request=request))
+
+
+def responder(**behaviour):
+    """
+    A `send` answering with the endpoint's url: after the given delay, or raising the given error
+    """
+    calls = []
+
+    async def send(endpoint):
+        calls.append(endpoint.url)
+        outcome = behaviour.get(endpoint.url, 0.0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        await asyncio.sleep(outcome)
+        return endpoint.url
+
+    send.calls = calls
+    return send
+
+
+def endpoints(*urls, **kwargs) -> list:
+    return [Endpoint(url, **kwargs) for url in urls]
+
+
+def test_fails_over_to_the_next_endpoint():
+    pool = EndpointPool(endpoints("a", "b"), hedge=False)
+    send = responder(a=httpx.ConnectError("refused"))
+    assert asyncio.run(pool.request(send)) == "b"
+    assert send.calls == ["a", "b"]
+    assert pool.failovers == 1 and pool.endpoints[0].errors == 1
+
+
+@pytest.mark.parametrize("error", [status_error(429), status_error(503), httpx.ReadTimeout("slow")])
+def test_endpoint_failures_fail_over(error):
+    pool = EndpointPool(endpoints("a", "b"), hedge=False)
+    assert asyncio.run(pool.request(responder(a=error))) == "b"
+
+
+def test_request_errors_do_not_fail_over():
+    pool = EndpointPool(endpoints("a", "b"), hedge=False)
+    send = responder(a=status_error(400))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(pool.request(send))
+    assert send.calls == ["a"]
+    assert pool.endpoints[0].state == CLOSED and pool.endpoints[0].failures == 0
+
+
+def test_last_error_is_raised_when_every_endpoint_fails():
+    pool = EndpointPool(endpoints("a", "b"), hedge=False)
+    with pytest.raises(httpx.ConnectError, match="b down"):
+        asyncio.run(pool.request(responder(a=httpx.ConnectError("a down"), b=httpx.ConnectError("b down"))))
+
+
+def test_breaker_opens_and_lets_one_trial_through_after_reset():
+    a, b = endpoints("a", "b", failure_threshold=2, reset_timeout=0.05)
+    pool = EndpointPool([a, b], hedge=False)
+    failing = responder(a=httpx.ConnectError("refused"))
+    for _ in range(2):
+        asyncio.run(pool.request(failing))
+    assert a.state == OPEN
+    # skipped while open
+    healthy = responder()
+    assert asyncio.run(pool.request(healthy)) == "b" and healthy.calls == ["b"]
+    asyncio.run(asyncio.sleep(0.05))
+    assert a.available() and a.state == HALF_OPEN
+    a.begin()
+    assert not a.available()
+    a.succeeded()
+    assert a.state == CLOSED
+
+
+def test_failed_trial_reopens_the_breaker():
+    a = Endpoint("a", failure_threshold=3, reset_timeout=0.0)
+    a.state, a.opened_at = OPEN, 0.0
+    assert a.available()
+    a.begin()
+    a.failed()
+    assert a.state == OPEN
+
+
+def test_slow_request_is_hedged_to_the_runner_up():
+    pool = EndpointPool(endpoints("a", "b"), hedge_delay=0.02, min_hedge_delay=0.0)
+    assert asyncio.run(pool.request(responder(a=1.0, b=0.0))) == "b"
+    assert pool.hedged == 1 and pool.hedge_wins == 1
+    # the losing request was cancelled, which is not held against its endpoint
+    assert pool.endpoints[0].errors == 0 and pool.endpoints[0].state == CLOSED
+
+
+def test_no_hedge_when_not_allowed():
+    pool = EndpointPool(endpoints("a", "b"), hedge_delay=0.01, min_hedge_delay=0.0, can_hedge=lambda: False)
+    send = responder(a=0.05)
+    assert asyncio.run(pool.request(send)) == "a"
+    assert send.calls == ["a"] and pool.hedged == 0
+
+
+def test_fastest_endpoint_goes_first():
+    a, b = endpoints("a", "b")
+    a.succeeded(0.5)
+    b.succeeded(0.1)
+    pool = EndpointPool([a, b], hedge=False)
+    assert asyncio.run(pool.request(responder())) == "b"
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from frameStream import INVALID_FRAME, MAX_OBJECTS, MatchAssembler, encode_delta, iter_ndjson
+
+
+def frame(state="Playing", bricks=2, moved=0.0):
+    return {
+        "currentGameState": state,
+        "slingshot": {"birdToThrow": "RedBird", "slingshotState": "Idle"},
+        "birds": [{"position": {"x": 1.0 + moved, "y": 2.0}, "state": "Thrown"}],
+        "pigs": [{"position": {"x": 10.0, "y": 0.5}, "state": "Idle"}],
+        "bricks": [{"position": {"x": 11.0, "y": float(i)}, "state": "Idle"} for i in range(bricks)],
+    }
+
+
+def replay(frames: list) -> list:
+    assembler = MatchAssembler()
+    previous = None
+    rebuilt = []
+    for current in frames:
+        message = json.loads(json.dumps(encode_delta(previous, current)))
+        rebuilt.append(json.loads(json.dumps(assembler.apply(message))))
+        previous = current
+    return rebuilt
+
+
+def test_key_and_delta_frames_round_trip():
+    frames = [frame(), frame(moved=3.5), frame(moved=3.5), frame("Won", moved=7.0)]
+    assert replay(frames) == frames
+
+
+def test_delta_only_carries_changes():
+    delta = encode_delta(frame(), frame(moved=3.5))
+    assert delta == {"type": "delta", "birds": [[0, 4.5, 2.0, "Thrown"]]}
+
+
+def test_resize_drops_and_adds_objects():
+    frames = [frame(bricks=3), frame(bricks=1), frame(bricks=4)]
+    assert encode_delta(frames[0], frames[1])["n"] == {"bricks": 1}
+    assert replay(frames) == frames
+
+
+@pytest.mark.parametrize("message", [
+    [1, 2],
+    "frame",
+    {"type": "delta", "n": {"bricks": MAX_OBJECTS + 1}},
+    {"type": "delta", "n": {"bricks": 2000000}},
+    {"type": "delta", "n": {"bricks": -1}},
+    {"type": "delta", "n": {"bricks": "2"}},
+    {"type": "delta", "n": {"rocks": 1}},
+    {"type": "delta", "bricks": [[-1, 0.0, 0.0, "Idle"]]},
+    {"type": "delta", "bricks": [[2, 0.0, 0.0, "Idle"]]},
+    {"type": "delta", "bricks": [[0, 0.0]]},
+])
+def test_invalid_messages_are_rejected(message):
+    assembler = MatchAssembler()
+    assembler.apply({"type": "key", **frame()})
+    with pytest.raises(INVALID_FRAME):
+        assembler.apply(message)
+    # nothing was applied
+    assert assembler.frame == frame()
+
+
+def test_delta_before_keyframe_is_rejected():
+    with pytest.raises(ValueError):
+        MatchAssembler().apply({"type": "delta"})
+
+
+def test_oversized_keyframe_is_rejected():
+    key = {"type": "key", **frame(bricks=0), "bricks": [{}] * (MAX_OBJECTS + 1)}
+    with pytest.raises(ValueError):
+        MatchAssembler().apply(key)
+
+
+def test_lines_split_across_chunks():
+    body = b"".join(json.dumps(encode_delta(None, frame())).encode() + b"\n" for _ in range(3))
+    messages, buffer = [], b""
+    for start in range(0, len(body), 7):
+        parsed, buffer = iter_ndjson(buffer + body[start:start + 7])
+        messages.extend(parsed)
+    assert buffer == b"" and len(messages) == 3
+    assert all(message["currentGameState"] == "Playing" for message in messages)
+
+
+def test_blank_lines_are_skipped():
+    assert iter_ndjson(b'{"a": 1}\n\n  \n{"b"') == ([{"a": 1}], b'{"b"')
+
+
+def test_line_without_newline_is_capped():
+    with pytest.raises(ValueError):
+        iter_ndjson(b"x" * 101, max_line=100)
+    with pytest.raises(ValueError):
+        iter_ndjson(b"x" * 101 + b"\n", max_line=100)
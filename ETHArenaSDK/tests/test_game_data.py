@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from gameData import GameData, PackedObjects
+from sessionStore import decode_frame, encode_frame
+
+FRAME = {
+    "currentGameState": "Playing",
+    "birds": [{"position": {"x": 1.5, "y": -2.25}, "state": "Thrown"}, {"position": {"x": 0.0, "y": 0.0}, "state": "Idle"}],
+    "pigs": [{"position": {"x": 10.0, "y": 0.5}, "state": "Idle"}],
+    "bricks": [],
+    "slingshot": {"birdToThrow": "RedBird", "slingshotState": "BirdFlying"},
+}
+
+
+def test_objects_are_packed_into_float32_pairs():
+    game = GameData.model_validate_json(json.dumps(FRAME))
+    assert isinstance(game.birds, PackedObjects)
+    assert game.birds.positions.typecode == "f"
+    assert list(game.birds.positions) == [1.5, -2.25, 0.0, 0.0]
+    assert game.birds.states == ["Thrown", "Idle"]
+    assert (len(game.birds), len(game.pigs), len(game.bricks)) == (2, 1, 0)
+
+
+def test_dump_gives_back_the_frame():
+    game = GameData.model_validate_json(json.dumps(FRAME))
+    assert game.model_dump() == FRAME
+    assert json.loads(game.model_dump_json()) == FRAME
+
+
+def test_positions_are_stored_at_float32_precision():
+    frame = {**FRAME, "pigs": [{"position": {"x": 0.1, "y": 1e40}, "state": "Idle"}]}
+    position = GameData.model_validate(frame).model_dump()["pigs"][0]["position"]
+    assert position["x"] == pytest.approx(0.1, rel=1e-7) and position["y"] == float("inf")
+
+
+def test_packed_model_encodes_like_the_dict():
+    game = GameData.model_validate_json(json.dumps(FRAME))
+    record = encode_frame(game, timestamp=3.0)
+    assert record == encode_frame(FRAME, timestamp=3.0)
+    assert decode_frame(record) == FRAME
+
+
+def test_is_over():
+    assert not GameData.model_validate(FRAME).is_over
+    assert GameData.model_validate({**FRAME, "currentGameState": "Lost"}).is_over
+
+
+@pytest.mark.parametrize("change", [
+    {"birds": [{"position": {"x": "left", "y": 0.0}, "state": "Idle"}]},
+    {"pigs": [{"position": {"x": 1.0}, "state": "Idle"}]},
+    {"bricks": {"position": {"x": 1.0, "y": 0.0}, "state": "Idle"}},
+    {"slingshot": None},
+])
+def test_malformed_frames_are_rejected(change):
+    with pytest.raises(ValidationError):
+        GameData.model_validate_json(json.dumps({**FRAME, **change}))
@@ -0,0 +1,110 @@
+import pytest
+
+from gasOracle import GasOracle
+
+SHAPE = ("submitScore", 1)
+
+
+class FakeEth:
+    """
+    web3.eth with a configurable fee history, latest block and legacy gas price
+    """
+
+    def __init__(self, history=None, block=None, gas_price=5_000):
+        self.eth = self
+        self.history = history if history is not None else {"baseFeePerGas": [90, 100], "reward": [[10], [30], [0]]}
+        self.block = block or {}
+        self.gas_price = gas_price
+        self.max_priority_fee = 2_000_000
+        self.history_calls = 0
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.history_calls += 1
+        if isinstance(self.history, Exception):
+            raise self.history
+        return self.history
+
+    def get_block(self, block):
+        return self.block
+
+
+def oracle(w3=None, **kwargs):
+    return GasOracle(w3 or FakeEth(), min_priority_fee=1, **kwargs)
+
+
+def test_each_shape_is_estimated_once():
+    gas = oracle()
+    calls = []
+
+    def estimate():
+        calls.append(1)
+        return 50_000
+
+    assert gas.gas_limit(SHAPE, estimate) == 65_000
+    assert gas.gas_limit(SHAPE, estimate) == 65_000
+    assert gas.gas_limit(("submitScore", 2), lambda: 10_000) == 13_000
+    assert len(calls) == 1 and gas.stats()["estimates"] == 2
+
+
+def test_limit_follows_the_largest_recent_receipt():
+    gas = oracle(window=2)
+    gas.gas_limit(SHAPE, lambda: 100_000)
+    gas.observe(SHAPE, 40_000, 130_000, True)
+    assert gas.gas_limit(SHAPE, None) == 52_000
+    gas.observe(SHAPE, 30_000, 52_000, True)
+    assert gas.gas_limit(SHAPE, None) == 52_000
+    # the 40k receipt leaves the window
+    gas.observe(SHAPE, 20_000, 52_000, True)
+    assert gas.gas_limit(SHAPE, None) == 39_000
+
+
+def test_out_of_gas_raises_the_limit():
+    gas = oracle()
+    gas.gas_limit(SHAPE, lambda: 10_000)
+    gas.observe(SHAPE, 13_000, 13_000, False)
+    assert gas.gas_limit(SHAPE, None) == 16_900
+    assert gas.stats()["out_of_gas"] == 1
+
+
+def test_reverts_below_the_limit_leave_it_alone():
+    gas = oracle()
+    gas.gas_limit(SHAPE, lambda: 10_000)
+    gas.observe(SHAPE, 5_000, 13_000, False)
+    assert gas.gas_limit(SHAPE, None) == 13_000
+    assert gas.stats()["out_of_gas"] == 0
+
+
+def test_fees_from_fee_history():
+    w3 = FakeEth()
+    gas = oracle(w3)
+    # zero rewards (empty blocks) are left out of the median
+    assert gas.fees() == {"maxFeePerGas": 2 * 100 + 20, "maxPriorityFeePerGas": 20}
+    gas.fees()
+    assert w3.history_calls == 1
+
+
+def test_tip_has_a_floor():
+    gas = GasOracle(FakeEth(history={"baseFeePerGas": [100], "reward": [[0]]}), min_priority_fee=7)
+    assert gas.fees()["maxPriorityFeePerGas"] == 7
+
+
+def test_latest_block_when_fee_history_has_no_base_fee():
+    gas = oracle(FakeEth(history={}, block={"baseFeePerGas": 300}))
+    assert gas.fees() == {"maxFeePerGas": 2 * 300 + 2_000_000, "maxPriorityFeePerGas": 2_000_000}
+
+
+def test_legacy_gas_price_without_base_fee():
+    gas = oracle(FakeEth(history={}, block={}, gas_price=4_242))
+    assert gas.fees() == {"gasPrice": 4_242}
+    assert gas.stats()["base_fee"] is None
+
+
+def test_failed_refresh_keeps_the_last_fees():
+    w3 = FakeEth()
+    gas = oracle(w3, poll_interval=60)
+    gas.start()
+    w3.history = ConnectionError("node down")
+    gas.stop()
+    with pytest.raises(ConnectionError):
+        gas.refresh()
+    assert gas.fees() == {"maxFeePerGas": 220, "maxPriorityFeePerGas": 20}
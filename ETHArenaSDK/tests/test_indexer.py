@@ -0,0 +1,149 @@
+import pytest
+
+from indexer import ZERO_ADDRESS, ChainIndexer
+
+ALICE = "0x00000000000000000000000000000000000A11CE"
+BOB = "0x0000000000000000000000000000000000000B0B"
+
+
+class Event:
+    def __init__(self, name: str, *types):
+        self.name = name
+        self.types = types
+
+    def _get_event_abi(self):
+        return {"name": self.name, "inputs": [{"type": kind} for kind in self.types]}
+
+    def __call__(self):
+        return self
+
+    def process_log(self, log):
+        return {"event": self.name, "args": log["args"]}
+
+
+class FakeChain:
+    """
+    Just enough of web3 and the BaseArena contract for the indexer: blocks, each with the logs of its mints
+    """
+
+    def __init__(self):
+        self.w3 = self.eth = self.contract = self.events = self
+        self.address = "0xba5ea7e4a"
+        self.Transfer = Event("Transfer", "address", "address", "uint256")
+        self.reward_add = Event("reward_add", "address", "uint256")
+        self.mint = Event("mint", "address", "string")
+        self.blocks = []
+        self.transactions = {}
+
+    def keccak(self, text: str) -> bytes:
+        return text.encode()
+
+    def topic(self, event: Event) -> str:
+        return ChainIndexer._hex(self.keccak(f"{event.name}({','.join(event.types)})"))
+
+    @property
+    def block_number(self) -> int:
+        return len(self.blocks) - 1
+
+    def get_block(self, number: int) -> dict:
+        return {"hash": self.blocks[number]["hash"]}
+
+    def get_logs(self, query: dict) -> list:
+        return [
+            log
+            for block in self.blocks[query["fromBlock"]:query["toBlock"] + 1]
+            for log in block["logs"]
+            if log["topics"][0] in query["topics"][0]
+        ]
+
+    def get_transaction(self, tx_hash: str) -> dict:
+        return {"input": tx_hash}
+
+    def decode_function_input(self, data: str) -> tuple:
+        return None, {"dopplegangeruri": self.transactions[data]}
+
+    def mine(self, *mints, fork: str = "a"):
+        """
+        Adds a block with a safeMint transaction per (owner, token_id, score) in `mints`
+        """
+        number = len(self.blocks)
+        logs = []
+        for owner, token_id, score in mints:
+            tx_hash = f"0x{fork}{number}{token_id}"
+            self.transactions[tx_hash] = f"ipfs://doppleganger/{token_id}"
+            for event, args in (
+                (self.Transfer, {"from": ZERO_ADDRESS, "to": owner, "tokenId": token_id}),
+                (self.reward_add, {"to": owner, "score": score}),
+                (self.mint, {"to": owner, "uri": f"ipfs://image/{token_id}"}),
+            ):
+                logs.append({
+                    "topics": [self.topic(event)], "args": args, "blockNumber": number,
+                    "logIndex": len(logs), "transactionHash": tx_hash,
+                })
+        self.blocks.append({"hash": f"0x{fork}{number}", "logs": logs})
+
+    def reorg(self, number: int):
+        del self.blocks[number:]
+
+
+@pytest.fixture
+def chain():
+    chain = FakeChain()
+    chain.mine()
+    chain.mine((ALICE, 0, 3))
+    chain.mine()
+    chain.mine((BOB, 1, 4))
+    chain.mine()
+    chain.mine()
+    return chain
+
+
+@pytest.fixture
+def indexer(chain, tmp_path):
+    indexer = ChainIndexer(chain, path=str(tmp_path / "index.db"), confirmations=0, batch_size=2)
+    yield indexer
+    indexer.db.close()
+    indexer.reader.close()
+
+
+def test_mints_are_indexed_per_wallet(indexer):
+    assert indexer.run_once() == 5
+    assert indexer.users() == [
+        {"address": ALICE, "nfts": 1, "rewards_earned": 3},
+        {"address": BOB, "nfts": 1, "rewards_earned": 4},
+    ]
+    nft = indexer.nfts(BOB.lower())[0]
+    assert (nft["tokenId"], nft["block"], nft["image_asset"], nft["doppleganger_asset"]) == \
+        (1, 3, "ipfs://image/1", "ipfs://doppleganger/1")
+
+
+def test_only_confirmed_blocks_are_indexed(chain, indexer):
+    indexer.confirmations = 3
+    assert indexer.run_once() == 2
+    assert indexer.nft_count(BOB) == 0
+    chain.mine()
+    chain.mine()
+    assert indexer.run_once() == 4
+    assert indexer.nft_count(BOB) == 1
+
+
+def test_reorg_rolls_back_to_the_common_block(chain, indexer):
+    indexer.run_once()
+    # blocks 3 onwards are replaced: Bob's mint is gone, token 1 went to Alice in block 4 instead
+    chain.reorg(3)
+    chain.mine(fork="b")
+    chain.mine((ALICE, 1, 5), fork="b")
+    chain.mine(fork="b")
+    assert indexer.run_once() == 5
+    assert indexer.stats()["reorgs"] == 1
+    assert indexer.users() == [{"address": ALICE, "nfts": 2, "rewards_earned": 8}]
+    assert indexer.nft_count(BOB) == 0
+    assert [(nft["tokenId"], nft["block"], nft["reputation_score"]) for nft in indexer.nfts(ALICE)] == [(0, 1, 1), (1, 4, 2)]
+
+
+def test_consistent_index_is_not_rolled_back(chain, indexer):
+    indexer.run_once()
+    chain.mine((ALICE, 2, 1))
+    assert indexer.run_once() == 6
+    assert indexer.stats()["reorgs"] == 0
+    assert indexer.nft_count(ALICE) == 2
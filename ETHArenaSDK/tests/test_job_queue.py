@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from jobQueue import FAILED, QUEUED, SUCCEEDED, JobQueue, current_job
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=1, max_attempts=3, backoff=0.01, poll_interval=0.01)
+    yield queue
+    queue.db.close()
+
+
+def run(queue: JobQueue, job_id: str, timeout: float = 5.0) -> dict:
+    async def main():
+        queue.start()
+        try:
+            return await queue.wait(job_id, timeout)
+        finally:
+            for task in queue._tasks:
+                task.cancel()
+            await asyncio.gather(*queue._tasks, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_checkpoint_is_seen_by_the_retry(queue):
+    seen = []
+
+    async def handler(payload):
+        job = current_job.get()
+        seen.append(job["progress"])
+        if job["progress"] is None:
+            queue.checkpoint(job["id"], {"tx_hashes": ["0xabc"]})
+            raise RuntimeError("crashed after sending")
+        return {"resumed": job["progress"]["tx_hashes"]}
+
+    queue.register("mint", handler)
+    job = queue.enqueue("mint", {"walletAddress": "0x1"})
+    assert run(queue, job["id"])["result"] == {"resumed": ["0xabc"]}
+    assert seen == [None, {"tx_hashes": ["0xabc"]}]
+
+
+def test_failed_job_is_retried_until_it_succeeds(queue):
+    attempts = []
+
+    async def handler(payload):
+        attempts.append(current_job.get()["attempts"])
+        if len(attempts) < 3:
+            raise RuntimeError("flaky")
+        return {"ok": True}
+
+    queue.register("game_over", handler)
+    job = run(queue, queue.enqueue("game_over", {})["id"])
+    assert attempts == [1, 2, 3]
+    assert job["status"] == SUCCEEDED and job["result"] == {"ok": True}
+
+
+def test_job_fails_for_good_after_max_attempts(queue):
+    async def handler(payload):
+        raise RuntimeError("broken")
+
+    queue.register("game_over", handler)
+    job_id = queue.enqueue("game_over", {})["id"]
+    with pytest.raises(Exception, match="broken"):
+        run(queue, job_id)
+    job = queue.get(job_id)
+    assert job["status"] == FAILED and job["attempts"] == queue.max_attempts
+
+
+def test_backoff_delays_the_retry(queue):
+    queue.backoff = 60.0
+    queue.register("game_over", None)
+    queue.enqueue("game_over", {})
+    job = queue._claim()
+    queue._finish(job, error="flaky")
+    retried = queue.get(job["id"])
+    assert retried["status"] == QUEUED and retried["run_at"] >= time.time() + 25
+    assert queue._claim() is None
+
+
+def test_idempotency_key_enqueues_once(queue):
+    first = queue.enqueue("game_over", {"match": 1}, idempotency_key="upload-1:0")
+    second = queue.enqueue("game_over", {"match": 2}, idempotency_key="upload-1:0")
+    other = queue.enqueue("game_over", {"match": 2}, idempotency_key="upload-1:1")
+    assert second["id"] == first["id"] and second["payload"] == {"match": 1}
+    assert other["id"] != first["id"]
+    assert queue.stats() == {QUEUED: 2}
+
+
+def test_expired_lease_is_claimed_again(queue):
+    queue.register("game_over", None)
+    job_id = queue.enqueue("game_over", {})["id"]
+    # a worker that died holding the job
+    assert queue._claim()["id"] == job_id
+    assert queue._claim() is None
+    queue.db.execute("UPDATE jobs SET locked_until = ? WHERE id = ?", (time.time() - 1, job_id))
+    job = queue._claim()
+    assert job["id"] == job_id and job["attempts"] == 2
+
+
+def test_only_registered_kinds_are_claimed(queue):
+    queue.enqueue("mint", {})
+    assert queue._claim() is None
+    queue.register("game_over", None)
+    assert queue._claim() is None
+    queue.register("mint", None)
+    assert queue._claim()["kind"] == "mint"
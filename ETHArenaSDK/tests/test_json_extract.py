@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from jsonExtract import IncrementalJSONExtractor, JSONExtractionError, extract_json, parse_feedback
+
+FEEDBACK = {
+    "fun pun": "Slingshot sniper",
+    "gamer match/ doppleganger": "Chainyoda",
+    "Personalized Feeds": [{"rewards earned": 7, "game genres": ["puzzle"]}],
+}
+
+
+def test_clean_object_needs_no_repairs():
+    assert extract_json(json.dumps(FEEDBACK)) == (FEEDBACK, [])
+
+
+@pytest.mark.parametrize("text, expected, repair", [
+    ("```json\n{'a': 'it\\'s'}\n```", {"a": "it's"}, "single_quotes"),
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}, "trailing_comma"),
+    ('{"a": True, "b": None}', {"a": True, "b": None}, "python_literals"),
+    ('{"a": 1, # a comment\n "b": 2 // another\n}', {"a": 1, "b": 2}, "comments"),
+    ('{"a": "two\nlines"}', {"a": "two\nlines"}, "control_characters"),
+    ('{"a": yes}', {"a": "yes"}, "bare_words"),
+    ('{"a": 1} hope this helps', {"a": 1}, "trailing_text"),
+    ('{"a": [{"b": 1}, {"c": "cut', {"a": [{"b": 1}, {"c": "cut"}]}, "truncated"),
+    ('{"a": 1, "b":', {"a": 1, "b": None}, "truncated"),
+    ('{"a": 1, "unfinished', {"a": 1}, "truncated"),
+])
+def test_repairs(text, expected, repair):
+    data, repairs = extract_json(text)
+    assert data == expected
+    assert repair in repairs
+
+
+def test_list_of_pairs_becomes_list_of_objects():
+    text = '{"games": ["game scope": "8", "game popularity": "9", "game scope": "5", "game popularity": "6"]}'
+    data, repairs = extract_json(text)
+    assert data == {"games": [
+        {"game scope": "8", "game popularity": "9"},
+        {"game scope": "5", "game popularity": "6"},
+    ]}
+    assert "list_of_pairs" in repairs
+
+
+def test_output_without_an_object_is_an_error():
+    with pytest.raises(JSONExtractionError):
+        extract_json("Sorry, I can't help with that")
+
+
+def test_parse_feedback_normalizes_fields():
+    text = "Here you go:\n" + json.dumps({**FEEDBACK, "Personalized Feeds": {"rewards earned": "12/10", "game genres": "arcade"}})
+    feedback = parse_feedback(text)
+    assert feedback["Personalized Feeds"][0]["rewards earned"] == 10
+    assert feedback["Personalized Feeds"][0]["game genres"] == ["arcade"]
+    assert feedback["gamer match/doppleganger"] == "Chainyoda"
+
+
+def test_parse_feedback_rejects_missing_required_fields():
+    with pytest.raises(JSONExtractionError):
+        parse_feedback('{"fun pun": "no feeds"}')
+
+
+def test_incremental_extractor_emits_members_as_they_complete():
+    extractor = IncrementalJSONExtractor()
+    assert extractor.feed('```json\n{"fun pun": "a, b", "list": [1,') == [("fun pun", "a, b")]
+    assert extractor.feed(' 2], "n": {"x": 1}') == [("list", [1, 2])]
+    assert extractor.feed("}\n```") == [("n", {"x": 1})]
+    assert extractor.result() == {"fun pun": "a, b", "list": [1, 2], "n": {"x": 1}}
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import httpx
+
+import llmClient
+from llmClient import LLMClient, close_llm_client, get_llm_client
+from rateLimit import TokenBucket
+
+URL = "http://llm/v1/chat/completions"
+
+
+def completion(content: str) -> dict:
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def make_client(handler, **kwargs) -> LLMClient:
+    """
+    An LLMClient whose pooled session answers through `handler` instead of the network
+    """
+    llm = LLMClient(url=URL, api_key="key", hedge=False, **kwargs)
+    llm.limiter = TokenBucket("test", rate=1000.0, burst=1000, max_wait=1.0)
+    llm._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers=llm.headers)
+    return llm
+
+
+def test_session_is_created_once_and_reused():
+    async def main():
+        llm = LLMClient(url=URL, api_key="key")
+        client = llm.client
+        assert llm.client is client
+        assert client.headers["Authorization"] == "Bearer key"
+        await llm.aclose()
+        # a closed session is replaced on next use
+        reopened = llm.client
+        assert reopened is not client and not reopened.is_closed
+        await llm.aclose()
+
+    asyncio.run(main())
+
+
+def test_completions_share_the_session_and_respect_the_concurrency_cap():
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=completion(json.loads(request.content)["messages"][0]["content"]))
+
+    async def main():
+        llm = make_client(handler, max_concurrency=3)
+        client = llm.client
+        answers = await asyncio.gather(*(llm.chat_completion([{"role": "user", "content": str(i)}]) for i in range(10)))
+        assert llm.client is client
+        await llm.aclose()
+        return answers
+
+    assert asyncio.run(main()) == [str(i) for i in range(10)]
+    assert peak == 3
+
+
+def test_stream_yields_tokens_until_done():
+    events = [
+        {"choices": [{"delta": {"role": "assistant"}}]},
+        {"choices": [{"delta": {"content": "Nice "}}]},
+        {"choices": [{"delta": {"content": "shot"}}]},
+    ]
+    body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\ndata: ignored\n\n"
+
+    async def main():
+        llm = make_client(lambda request: httpx.Response(200, text=body))
+        tokens = [token async for token in llm.stream_chat_completion([{"role": "user", "content": "hi"}])]
+        await llm.aclose()
+        return tokens
+
+    assert asyncio.run(main()) == ["Nice ", "shot"]
+
+
+def test_one_client_per_process(monkeypatch):
+    monkeypatch.setattr(llmClient, "_llm_client", None)
+
+    async def main():
+        llm = get_llm_client()
+        assert get_llm_client() is llm
+        llm.client
+        await close_llm_client()
+        assert llm._client is None
+        assert get_llm_client() is not llm
+        await close_llm_client()
+
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+import json
+import random
+
+import pytest
+
+from analytics import summarize_match
+from benchmarks.matches import synthetic_match
+from matchRecorder import MatchRecorder, read_matches, write_matches
+from sessionStore import encode_frame
+
+FRAME = {
+    "currentGameState": "Playing",
+    "birds": [{"position": {"x": 1.5, "y": -2.0}, "state": "Idle"}],
+    "pigs": [],
+    "bricks": [],
+    "slingshot": {"birdToThrow": "Bird", "slingshotState": "BirdFlying"},
+}
+
+
+@pytest.mark.parametrize("name", ["matches.ndjson", "matches.ndjson.gz"])
+def test_recorded_frames_read_back_per_match(tmp_path, name):
+    recorder = MatchRecorder(str(tmp_path / name))
+    recorder.record("0xA", 1.0, FRAME)
+    # request bodies are kept as sent, a pretty printed one is re-serialized onto one line
+    recorder.record("0xB", 2.0, json.dumps(FRAME).encode())
+    recorder.record("0xa", 1.0, json.dumps(FRAME, indent=2).encode())
+    recorder.close()
+    assert read_matches(recorder.path) == [[FRAME, FRAME], [FRAME]]
+    assert recorder.stats()["frames"] == 3
+
+
+def test_sampling_keeps_whole_matches(tmp_path):
+    recorder = MatchRecorder(str(tmp_path / "sampled.ndjson"), sample_rate=0.5)
+    for match in range(40):
+        for _ in range(3):
+            recorder.record(f"0x{match}", 0.0, FRAME)
+    recorder.close()
+    matches = read_matches(recorder.path)
+    assert 0 < len(matches) < 40
+    assert all(len(frames) == 3 for frames in matches)
+
+
+def test_written_matches_read_back(tmp_path):
+    path = str(tmp_path / "synthetic.ndjson.gz")
+    matches = [synthetic_match(random.Random(seed)) for seed in range(3)]
+    write_matches(path, matches)
+    assert read_matches(path) == matches
+
+
+def test_synthetic_match_logs_the_frames_the_game_does():
+    frames = synthetic_match(random.Random(1), birds=3)
+    states = [frame["currentGameState"] for frame in frames]
+    assert states[:2] == ["Start", "Start"] and states[-1] in ("Won", "Lost")
+    shots = states.count("Playing")
+    assert 1 <= shots <= 3 and states[2:-1] == ["Playing"] * shots
+    summary = summarize_match([encode_frame(frame, timestamp=i) for i, frame in enumerate(frames)])
+    assert summary["total_shots"] == shots and len(summary["shot_distances"]) == shots
@@ -0,0 +1,31 @@
+from prompts import PromptRegistry
+
+
+def system_prompt(messages: list) -> str:
+    assert messages[0]["role"] == "system"
+    return messages[0]["content"]
+
+
+def test_each_call_keeps_its_own_system_prompt():
+    prompts = PromptRegistry()
+    query = system_prompt(prompts.messages("query", system="query_system", prompt="hi"))
+    gameplay = system_prompt(prompts.messages("gameplay_feedback", system="gameplay_feedback_system", rag_doc="[]", prompt="hi"))
+    summary = system_prompt(prompts.messages("summary_feedback", rag_doc="[]", prompt="hi"))
+    assert "about Games web3d on" in query and "about Games web3 on" in gameplay and "about Games web3 on" in summary
+    assert "4. No addtional data" not in query and "4. No addtional data" not in gameplay
+    assert "4. No addtional data" in summary
+
+
+def test_system_message_is_shared_between_requests():
+    prompts = PromptRegistry()
+    first = prompts.messages("query", system="query_system", prompt="a")
+    second = prompts.messages("query", system="query_system", prompt="b")
+    assert first[0] is second[0]
+
+
+def test_chat_personas_share_the_chat_template():
+    prompts = PromptRegistry()
+    plain = prompts.messages("chat", system="chat_system", graph_data="{}", prompt="who leads?")
+    fun = prompts.messages("chat", system="chat_fun_system", graph_data="{}", prompt="who leads?")
+    assert plain[1] == fun[1]
+    assert "fun and pun" in system_prompt(fun) and "fun and pun" not in system_prompt(plain)
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+from rateLimit import RateLimited, SingleFlight, TokenBucket
+
+
+def test_limits_are_shared_between_workers(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_GAIA_RPS", "6")
+    monkeypatch.setenv("RATE_LIMIT_GAIA_BURST", "10")
+    monkeypatch.setenv("SERVER_WORKERS", "4")
+    bucket = TokenBucket.from_env("gaia")
+    assert (bucket.rate, bucket.burst) == (1.5, 2)
+    monkeypatch.setenv("SERVER_WORKERS", "1")
+    bucket = TokenBucket.from_env("gaia")
+    assert (bucket.rate, bucket.burst) == (6.0, 10)
+
+
+def test_burst_is_at_least_one_token(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_DEEPAI_BURST", "2")
+    monkeypatch.setenv("SERVER_WORKERS", "8")
+    assert TokenBucket.from_env("deepai").burst == 1
+
+
+def test_burst_then_callers_wait_for_their_token():
+    bucket = TokenBucket("gaia", rate=100.0, burst=2, max_wait=1.0)
+    assert [bucket._reserve() for _ in range(2)] == [0.0, 0.0]
+    wait = bucket._reserve()
+    assert 0.005 < wait <= 0.01
+    # the next caller queues behind the one already waiting
+    assert bucket._reserve() > wait
+    assert bucket.stats() == {"granted": 4, "delayed": 2, "rejected": 0}
+
+
+def test_callers_that_would_wait_too_long_are_rejected():
+    bucket = TokenBucket("gaia", rate=1.0, burst=1, max_wait=0.5)
+    bucket._reserve()
+    with pytest.raises(RateLimited) as error:
+        bucket._reserve()
+    assert error.value.upstream == "gaia" and 0.5 < error.value.retry_after <= 1.0
+    assert bucket.stats()["rejected"] == 1
+
+
+def test_try_acquire_never_waits():
+    bucket = TokenBucket("rpc", rate=0.001, burst=1, max_wait=10.0)
+    assert bucket.try_acquire() and not bucket.try_acquire()
+
+
+def test_acquire_paces_callers():
+    bucket = TokenBucket("gaia", rate=50.0, burst=1, max_wait=1.0)
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.035
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", compute) for _ in range(4)), flights.do("other", compute))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert len(calls) == 2
+    assert flights.stats() == {"executed": 2, "coalesced": 3, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        results = await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+        retried = await flights.do("key", lambda: asyncio.sleep(0, result="ok"))
+        return results, retried
+
+    results, retried = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == "ok"
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", compute))
+        second = asyncio.ensure_future(flights.do("key", compute))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "answer"
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from analytics import gameplay_features
+from responseCache import ResponseCache, make_key
+
+SUMMARY = {
+    "current_state": "Won",
+    "total_shots": 2,
+    "destroyed_pigs": 3,
+    "hit_percentage": 100.0,
+    "structural_damage_pct": 45.0,
+    "max_shot_distance": 17.3,
+}
+
+
+def test_near_identical_matches_share_a_key():
+    close = {**SUMMARY, "structural_damage_pct": 41.0, "max_shot_distance": 15.1, "duration_s": 12.5}
+    assert make_key("feedback", gameplay_features(close)) == make_key("feedback", gameplay_features(SUMMARY))
+
+
+@pytest.mark.parametrize("change", [
+    {"current_state": "Lost"},
+    {"total_shots": 3},
+    {"destroyed_pigs": 2},
+    {"hit_percentage": 66.7},
+    {"structural_damage_pct": 60.0},
+    {"max_shot_distance": 21.0},
+])
+def test_different_matches_get_different_keys(change):
+    assert gameplay_features({**SUMMARY, **change}) != gameplay_features(SUMMARY)
+
+
+def test_key_does_not_depend_on_dict_order():
+    assert make_key("chat", {"a": 1, "b": [1, 2]}) == make_key("chat", {"b": [1, 2], "a": 1})
+    assert make_key("chat", {"a": 1}) != make_key("query", {"a": 1})
+
+
+def test_least_recently_used_entry_is_dropped():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache(ttl=0.0)
+    cache.set("a", "1")
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(disk_path=path).set("a", "1")
+    cache = ResponseCache(disk_path=path)
+    assert cache.get("a") == "1" and cache.get("a") == "1"
+    assert cache.stats()["disk_hits"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "feedback"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["feedback"] * 5
+    assert len(calls) == 1 and cache.get("k") == "feedback"
+
+
+def test_invalid_values_are_not_cached():
+    cache = ResponseCache()
+
+    async def compute():
+        return "not json"
+
+    assert asyncio.run(cache.get_or_compute("k", compute, validate=lambda value: value.startswith("{"))) == "not json"
+    assert cache.get("k") is None
@@ -0,0 +1,94 @@
+import sys
+
+import pytest
+
+import responseStore
+from responseStore import RedisBackend, ResponseStore, SQLiteBackend, decode, encode
+
+RESPONSE = {"analysis": "Aim lower on the second bird — ça marche.", "score": 7, "tips": ["wait", "aim"]}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.expiry[key] = ex
+
+
+def test_encoding_round_trips_and_compresses():
+    big = {**RESPONSE, "analysis": "Try a steeper angle. " * 50}
+    assert decode(encode(RESPONSE)) == RESPONSE
+    assert len(encode(big)) < len(repr(big)) / 3
+
+
+def test_memory_store_is_keyed_by_lowercase_wallet():
+    store = ResponseStore()
+    store.set("0xABC", RESPONSE)
+    assert store.get("0xabc") == RESPONSE
+    assert store.get("0xdef") is None
+    assert store.stats() == {"backend": "memory", "entries": 1, "stored": 1, "hits": 1, "backend_hits": 0,
+                             "misses": 1}
+
+
+def test_front_is_a_bounded_lru():
+    store = ResponseStore(max_entries=2)
+    store.set("a", {"n": 1})
+    store.set("b", {"n": 2})
+    store.get("a")
+    store.set("c", {"n": 3})
+    assert list(store.entries) == ["a", "c"]
+    assert store.get("b") is None
+
+
+def test_sqlite_backend_is_shared_between_stores(tmp_path):
+    path = str(tmp_path / "responses.db")
+    writer = ResponseStore(SQLiteBackend(path))
+    reader = ResponseStore(SQLiteBackend(path))
+    writer.set("0xabc", RESPONSE)
+    assert reader.get("0xabc") == RESPONSE
+    assert reader.get("0xabc") == RESPONSE
+    assert reader.stats()["backend_hits"] == 1 and reader.stats()["hits"] == 1
+    assert reader.stats()["stored"] == 1
+
+
+def test_stale_front_entries_are_reread_from_the_backend(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(responseStore.time, "monotonic", lambda: clock[0])
+    backend = RedisBackend(client=FakeRedis())
+    mine, other = ResponseStore(backend, front_ttl=60), ResponseStore(backend, front_ttl=60)
+    mine.set("0xabc", {"score": 1})
+    other.set("0xabc", {"score": 2})
+    assert mine.get("0xabc") == {"score": 1}
+    clock[0] += 61
+    assert mine.get("0xabc") == {"score": 2}
+
+
+def test_redis_backend_prefixes_keys_and_sets_ttl():
+    client = FakeRedis()
+    store = ResponseStore(RedisBackend(client=client, prefix="test:", ttl=3600))
+    store.set("0xABC", RESPONSE)
+    assert decode(client.values["test:0xabc"]) == RESPONSE
+    assert client.expiry["test:0xabc"] == 3600
+    assert store.stats()["stored"] is None
+
+
+def test_from_env_picks_the_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("RESPONSE_STORE", "memory")
+    monkeypatch.setenv("RESPONSE_CACHE_SIZE", "5")
+    store = ResponseStore.from_env()
+    assert store.backend is None and store.max_entries == 5
+    monkeypatch.setenv("RESPONSE_STORE", "sqlite")
+    monkeypatch.setenv("RESPONSE_STORE_PATH", str(tmp_path / "env.db"))
+    assert isinstance(ResponseStore.from_env().backend, SQLiteBackend)
+
+
+def test_redis_backend_without_the_package_explains_itself(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(RuntimeError, match="pip install redis"):
+        RedisBackend()
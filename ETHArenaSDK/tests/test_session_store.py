@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import analytics
+import sessionStore
+from analytics import summarize_match
+from gameData import GameData
+from sessionStore import SessionStore, SharedSessionStore, StringTable, decode_frame, encode_frame
+
+PACKAGE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def frame(state="Playing", pig="Idle", bird_x=1.5):
+    return {
+        "currentGameState": state,
+        "slingshot": {"birdToThrow": "RedBird", "slingshotState": "Idle"},
+        "birds": [{"position": {"x": bird_x, "y": -2.25}, "state": "Thrown"}],
+        "pigs": [{"position": {"x": 10.0, "y": 0.5}, "state": pig}, {"position": {"x": 12.0, "y": 0.5}, "state": "Idle"}],
+        "bricks": [{"position": {"x": 11.0, "y": 1.0}, "state": "Idle"}],
+    }
+
+
+@pytest.fixture(autouse=True)
+def table(monkeypatch):
+    # SharedSessionStore attaches the module-wide table to its file, keep that out of the other tests
+    table = StringTable()
+    monkeypatch.setattr(sessionStore, "strings", table)
+    monkeypatch.setattr(analytics, "strings", table)
+    return table
+
+
+def test_frame_round_trip():
+    data = frame()
+    record = encode_frame(data, timestamp=1.0)
+    assert decode_frame(record) == data
+    # the validated model packs to the same record as its dict form
+    assert encode_frame(GameData.model_validate(data), timestamp=1.0) == record
+
+
+def test_session_keeps_the_last_frames():
+    store = SessionStore(max_frames=2)
+    for x in (1.0, 2.0, 3.0):
+        store.append("0x1", frame(bird_x=x))
+    session = store.pop("0x1")
+    assert [decoded["birds"][0]["position"]["x"] for decoded in session.decoded()] == [2.0, 3.0]
+    assert store.get("0x1") is None
+
+
+def test_frames_written_by_another_process_decode_here(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SharedSessionStore(path)
+    store.append("0x1", frame())
+    # a second worker, which interns the strings this one has not seen yet
+    script = textwrap.dedent(f"""
+        from sessionStore import SharedSessionStore
+        store = SharedSessionStore({path!r})
+        store.append("0x1", {frame(state="Won", pig="Destroyed")!r})
+    """)
+    subprocess.run([sys.executable, "-c", script], cwd=PACKAGE, check=True)
+    session = store.pop("0x1")
+    assert session.decoded() == [frame(), frame(state="Won", pig="Destroyed")]
+    summary = summarize_match(list(session.frames))
+    assert summary["current_state"] == "Won"
+    assert summary["destroyed_pigs"] == 1 and summary["pigs_total"] == 2
+    store.db.close()
@@ -0,0 +1,15 @@
+from telemetry import Counter, Histogram
+
+
+def test_label_values_are_escaped():
+    counter = Counter("requests_total", "Requests", labelnames=("route",))
+    counter.inc('/a"b\\c\nd')
+    assert counter.render()[-1] == 'requests_total{route="/a\\"b\\\\c\\nd"} 1'
+
+
+def test_histogram_renders_one_line_per_sample():
+    histogram = Histogram("prompt_tokens", "Prompt tokens", labelnames=("template",), buckets=(1,))
+    histogram.observe(2, 'multi\nline "template"')
+    lines = histogram.render()[2:]
+    assert len(lines) == 4
+    assert lines[0] == 'prompt_tokens_bucket{template="multi\\nline \\"template\\"",le="1"} 0'
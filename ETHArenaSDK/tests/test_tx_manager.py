@@ -0,0 +1,219 @@
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+from gasOracle import GasOracle
+from txManager import TransactionManager
+
+ADDRESS = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+
+class Hash(bytes):
+    def hex(self) -> str:
+        return "0x" + super().hex()
+
+
+class FakeNode:
+    """
+    Just enough of web3, the contract and the account: a mempool keyed by nonce, mined on `mine()`
+    """
+
+    def __init__(self):
+        self.eth = self
+        self.functions = self
+        self.chain_id = 31337
+        self.mined_nonce = 0
+        self.mempool = {}
+        self.receipts = {}
+        self.sent = []
+        self.errors = []
+        self.address = ADDRESS
+
+    # web3.eth
+    def fee_history(self, blocks, newest, percentiles):
+        return {"baseFeePerGas": [100, 100], "reward": [[10]]}
+
+    def get_transaction_count(self, address, block):
+        return self.mined_nonce + (len(self.mempool) if block == "pending" else 0)
+
+    def send_raw_transaction(self, raw):
+        if self.errors:
+            raise ValueError(self.errors.pop(0))
+        tx = raw
+        if tx["nonce"] < self.mined_nonce:
+            raise ValueError("nonce too low")
+        self.mempool[tx["nonce"]] = tx
+        self.sent.append(tx)
+        return Hash(bytes.fromhex(tx["hash"][2:]))
+
+    def get_transaction_receipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+    def get_transaction(self, tx_hash):
+        for tx in self.mempool.values():
+            if tx["hash"] == tx_hash:
+                return tx
+        raise ValueError(f"Transaction {tx_hash} not found")
+
+    def mine(self):
+        for nonce in sorted(self.mempool):
+            if nonce != self.mined_nonce:
+                break
+            tx = self.mempool.pop(nonce)
+            self.receipts[tx["hash"]] = SimpleNamespace(
+                status=1, gasUsed=40000, blockNumber=len(self.receipts) + 1, transactionHash=tx["hash"],
+            )
+            self.mined_nonce += 1
+
+    def drop(self):
+        self.mempool.clear()
+
+    # contract.functions.safeMint(...)
+    def safeMint(self, *args):
+        return SimpleNamespace(
+            estimate_gas=lambda transaction: 50000,
+            build_transaction=lambda transaction: {**transaction, "args": args},
+        )
+
+    # account
+    def sign_transaction(self, tx):
+        digest = hashlib.sha256(repr(sorted(tx.items())).encode()).hexdigest()
+        return SimpleNamespace(hash=Hash(bytes.fromhex(digest)), rawTransaction={**tx, "hash": "0x" + digest})
+
+
+@pytest.fixture
+def node():
+    return FakeNode()
+
+
+@pytest.fixture
+def manager(node):
+    return TransactionManager(node, node, node, gas_oracle=GasOracle(node, min_priority_fee=0), replace_after=0.0, receipt_timeout=60.0)
+
+
+def mint(manager, i=0, **kwargs):
+    return manager.submit("safeMint", i, "ipfs://a", "ipfs://a", ADDRESS, **kwargs)
+
+
+def test_consecutive_nonces_and_cached_fees(node, manager):
+    hashes = [mint(manager, i) for i in range(3)]
+    assert [tx["nonce"] for tx in node.sent] == [0, 1, 2]
+    assert node.sent[0]["maxFeePerGas"] == 2 * 100 + 10 and node.sent[0]["maxPriorityFeePerGas"] == 10
+    node.mine()
+    manager._confirm_pending()
+    assert [manager.wait(tx_hash, 1).status for tx_hash in hashes] == [1, 1, 1]
+    assert manager.stats()["confirmed"] == 3
+
+
+def test_dropped_transaction_is_replaced_on_same_nonce(node, manager):
+    first = mint(manager)
+    node.drop()
+    manager._confirm_pending()
+    replacement = node.sent[-1]
+    assert replacement["nonce"] == 0
+    assert replacement["maxFeePerGas"] > node.sent[0]["maxFeePerGas"]
+    assert replacement["maxPriorityFeePerGas"] > node.sent[0]["maxPriorityFeePerGas"]
+    node.mine()
+    manager._confirm_pending()
+    # the caller only knows the original hash, it settles with the replacement's receipt
+    assert manager.wait(first, 1).status == 1
+    assert manager.future(replacement["hash"]).result(1).status == 1
+    assert manager.stats()["replaced"] == 1
+
+
+def test_timeout_fails_and_next_transaction_fills_the_gap(node, manager):
+    manager.max_replacements = 0
+    manager.receipt_timeout = 0.0
+    first = mint(manager)
+    node.drop()
+    manager._confirm_pending()
+    with pytest.raises(TimeoutError):
+        manager.wait(first, 1)
+    # without the resync the next one would go out on nonce 1, behind the gap
+    second = mint(manager, 1)
+    assert node.sent[-1]["nonce"] == 0
+    node.mine()
+    manager._confirm_pending()
+    assert manager.wait(second, 1).status == 1
+
+
+def test_underpriced_send_retries_same_nonce_with_bumped_fees(node, manager):
+    node.errors = ["max fee per gas less than block base fee"]
+    mint(manager)
+    assert len(node.sent) == 1
+    assert node.sent[0]["nonce"] == 0
+    assert node.sent[0]["maxFeePerGas"] > 2 * 100 + 10
+
+
+def test_stale_nonce_is_reread_from_node(node, manager):
+    mint(manager)
+    node.mine()
+    manager._nonce = 0
+    mint(manager, 1)
+    assert [tx["nonce"] for tx in node.sent] == [0, 1]
+
+
+def test_failed_send_does_not_consume_nonce(node, manager):
+    node.errors = ["insufficient funds for gas * price + value"]
+    with pytest.raises(ValueError):
+        mint(manager)
+    mint(manager, 1)
+    assert [tx["nonce"] for tx in node.sent] == [0]
+
+
+def test_on_signed_sees_every_hash_before_it_is_sent(node, manager):
+    signed = []
+    mint(manager, on_signed=lambda tx_hash, nonce: signed.append((tx_hash, nonce, len(node.sent))))
+    node.drop()
+    manager._confirm_pending()
+    assert [(nonce, sent_before) for _, nonce, sent_before in signed] == [(0, 0), (0, 1)]
+    assert [tx_hash for tx_hash, _, _ in signed] == [tx["hash"] for tx in node.sent]
+
+
+def resume(node, i=0):
+    # a fresh manager, as after a restart, picking up what another one signed
+    manager = TransactionManager(node, node, node, gas_oracle=GasOracle(node, min_priority_fee=0))
+    signed = []
+    tx_hash = manager.submit("safeMint", i, "ipfs://a", "ipfs://a", ADDRESS, on_signed=lambda h, n: signed.append((h, n)))
+    return manager, tx_hash, signed
+
+
+def test_resume_waits_for_a_mined_transaction(node):
+    _, tx_hash, signed = resume(node)
+    node.mine()
+    manager = TransactionManager(node, node, node, gas_oracle=GasOracle(node, min_priority_fee=0))
+    resumed = manager.resume("safeMint", 0, "ipfs://a", "ipfs://a", ADDRESS, hashes=[tx_hash], nonce=0)
+    manager._confirm_pending()
+    assert resumed == tx_hash and len(node.sent) == 1
+    assert manager.wait(resumed, 1).transactionHash == tx_hash
+
+
+def test_resume_waits_for_a_pending_transaction(node):
+    _, tx_hash, _ = resume(node)
+    manager = TransactionManager(node, node, node, gas_oracle=GasOracle(node, min_priority_fee=0))
+    assert manager.resume("safeMint", 0, "ipfs://a", "ipfs://a", ADDRESS, hashes=[tx_hash], nonce=0) == tx_hash
+    assert len(node.sent) == 1
+
+
+def test_resume_resends_a_dropped_transaction_on_its_nonce(node):
+    _, tx_hash, _ = resume(node)
+    node.drop()
+    manager = TransactionManager(node, node, node, gas_oracle=GasOracle(node, min_priority_fee=0))
+    signed = []
+    resumed = manager.resume("safeMint", 0, "ipfs://a", "ipfs://a", ADDRESS, hashes=[tx_hash], nonce=0,
+                             on_signed=lambda h, n: signed.append((h, n)))
+    assert resumed != tx_hash and signed == [(resumed, 0)]
+    assert node.sent[-1]["nonce"] == 0
+
+
+def test_resume_submits_anew_once_the_nonce_went_elsewhere(node):
+    # signed, never sent, and the nonce then taken by another transaction
+    manager, _, _ = resume(node)
+    node.drop()
+    manager.resync_nonce()
+    mint(manager, 1)
+    node.mine()
+    fresh = TransactionManager(node, node, node, gas_oracle=GasOracle(node, min_priority_fee=0))
+    resumed = fresh.resume("safeMint", 0, "ipfs://a", "ipfs://a", ADDRESS, hashes=["0x" + "00" * 32], nonce=0)
+    assert node.sent[-1]["hash"] == resumed and node.sent[-1]["nonce"] == 1
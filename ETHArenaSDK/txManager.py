@@ -0,0 +1,325 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from gasOracle import GasOracle
+from telemetry import stage
+
+logger = logging.getLogger(__name__)
+
+
+class PendingTransaction:
+    """
+    The transaction sent for one nonce: the call it makes, its current fees and every hash sent for it,
+    the original and any replacements. Whichever of them is mined settles `future`.
+    """
+
+    __slots__ = ("fn_name", "args", "shape", "gas_limit", "fees", "nonce", "hashes", "first_sent_at", "sent_at",
+                 "replacements", "on_signed", "future")
+
+    def __init__(self, fn_name: str, args: tuple, shape: tuple, gas_limit: int, fees: dict, on_signed=None):
+        self.fn_name = fn_name
+        self.args = args
+        self.shape = shape
+        self.gas_limit = gas_limit
+        self.fees = fees
+        self.nonce = None
+        self.hashes = []
+        self.first_sent_at = None
+        self.sent_at = None
+        self.replacements = 0
+        self.on_signed = on_signed
+        self.future = Future()
+
+
+class TransactionManager:
+    """
+    Sends contract transactions from a single account without per-call nonce/gas lookups.
+    Nonces are tracked locally, EIP-1559 fees and gas limits (per function and argument shape) come from
+    the GasOracle, and receipts are confirmed by a background thread so senders never block on a block.
+    Sending a transaction therefore takes a single RPC, eth_sendRawTransaction.
+
+    A transaction not mined after `replace_after` seconds is re-sent on the same nonce with fees bumped by
+    `fee_bump` (a dropped or underpriced one would otherwise hold back every later nonce), at most
+    `max_replacements` times. One still not mined after `receipt_timeout` fails and the next nonce is
+    re-read from the node, so a gap it leaves is filled by the next transaction.
+    """
+
+    def __init__(
+        self,
+        w3,
+        contract,
+        account,
+        gas_oracle: GasOracle = None,
+        poll_interval: float = 1.0,
+        receipt_timeout: float = 300.0,
+        replace_after: float = 60.0,
+        max_replacements: int = 3,
+        fee_bump: float = 1.125,
+        send_attempts: int = 3,
+    ):
+        self.w3 = w3
+        self.contract = contract
+        self.account = account
+        self.gas_oracle = gas_oracle or GasOracle(w3)
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+        self.replace_after = replace_after
+        self.max_replacements = max_replacements
+        # nodes only accept a replacement that raises both fee fields by at least 10%
+        self.fee_bump = fee_bump
+        self.send_attempts = send_attempts
+        self.nonce_lock = threading.Lock()
+        self.pending_lock = threading.Lock()
+        self._nonce = None
+        self._chain_id = None
+        self._pending = {}
+        self._settled = OrderedDict()
+        self.max_settled = 1024
+        self._stop = threading.Event()
+        self._confirmer = None
+        self.sent = 0
+        self.replaced = 0
+        self.confirmed = 0
+        self.failed = 0
+
+    @staticmethod
+    def call_shape(fn_name: str, args: tuple) -> tuple:
+        # storage cost depends on the number of 32 byte words written, not on the exact values
+        return (fn_name,) + tuple(
+            ("str", len(arg.encode()) // 32) if isinstance(arg, str) else type(arg).__name__
+            for arg in args
+        )
+
+    @property
+    def chain_id(self) -> int:
+        # passed to build_transaction, which would otherwise ask the node for it on every call
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    def _next_nonce(self) -> int:
+        if self._nonce is None:
+            self._nonce = self.w3.eth.get_transaction_count(self.account.address, "pending")
+        nonce = self._nonce
+        self._nonce += 1
+        return nonce
+
+    def resync_nonce(self):
+        with self.nonce_lock:
+            self._nonce = None
+
+    def bump(self, fees: dict) -> dict:
+        """
+        `fees` raised enough to replace a transaction sent with them, and at least the oracle's current fees
+        """
+        current = self.gas_oracle.fees()
+        return {
+            field: max(int(value * self.fee_bump) + 1, current.get(field, 0))
+            for field, value in fees.items()
+        }
+
+    def _send(self, tx: PendingTransaction) -> str:
+        # called with nonce_lock held
+        built = getattr(self.contract.functions, tx.fn_name)(*tx.args).build_transaction({
+            "from": self.account.address,
+            "gas": tx.gas_limit,
+            "nonce": tx.nonce,
+            "chainId": self.chain_id,
+            **tx.fees,
+        })
+        signed_tx = self.account.sign_transaction(built)
+        tx_hash = signed_tx.hash.hex()
+        if tx.on_signed is not None:
+            # before sending, so a caller that records it can never lose track of a sent transaction
+            tx.on_signed(tx_hash, tx.nonce)
+        with stage("tx_send"):
+            self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        tx.hashes.append(tx_hash)
+        tx.sent_at = time.time()
+        if tx.first_sent_at is None:
+            tx.first_sent_at = tx.sent_at
+        with self.pending_lock:
+            self._pending[tx_hash] = tx
+        return tx_hash
+
+    def submit(self, fn_name: str, *args, on_signed=None) -> str:
+        """
+        Builds, signs and sends `fn_name(*args)` and returns the tx hash without waiting for a receipt.
+        `on_signed(tx_hash, nonce)` is called before this and every replacement transaction is sent.
+        """
+        shape = self.call_shape(fn_name, args)
+        fn = getattr(self.contract.functions, fn_name)(*args)
+        gas_limit = self.gas_oracle.gas_limit(shape, lambda: fn.estimate_gas({"from": self.account.address}))
+        tx = PendingTransaction(fn_name, args, shape, gas_limit, self.gas_oracle.fees(), on_signed)
+        with self.nonce_lock:
+            for attempt in range(self.send_attempts):
+                if tx.nonce is None:
+                    tx.nonce = self._next_nonce()
+                try:
+                    tx_hash = self._send(tx)
+                    self.sent += 1
+                    return tx_hash
+                except Exception as e:
+                    retry = attempt + 1 < self.send_attempts
+                    message = str(e).lower()
+                    if retry and "replacement" not in message and ("underpriced" in message or "fee" in message):
+                        # the base fee outgrew the cached fee cap: same nonce, fresh and bumped fees
+                        self.gas_oracle.refresh()
+                        tx.fees = self.bump(tx.fees)
+                        continue
+                    # the nonce was not used, or the local one is out of step with the node: re-read it
+                    self._nonce = None
+                    tx.nonce = None
+                    if not (retry and ("nonce" in message or "replacement" in message or "already known" in message)):
+                        raise
+
+    def resume(self, fn_name: str, *args, hashes: list, nonce: int, on_signed=None) -> str:
+        """
+        Picks up `fn_name(*args)` for which an earlier attempt, possibly in a process that has since died,
+        signed `hashes` on `nonce`, and returns the hash to wait for.
+        Nothing is sent while one of them is mined or pending. A dropped one is re-sent on the same nonce, and only
+        once that nonce went to another transaction or theirs reverted is the call submitted anew.
+        """
+        shape = self.call_shape(fn_name, args)
+        fn = getattr(self.contract.functions, fn_name)(*args)
+        gas_limit = self.gas_oracle.gas_limit(shape, lambda: fn.estimate_gas({"from": self.account.address}))
+        tx = PendingTransaction(fn_name, args, shape, gas_limit, self.gas_oracle.fees(), on_signed)
+        tx.nonce = nonce
+        tx.hashes = list(hashes)
+        tx.first_sent_at = tx.sent_at = time.time()
+        receipt = self._receipt(tx)
+        if receipt is None and not any(self._known(tx_hash) for tx_hash in hashes):
+            if self.w3.eth.get_transaction_count(self.account.address, "latest") <= nonce:
+                with self.nonce_lock:
+                    tx.fees = self.bump(tx.fees)
+                    self._send(tx)
+                self.sent += 1
+                logger.warning("Transaction %s (nonce %s) was dropped, re-sent as %s", hashes[-1], nonce, tx.hashes[-1])
+                return tx.hashes[-1]
+            # the nonce is used, by one of them if it was mined in the meantime
+            receipt = self._receipt(tx)
+            if receipt is None:
+                return self.submit(fn_name, *args, on_signed=on_signed)
+        if receipt is not None and receipt.status == 0:
+            # nothing happened on chain
+            return self.submit(fn_name, *args, on_signed=on_signed)
+        with self.pending_lock:
+            for tx_hash in tx.hashes:
+                self._pending[tx_hash] = tx
+        return tx.hashes[-1]
+
+    def _known(self, tx_hash: str) -> bool:
+        try:
+            return self.w3.eth.get_transaction(tx_hash) is not None
+        except Exception:
+            return False
+
+    def submit_many(self, calls: list) -> list:
+        """
+        Pipelines several (fn_name, *args) calls back-to-back on consecutive nonces
+        """
+        return [self.submit(fn_name, *args) for fn_name, *args in calls]
+
+    def future(self, tx_hash: str) -> Future:
+        with self.pending_lock:
+            tx = self._pending.get(tx_hash) or self._settled.get(tx_hash)
+        if tx is None:
+            future = Future()
+            future.set_exception(KeyError(f"Unknown transaction {tx_hash}"))
+            return future
+        return tx.future
+
+    def wait(self, tx_hash: str, timeout: float = None):
+        return self.future(tx_hash).result(timeout)
+
+    def _replace(self, tx: PendingTransaction):
+        tx.replacements += 1
+        tx.fees = self.bump(tx.fees)
+        with self.nonce_lock:
+            try:
+                tx_hash = self._send(tx)
+            except Exception as e:
+                # e.g. "nonce too low" once one of its hashes was mined, which the next poll picks up
+                tx.sent_at = time.time()
+                logger.warning("Replacing transaction %s (nonce %s) failed: %s", tx.hashes[-1], tx.nonce, e)
+                return
+        self.replaced += 1
+        logger.warning("Transaction %s (nonce %s) not mined after %ss, replaced by %s",
+                       tx.hashes[-2], tx.nonce, self.replace_after, tx_hash)
+
+    def _receipt(self, tx: PendingTransaction):
+        for tx_hash in reversed(tx.hashes):
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except Exception:
+                receipt = None
+            if receipt is not None:
+                return receipt
+        return None
+
+    def _confirm_pending(self):
+        with self.pending_lock:
+            pending = list({id(tx): tx for tx in self._pending.values()}.values())
+        for tx in pending:
+            receipt = self._receipt(tx)
+            now = time.time()
+            if receipt is None:
+                if now - tx.first_sent_at >= self.receipt_timeout:
+                    tx.future.set_exception(TimeoutError(
+                        f"Transaction {tx.hashes[-1]} (nonce {tx.nonce}) not mined after {self.receipt_timeout}s"
+                    ))
+                    self.failed += 1
+                    # whether it was dropped or is still queued, the node's pending nonce is where the next one goes
+                    self.resync_nonce()
+                elif now - tx.sent_at >= self.replace_after and tx.replacements < self.max_replacements:
+                    self._replace(tx)
+                    continue
+                else:
+                    continue
+            elif receipt.status == 0:
+                self.gas_oracle.observe(tx.shape, receipt.gasUsed, tx.gas_limit, succeeded=False)
+                tx.future.set_exception(Exception(f"Transaction {tx.hashes[-1]} reverted in block {receipt.blockNumber}"))
+                self.failed += 1
+            else:
+                self.gas_oracle.observe(tx.shape, receipt.gasUsed, tx.gas_limit, succeeded=True)
+                tx.future.set_result(receipt)
+                self.confirmed += 1
+                logger.info("Transaction %s confirmed in block %s", tx.hashes[-1], receipt.blockNumber)
+            with self.pending_lock:
+                for tx_hash in tx.hashes:
+                    self._pending.pop(tx_hash, None)
+                    self._settled[tx_hash] = tx
+                while len(self._settled) > self.max_settled:
+                    self._settled.popitem(last=False)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self._confirm_pending()
+
+    def start(self):
+        self.gas_oracle.start()
+        self._stop.clear()
+        self._confirmer = threading.Thread(target=self._run, name="tx-confirmer", daemon=True)
+        self._confirmer.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._confirmer is not None:
+            self._confirmer.join()
+            self._confirmer = None
+        self.gas_oracle.stop()
+
+    def stats(self) -> dict:
+        with self.pending_lock:
+            pending = len({id(tx) for tx in self._pending.values()})
+        return {
+            "sent": self.sent,
+            "replaced": self.replaced,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "pending": pending,
+            "gas": self.gas_oracle.stats(),
+        }
@@ -0,0 +1,210 @@
+using UnityEngine;
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Net.WebSockets;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+
+/// <summary>
+/// Streams game snapshots over a single WebSocket per match.
+/// The first snapshot is sent as a keyframe, every following one only carries
+/// the objects whose position or state changed since the previous snapshot.
+/// At the end of a match FlushAndCloseAsync sends whatever is still queued, then closes the connection.
+/// </summary>
+public class FrameStreamer : IDisposable
+{
+    private readonly Uri uri;
+    private readonly ClientWebSocket socket = new ClientWebSocket();
+    private readonly ConcurrentQueue<string> outbox = new ConcurrentQueue<string>();
+    private readonly SemaphoreSlim pending = new SemaphoreSlim(0);
+    private readonly CancellationTokenSource cancellation = new CancellationTokenSource();
+    private readonly Task running;
+    private Task receiving = Task.CompletedTask;
+    private Task closed;
+    private volatile bool closing;
+    private GameManager.GameData previous;
+
+    public event Action<string> MessageReceived;
+
+    public FrameStreamer(string url)
+    {
+        uri = new Uri(url);
+        running = Task.Run(Run);
+    }
+
+    public void Send(GameManager.GameData data)
+    {
+        if (closing) return;
+        outbox.Enqueue(previous == null ? KeyFrame(data) : DeltaFrame(previous, data));
+        previous = data;
+        pending.Release();
+    }
+
+    private async Task Run()
+    {
+        try
+        {
+            await socket.ConnectAsync(uri, cancellation.Token);
+            receiving = Receive();
+            while (true)
+            {
+                await pending.WaitAsync(cancellation.Token);
+                if (outbox.TryDequeue(out string message))
+                {
+                    var bytes = new ArraySegment<byte>(Encoding.UTF8.GetBytes(message));
+                    await socket.SendAsync(bytes, WebSocketMessageType.Text, true, cancellation.Token);
+                }
+                else if (closing)
+                {
+                    // FlushAndCloseAsync releases once more after the last frame, so the outbox is drained
+                    break;
+                }
+            }
+        }
+        catch (OperationCanceledException)
+        {
+        }
+        catch (Exception e)
+        {
+            Debug.LogError("Frame stream error: " + e.Message);
+        }
+    }
+
+    private async Task Receive()
+    {
+        var buffer = new byte[8192];
+        while (socket.State == WebSocketState.Open)
+        {
+            var result = await socket.ReceiveAsync(new ArraySegment<byte>(buffer), cancellation.Token);
+            if (result.MessageType == WebSocketMessageType.Close) break;
+            MessageReceived?.Invoke(Encoding.UTF8.GetString(buffer, 0, result.Count));
+        }
+    }
+
+    private static string Number(float value)
+    {
+        return value.ToString("R", CultureInfo.InvariantCulture);
+    }
+
+    private static string Quote(string value)
+    {
+        return "\"" + value.Replace("\\", "\\\\").Replace("\"", "\\\"") + "\"";
+    }
+
+    private static string Slingshot(GameManager.SlingshotData slingshot)
+    {
+        return "{\"birdToThrow\":" + Quote(slingshot.birdToThrow) + ",\"slingshotState\":" + Quote(slingshot.slingshotState) + "}";
+    }
+
+    private static string KeyFrame(GameManager.GameData data)
+    {
+        return "{\"type\":\"key\",\"currentGameState\":" + Quote(data.currentGameState) + ",\"slingshot\":" + Slingshot(data.slingshot) + "," + FullList("birds", Objects(data.birds)) + "," + FullList("pigs", Objects(data.pigs)) + "," + FullList("bricks", Objects(data.bricks)) + "}";
+    }
+
+    private static string DeltaFrame(GameManager.GameData before, GameManager.GameData after)
+    {
+        var parts = new List<string> { "\"type\":\"delta\"" };
+        if (before.currentGameState != after.currentGameState)
+            parts.Add("\"currentGameState\":" + Quote(after.currentGameState));
+        if (before.slingshot.birdToThrow != after.slingshot.birdToThrow || before.slingshot.slingshotState != after.slingshot.slingshotState)
+            parts.Add("\"slingshot\":" + Slingshot(after.slingshot));
+
+        var sizes = new List<string>();
+        AddChanges(parts, sizes, "birds", Objects(before.birds), Objects(after.birds));
+        AddChanges(parts, sizes, "pigs", Objects(before.pigs), Objects(after.pigs));
+        AddChanges(parts, sizes, "bricks", Objects(before.bricks), Objects(after.bricks));
+        if (sizes.Count > 0)
+            parts.Add("\"n\":{" + string.Join(",", sizes) + "}");
+        return "{" + string.Join(",", parts) + "}";
+    }
+
+    private static List<KeyValuePair<Vector2, string>> Objects<T>(List<T> items)
+    {
+        var objects = new List<KeyValuePair<Vector2, string>>();
+        foreach (var item in items)
+        {
+            switch (item)
+            {
+                case GameManager.BirdData bird: objects.Add(new KeyValuePair<Vector2, string>(bird.position, bird.state)); break;
+                case GameManager.PigData pig: objects.Add(new KeyValuePair<Vector2, string>(pig.position, pig.state)); break;
+                case GameManager.BrickData brick: objects.Add(new KeyValuePair<Vector2, string>(brick.position, brick.state)); break;
+            }
+        }
+        return objects;
+    }
+
+    private static string FullList(string kind, List<KeyValuePair<Vector2, string>> objects)
+    {
+        var items = new List<string>();
+        foreach (var obj in objects)
+            items.Add("{\"position\":{\"x\":" + Number(obj.Key.x) + ",\"y\":" + Number(obj.Key.y) + "},\"state\":" + Quote(obj.Value) + "}");
+        return Quote(kind) + ":[" + string.Join(",", items) + "]";
+    }
+
+    private static void AddChanges(List<string> parts, List<string> sizes, string kind, List<KeyValuePair<Vector2, string>> before, List<KeyValuePair<Vector2, string>> after)
+    {
+        if (before.Count != after.Count)
+            sizes.Add(Quote(kind) + ":" + after.Count);
+        var changed = new List<string>();
+        for (int i = 0; i < after.Count; i++)
+        {
+            if (i < before.Count && before[i].Key == after[i].Key && before[i].Value == after[i].Value) continue;
+            changed.Add("[" + i + "," + Number(after[i].Key.x) + "," + Number(after[i].Key.y) + "," + Quote(after[i].Value) + "]");
+        }
+        if (changed.Count > 0)
+            parts.Add(Quote(kind) + ":[" + string.Join(",", changed) + "]");
+    }
+
+    /// <summary>
+    /// Sends every queued frame, then the close handshake, giving up on a stalled connection after timeout.
+    /// Safe to call more than once, every call returns the same task.
+    /// </summary>
+    public Task FlushAndCloseAsync(TimeSpan timeout)
+    {
+        if (closed == null)
+        {
+            closing = true;
+            pending.Release();
+            cancellation.CancelAfter(timeout);
+            closed = Close();
+        }
+        return closed;
+    }
+
+    private async Task Close()
+    {
+        try
+        {
+            // only once the send loop is done, a close frame must not race an in-flight SendAsync
+            await running;
+            if (socket.State == WebSocketState.Open)
+            {
+                await socket.CloseOutputAsync(WebSocketCloseStatus.NormalClosure, "match finished", cancellation.Token);
+                // the receive loop reads the acks still on their way and ends with the server's close frame
+                await receiving;
+            }
+        }
+        catch (OperationCanceledException)
+        {
+            Debug.LogWarning("Frame stream not closed in time, dropping the connection");
+        }
+        catch (Exception e)
+        {
+            Debug.LogError("Frame stream close error: " + e.Message);
+        }
+        finally
+        {
+            cancellation.Cancel();
+            socket.Dispose();
+        }
+    }
+
+    public void Dispose()
+    {
+        // unless the match already closed the stream, still deliver what was queued, in the background
+        FlushAndCloseAsync(TimeSpan.FromSeconds(5));
+    }
+}
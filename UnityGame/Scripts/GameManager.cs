@@ -24,6 +24,12 @@ public class GameManager : MonoBehaviour
     private List<GameObject> Pigs;
 
     private string serverUrl = "http://localhost:8000/getUserData?walletAddress=0x1d72B383cd2F783e4f2eDafE9D7544A3355507C2";
+    private string streamUrl = "ws://localhost:8000/ws/getUserData?walletAddress=0x1d72B383cd2F783e4f2eDafE9D7544A3355507C2";
+
+    // Stream snapshots over one WebSocket per match instead of one POST per snapshot
+    public bool streamGameData = true;
+    private FrameStreamer frameStreamer;
+    private bool restarting;
 
     // Use this for initialization
     void Start()
@@ -40,6 +46,12 @@ public class GameManager : MonoBehaviour
         slingshot.BirdThrown -= Slingshot_BirdThrown; 
         slingshot.BirdThrown += Slingshot_BirdThrown;
 
+        if (streamGameData)
+        {
+            frameStreamer = new FrameStreamer(streamUrl);
+            frameStreamer.MessageReceived += message => Debug.Log("Game Data Sent Successfully: " + message);
+        }
+
         // Log game data at the start
         LogGameData();
     }
@@ -72,10 +84,10 @@ public class GameManager : MonoBehaviour
                 break;
             case GameState.Won:
             case GameState.Lost:
-                if (Input.GetMouseButtonUp(0))
+                if (Input.GetMouseButtonUp(0) && !restarting)
                 {
                     LogGameData(); // Log before restarting
-                    Application.LoadLevel(Application.loadedLevel);
+                    StartCoroutine(Restart());
                 }
                 break;
         }
@@ -212,11 +224,37 @@ public class GameManager : MonoBehaviour
     public void LogGameData()
     {
         GameData data = CollectGameData();
+        if (frameStreamer != null)
+        {
+            frameStreamer.Send(data);
+            return;
+        }
         string jsonData = JsonUtility.ToJson(data, true); // Pretty print JSON
         StartCoroutine(PostRequest(serverUrl, jsonData));
         Debug.Log(jsonData);
     }
 
+    /// <summary>
+    /// Reloads the level once the final frame of the match has been streamed,
+    /// the reload destroys this object and with it the connection
+    /// </summary>
+    IEnumerator Restart()
+    {
+        restarting = true;
+        if (frameStreamer != null)
+        {
+            Task closed = frameStreamer.FlushAndCloseAsync(TimeSpan.FromSeconds(5));
+            yield return new WaitUntil(() => closed.IsCompleted);
+        }
+        Application.LoadLevel(Application.loadedLevel);
+    }
+
+    void OnDestroy()
+    {
+        // the level is reloaded after every match, so each match gets its own connection
+        if (frameStreamer != null) frameStreamer.Dispose();
+    }
+
 
     IEnumerator PostRequest(string url, string jsonData)
     {
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
-import axios from 'axios';
+import { streamEvents } from '../hooks/streamEvents';
 import {
   RadarChart,
   PolarGrid,
@@ -134,16 +134,19 @@ export const GamePerformanceDashboard = () => {
       try {
         if (!address) return;
         const walletAddress = address.toString();
-        const response = await axios.get(
-          `https://basearena.onrender.com/getAIResponse?walletAddress=${walletAddress}`
+        // fields are rendered as soon as the agent has generated them
+        await streamEvents(
+          `https://basearena.onrender.com/getAIResponse/stream?walletAddress=${walletAddress}`,
+          {},
+          (event, data) => {
+            if (event === 'field') {
+              setGameData((prev) => ({ ...prev, [data.key]: data.value }));
+              setLoading(false);
+            } else if (event === 'done') {
+              setGameData(data);
+            }
+          }
         );
-        
-        // Parse the response data if it's a string
-        const parsedData = typeof response.data === 'string' 
-          ? JSON.parse(response.data) 
-          : response.data;
-        
-        setGameData(parsedData);
       } catch (error) {
         console.error('Error fetching game data:', error);
       } finally {
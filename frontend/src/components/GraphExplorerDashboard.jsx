@@ -6,6 +6,7 @@ import { Card } from './ui/Card';
 import { Button } from './ui/Button';
 import { Loader } from './ui/Loader';
 import ReactMarkdown from 'react-markdown';
+import { streamEvents } from '../hooks/streamEvents';
 
 const COLORS = ['#10B981', '#FACC15', '#E11D48', '#6366F1'];
 
@@ -54,22 +55,23 @@ const GraphChatbot = ({ graphData }) => {
       if (!userPrompt.trim()) return;
       setIsLoading(true);
       try {
-        const response = await fetch('https://0x0c8923d457934eae1a4ce708f07a980f1ce57a32.gaia.domains/v1/chat/completions', {
-          method: 'POST',
-          headers: {
-            'accept': 'application/json',
-            'Content-Type': 'application/json',
+        setChatResponse('');
+        await streamEvents(
+          'https://basearena.onrender.com/chat/stream',
+          {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ prompt: userPrompt, graph_data: graphData.ethArena, persona: 'fun' }),
           },
-          body: JSON.stringify({
-            messages: [
-              { role: 'system', content: `You are a helpful assistant that knows about the graph data and can quickly give correct answers. Answer from this data : ${JSON.stringify(graphData.ethArena)}. Answer everything in a fun and pun way with some jokes even if you don't know stuff`},
-              { role: 'user', content: `Answer this question: ${userPrompt}` }
-            ],
-            model: 'llama-3.2-3B-Instruct'
-          })
-        });
-        const data = await response.json();
-        setChatResponse(data.choices[0].message.content);
+          (event, data) => {
+            if (event === 'token') {
+              setChatResponse((prev) => prev + data.token);
+              setIsLoading(false);
+            } else if (event === 'error') {
+              throw new Error(data.detail);
+            }
+          }
+        );
       } catch (error) {
         console.error('Chat error:', error);
         setChatResponse('Error fetching response. Please try again.');
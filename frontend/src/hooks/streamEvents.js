@@ -0,0 +1,27 @@
+// src/hooks/streamEvents.js
+// Reads a server-sent event stream from fetch (works for POST bodies, unlike EventSource)
+export async function streamEvents(url, options, onEvent) {
+    const response = await fetch(url, options);
+    if (!response.ok || !response.body) {
+        throw new Error(`Stream request failed with status ${response.status}`);
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+            let event = 'message';
+            let data = '';
+            for (const line of raw.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            }
+            onEvent(event, data ? JSON.parse(data) : null);
+        }
+    }
+}